@@ -1,6 +1,7 @@
 import streamlit as st
 
 from lib.helper_streamlit import build_navigation
+from lib.helper_text import warmup
 
 # Page configuration
 st.set_page_config(
@@ -13,6 +14,9 @@ st.set_page_config(
 # Main title
 st.title("🤖 Streamlit/Ollama Starter App")
 
+# Precompute the common text analyses once per process (see warmup.toml)
+warmup.start()
+
 pages = build_navigation()
 
 st.navigation(pages).run()
@@ -0,0 +1,155 @@
+"""Adaptive in-flight limit for batch jobs (additive increase, multiplicative decrease).
+
+The best number of concurrent requests depends on the model, the prompt
+lengths and whoever else is using the server, so a worker count picked once
+by an offline sweep is soon wrong. ``AIMDController`` adjusts it while the
+job runs. After every sample of completed items (at least ``sample`` items,
+and at least as many as the current limit) it compares throughput and mean
+latency with the previous sample:
+
+- a timeout or connection error in the sample, latency above
+  ``latency_target``, or throughput down by more than ``tolerance``:
+  multiply the limit by ``decrease`` (back off);
+- throughput flat while latency rose by more than ``tolerance``: keep the
+  limit (extra requests only queue);
+- otherwise add ``increase`` (probe for more throughput).
+
+The limit stays between ``minimum`` and ``maximum``. Throughput is counted
+in tokens per second: ``eval_count`` when the item's value is an Ollama
+response, the number of words when it is text, else one per item.
+
+Pass a controller to ``BatchProcessor(concurrency=...)``; its decisions are
+available from ``stats()`` and ``decisions``.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any
+
+
+def is_timeout(error: BaseException | None) -> bool:
+    """True for timeouts and connection failures, which call for backing off."""
+    if error is None:
+        return False
+    return isinstance(error, (TimeoutError, ConnectionError)) or "timeout" in type(error).__name__.lower()
+
+
+def units(value: Any) -> int:
+    """Tokens produced for one item (see the module docstring)."""
+    if isinstance(value, dict) and value.get("eval_count"):
+        return int(value["eval_count"])
+    if isinstance(value, str):
+        return max(len(value.split()), 1)
+    return 1
+
+
+class AIMDController:
+    """In-flight limit driven by measured throughput, latency and timeouts."""
+
+    def __init__(
+        self,
+        initial: int = 2,
+        minimum: int = 1,
+        maximum: int = 16,
+        increase: int = 1,
+        decrease: float = 0.5,
+        sample: int = 8,
+        tolerance: float = 0.1,
+        latency_target: float | None = None,
+        history: int = 100,
+    ):
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("expected 1 <= minimum <= initial <= maximum")
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.sample = sample
+        self.tolerance = tolerance
+        self.latency_target = latency_target
+        self.decisions = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._reset(self._started)
+        self._previous = None  # (throughput, latency) of the last sample
+        self._last_backoff = float("-inf")
+        self.increases = 0
+        self.decreases = 0
+        self.timeouts = 0
+
+    def _reset(self, now: float):
+        self._sample_start = now
+        self._count = 0
+        self._units = 0
+        self._latency = 0.0
+        self._timeouts = 0
+
+    def observe(self, seconds: float, value: Any = None, error: BaseException | None = None):
+        """Record one finished item; may adjust ``limit``."""
+        now = time.monotonic()
+        with self._lock:
+            self._count += 1
+            self._latency += seconds
+            if is_timeout(error):
+                self.timeouts += 1
+                # one back-off per burst: items sent before the last one don't count again
+                self._timeouts += now - seconds >= self._last_backoff
+            elif error is None:
+                self._units += units(value)
+            if self._count >= max(self.sample, self.limit) or self._timeouts:
+                self._decide(now)
+
+    def _decide(self, now: float):
+        elapsed = max(now - self._sample_start, 1e-6)
+        throughput = self._units / elapsed
+        latency = self._latency / self._count
+        previous = self._previous
+        if self._timeouts:
+            reason = "timeout"
+        elif self.latency_target is not None and latency > self.latency_target:
+            reason = "latency"
+        elif previous and throughput < previous[0] * (1 - self.tolerance):
+            reason = "throughput fell"
+        elif previous and throughput < previous[0] * (1 + self.tolerance) and latency > previous[1] * (1 + self.tolerance):
+            reason = "plateau"
+        else:
+            reason = "probe"
+
+        old = self.limit
+        if reason == "probe":
+            self.limit = min(self.maximum, old + self.increase)
+            self.increases += self.limit > old
+        elif reason != "plateau":
+            self.limit = max(self.minimum, int(old * self.decrease))
+            self.decreases += self.limit < old
+            self._last_backoff = now
+        self.decisions.append({
+            "seconds": round(now - self._started, 2),
+            "limit": self.limit,
+            "previous_limit": old,
+            "reason": reason,
+            "tokens_per_second": round(throughput, 2),
+            "latency": round(latency, 3),
+            "items": self._count,
+        })
+        self._previous = (throughput, latency)
+        self._reset(now)
+
+    def stats(self) -> dict:
+        with self._lock:
+            last = self.decisions[-1] if self.decisions else {}
+            return {
+                "limit": self.limit,
+                "minimum": self.minimum,
+                "maximum": self.maximum,
+                "tokens_per_second": last.get("tokens_per_second", 0.0),
+                "latency": last.get("latency", 0.0),
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "timeouts": self.timeouts,
+                "decisions": len(self.decisions),
+            }
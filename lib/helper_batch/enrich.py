@@ -0,0 +1,147 @@
+"""Streaming LLM enrichment of CSV files larger than memory.
+
+``enrich_csv`` reads the source in chunks of ``chunksize`` rows, renders a
+prompt per row from ``template`` and runs the rows through one
+``BatchProcessor``, so requests stay concurrent across chunk boundaries.
+Rows come back in input order and each chunk is written out as soon as its
+last row is done; only the chunks being worked on are held in memory.
+
+Output grows while the job runs:
+
+- ``*.csv``: rows are appended to one file (header once), flushed per chunk;
+- ``*.parquet``: a directory with one ``part-NNNNN.parquet`` file per chunk,
+  readable as a dataset at any time (needs ``pyarrow``).
+
+The template uses ``str.format`` fields; ``columns`` maps field names to CSV
+columns when they differ (a field without a mapping reads the column of the
+same name)::
+
+    enrich_csv(
+        "reviews.csv", "reviews_enriched.csv",
+        template="Classify the sentiment of this review as Positive, Negative or Neutral.\\n\\nReview: {review}",
+        columns={"review": "review_text"},
+        output_column="sentiment",
+    )
+
+Rows whose call failed get an empty output and the error in
+``error_column``.
+"""
+
+from __future__ import annotations
+
+import os
+import string
+import time
+from collections import deque
+from typing import Callable
+
+import pandas as pd
+
+from lib.helper_batch.processor import BatchProcessor, prompt_fn
+
+
+def template_fields(template: str) -> list[str]:
+    """Names of the ``{fields}`` used by ``template``."""
+    return [name for _, name, _, _ in string.Formatter().parse(template) if name]
+
+
+def render(template: str, row: dict, columns: dict | None = None) -> str:
+    """``template`` filled from ``row``, reading each field from ``columns.get(field, field)``."""
+    columns = columns or {}
+    values = {}
+    for field in template_fields(template):
+        value = row[columns.get(field, field)]
+        values[field] = "" if pd.isna(value) else value
+    return template.format(**values)
+
+
+class _ChunkWriter:
+    def __init__(self, destination: str):
+        self.destination = destination
+        self.parquet = destination.endswith(".parquet")
+        self.chunks = 0
+        if self.parquet:
+            os.makedirs(destination, exist_ok=True)
+            for name in os.listdir(destination):
+                if name.startswith("part-") and name.endswith(".parquet"):
+                    os.remove(os.path.join(destination, name))  # parts of an earlier run
+        elif os.path.exists(destination):
+            os.remove(destination)
+
+    def write(self, frame: pd.DataFrame):
+        if self.parquet:
+            frame.to_parquet(os.path.join(self.destination, f"part-{self.chunks:05d}.parquet"), index=False)
+        else:
+            with open(self.destination, "a", newline="", encoding="utf-8") as f:
+                frame.to_csv(f, index=False, header=self.chunks == 0)
+        self.chunks += 1
+
+
+def enrich_csv(
+    source: str,
+    destination: str,
+    template: str,
+    columns: dict | None = None,
+    output_column: str = "enriched",
+    error_column: str = "enrich_error",
+    model: str = "phi4-mini",
+    options: dict | None = None,
+    chunksize: int = 1000,
+    window: int = 8,
+    concurrency=None,
+    fn: Callable[[str], str] | None = None,
+    on_chunk: Callable[[int, int], None] | None = None,
+) -> dict:
+    """Enrich ``source`` into ``destination`` chunk by chunk; returns run statistics.
+
+    ``fn(prompt)`` replaces the model call (default: ``model`` with
+    ``options``). ``on_chunk(chunks_written, rows_written)`` is called after
+    each chunk is written.
+    """
+    header = set(pd.read_csv(source, nrows=0).columns)
+    missing = [f for f in template_fields(template) if (columns or {}).get(f, f) not in header]
+    if missing:
+        raise ValueError(f"Template fields without a column in {source}: {', '.join(missing)}")
+    generate = fn or prompt_fn(model, options)
+    processor = BatchProcessor(lambda prompt: generate(prompt).strip(), window=window, ordered=True, concurrency=concurrency)
+    writer = _ChunkWriter(destination)
+    pending = deque()  # chunks whose rows are still being processed
+    start = time.monotonic()
+    rows = 0
+
+    def row_prompts():
+        for chunk in pd.read_csv(source, chunksize=chunksize):
+            pending.append(chunk)
+            for row in chunk.to_dict("records"):
+                yield render(template, row, columns)
+
+    outputs, errors = [], []
+    for result in processor.run(row_prompts()):
+        outputs.append(result.value if result.ok else "")
+        errors.append(result.error or "")
+        if len(outputs) == len(pending[0]):
+            chunk = pending.popleft()
+            chunk[output_column] = outputs
+            chunk[error_column] = errors
+            writer.write(chunk)
+            rows += len(chunk)
+            outputs, errors = [], []
+            if on_chunk is not None:
+                on_chunk(writer.chunks, rows)
+
+    if writer.chunks == 0:  # no rows: still write the header, with the new columns
+        empty = pd.read_csv(source, nrows=0)
+        empty[output_column] = pd.Series(dtype=object)
+        empty[error_column] = pd.Series(dtype=object)
+        writer.write(empty)
+        if on_chunk is not None:
+            on_chunk(writer.chunks, rows)
+
+    stats = processor.stats()
+    return {
+        "rows": rows,
+        "chunks": writer.chunks,
+        "failed": stats["failed"],
+        "seconds": round(time.monotonic() - start, 2),
+        "destination": destination,
+    } | ({"concurrency": stats["concurrency"]} if "concurrency" in stats else {})
@@ -0,0 +1,139 @@
+"""Append-only JSONL journal of finished batch items, for resumable jobs.
+
+Each finished item is appended as one JSON line keyed by its id::
+
+    {"id": 17, "value": "positive", "error": null, "seconds": 0.84}
+
+Lines are flushed and fsynced in batches (every ``sync_every`` records or
+``sync_seconds``, whichever comes first), so a crash loses at most the last
+unsynced batch, and those items simply run again. Writing one line per item
+keeps the cost of a checkpoint constant, unlike re-saving all results so far.
+
+On restart, ``done`` holds the ids already completed; pass the journal to
+``BatchProcessor.run`` and those items are skipped. A line torn by a crash
+is ignored. Failed items are journaled too, but are retried on resume
+unless ``retry_failed=False``.
+
+Ids must survive a JSON round trip (strings or integers). Values that JSON
+cannot represent (response objects, sets, datetimes) are journaled as their
+``str()``; the results yielded by the processor keep the original values.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Iterator
+
+from lib.helper_batch.processor import ItemResult
+
+
+class Journal:
+    """JSONL write-ahead journal at ``path``; use as a context manager."""
+
+    def __init__(self, path: str, sync_every: int = 100, sync_seconds: float = 1.0, retry_failed: bool = True):
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_seconds = sync_seconds
+        self.retry_failed = retry_failed
+        self.done = set()
+        self.failed = set()
+        self.recovered = 0
+        self.corrupt_lines = 0
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._load()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        if self._file.tell() > 0 and not self._ends_with_newline():
+            self._file.write("\n")  # don't glue the next record to a torn line
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _entries(self, count_corrupt: bool = False) -> Iterator[dict]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    self.corrupt_lines += count_corrupt
+                    continue
+                if isinstance(entry, dict) and "id" in entry:
+                    yield entry
+
+    def _load(self):
+        for entry in self._entries(count_corrupt=True):
+            if entry.get("error") is None:
+                self.done.add(entry["id"])
+                self.failed.discard(entry["id"])
+            elif entry["id"] not in self.done:
+                self.failed.add(entry["id"])
+        self.recovered = len(self.done)
+
+    def should_skip(self, item_id: Any) -> bool:
+        """True if ``item_id`` finished in an earlier run (or failed, with ``retry_failed=False``)."""
+        return item_id in self.done or (not self.retry_failed and item_id in self.failed)
+
+    def record(self, result: ItemResult):
+        """Append ``result``; fsync when the batch is full or old enough."""
+        entry = {"id": result.id, "value": result.value, "error": result.error, "seconds": round(result.seconds, 3)}
+        line = json.dumps(entry, default=str)  # e.g. response objects, sets, datetimes
+        with self._lock:
+            self._file.write(line + "\n")
+            if result.ok:
+                self.done.add(result.id)
+                self.failed.discard(result.id)
+            else:
+                self.failed.add(result.id)
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_seconds:
+                self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        """Flush and fsync records written since the last sync."""
+        with self._lock:
+            if self._unsynced:
+                self._sync()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                if self._unsynced:
+                    self._sync()
+                self._file.close()
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def results(self) -> dict:
+        """Latest journaled entry per id (successes win over failures)."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+        latest = {}
+        for entry in self._entries():
+            previous = latest.get(entry["id"])
+            if previous is None or entry.get("error") is None or previous.get("error") is not None:
+                latest[entry["id"]] = entry
+        return latest
@@ -0,0 +1,214 @@
+"""Prompt packing: label many short items with one request.
+
+For label-style tasks (sentiment, topic, yes/no) the answer is a few tokens,
+so one request per item is mostly overhead: HTTP round-trip, scheduling and
+evaluating the same instructions again. ``PackedClassifier`` puts several
+items in one numbered prompt and asks for a JSON array with one label per
+item, then hands each label back to its item.
+
+Answers are checked before they are used:
+
+- an array of the wrong length (items skipped or merged) is not trusted
+  at all, and every item of the pack is re-queued;
+- an entry that is not one of ``labels`` (case-insensitive) re-queues that
+  item only.
+
+Re-queued items are packed again as soon as a full pack of them has
+built up (so at most about one pack waits, whatever the input size), and
+on their last attempt (``max_attempts``) they are sent alone. An item that
+still has no label fails with the reason of its last attempt: the request
+error, a malformed answer or an unknown label. The pack size shrinks when
+answers come back malformed and grows back after good ones, up to
+``max_items``.
+
+Packs are also bounded by the context window: the instructions, the items
+(estimated at ``chars_per_token`` characters per token) and the expected
+answer must fit in ``num_ctx`` (from ``options``, else 2048, Ollama's
+default). ``num_predict`` is set per pack from the number of items.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator
+
+from lib.helper_batch.processor import BatchProcessor, ItemResult
+from lib.helper_text import prompts
+
+DEFAULT_NUM_CTX = 2048
+
+_ARRAY = re.compile(r"\[.*\]", re.DOTALL)
+
+
+def parse_labels(text: str, count: int, labels: Iterable[str]) -> list[str | None] | None:
+    """Labels from a JSON-array answer: None when the array is missing or has the
+    wrong length, else one entry per item (None where the entry is not a label)."""
+    match = _ARRAY.search(text)
+    if not match:
+        return None
+    try:
+        values = json.loads(match.group())
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(values, list) or len(values) != count:
+        return None
+    canonical = {label.lower(): label for label in labels}
+    return [canonical.get(value.strip().lower()) if isinstance(value, str) else None for value in values]
+
+
+class PackedClassifier:
+    """Label short texts with one of ``labels``, several items per request."""
+
+    def __init__(
+        self,
+        labels: Iterable[str],
+        instruction: str = "Classify each item.",
+        model: str = "phi4-mini",
+        options: dict | None = None,
+        max_items: int = 20,
+        max_attempts: int = 3,
+        chars_per_token: float = 4.0,
+        window: int = 4,
+        concurrency=None,
+        fn: Callable[[str, dict], str] | None = None,
+    ):
+        self.labels = tuple(labels)
+        if not self.labels:
+            raise ValueError("PackedClassifier needs at least one label")
+        self.instruction = instruction
+        self.model = model
+        self.options = dict(options or {})
+        self.num_ctx = int(self.options.get("num_ctx", DEFAULT_NUM_CTX))
+        self.max_items = max_items
+        self.max_attempts = max_attempts
+        self.chars_per_token = chars_per_token
+        self.window = window
+        self.concurrency = concurrency
+        self._fn = fn or self._generate
+        self.pack_limit = max_items
+        self._label_tokens = max(self._tokens(json.dumps(label)) for label in self.labels) + 1
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.items = 0
+        self.labelled = 0
+        self.requeued = 0
+        self.failed = 0
+
+    def _generate(self, prompt: str, options: dict) -> str:
+        from lib.helper_ollama import client
+
+        return client.generate(model=self.model, prompt=prompt, options=options)["response"]
+
+    def _tokens(self, text: str) -> int:
+        return int(len(text) / self.chars_per_token) + 1
+
+    def prompt(self, texts: list[str]) -> str:
+        """Packed prompt for ``texts``: instructions first, then the numbered items."""
+        preamble = (
+            f"{self.instruction}\n"
+            f"Allowed labels: {', '.join(self.labels)}."
+        )
+        items = "\n".join(f"{i}. {' '.join(str(text).split())}" for i, text in enumerate(texts, start=1))
+        return prompts.assemble(
+            preamble,
+            {"Items": items},
+            task=[
+                f"Respond with only a JSON array of exactly {len(texts)} labels, one per item, in item order.",
+                'Example for 2 items: ["' + '", "'.join((self.labels * 2)[:2]) + '"]',
+            ],
+        )
+
+    def _num_predict(self, count: int) -> int:
+        return count * self._label_tokens + 8
+
+    def packs(self, entries: Iterable[tuple]) -> Iterator[list[tuple]]:
+        """Group ``(id, text, attempt, last error)`` entries into packs that fit the limits."""
+        overhead = self._tokens(self.prompt([]))
+        pack, used = [], overhead
+        for entry in entries:
+            if entry[2] + 1 >= self.max_attempts:
+                yield [entry]  # last attempt: on its own
+                continue
+            cost = self._tokens(str(entry[1])) + 3 + self._label_tokens
+            full = len(pack) >= self.pack_limit or used + cost + self._num_predict(1) > self.num_ctx
+            if pack and full:
+                yield pack
+                pack, used = [], overhead
+            pack.append(entry)
+            used += cost
+        if pack:
+            yield pack
+
+    def _call(self, pack: list[tuple]) -> list[str | None] | None:
+        texts = [entry[1] for entry in pack]
+        options = self.options | {"num_predict": self._num_predict(len(texts))}
+        return parse_labels(self._fn(self.prompt(texts), options), len(texts), self.labels)
+
+    def _settle(self, pack, labels, error: str | None, retries: deque) -> Iterator[ItemResult]:
+        if labels is None:
+            error = error or f"answer was not a JSON array of {len(pack)} labels"
+        with self._lock:
+            self.requests += 1
+            if labels is None:
+                self.pack_limit = max(1, self.pack_limit // 2)
+            elif all(labels):
+                self.pack_limit = min(self.max_items, self.pack_limit + 1)
+        for (item_id, text, attempt, _), label in zip(pack, labels or [None] * len(pack)):
+            reason = error or f"answer was not one of: {', '.join(self.labels)}"
+            if label is not None:
+                with self._lock:
+                    self.labelled += 1
+                yield ItemResult(item_id, text, value=label)
+            elif attempt + 1 < self.max_attempts:
+                with self._lock:
+                    self.requeued += 1
+                retries.append((item_id, text, attempt + 1, reason))
+            else:
+                with self._lock:
+                    self.failed += 1
+                yield ItemResult(item_id, text, error=f"no valid label after {self.max_attempts} attempts: {reason}")
+
+    def run(self, items: Iterable, key: Callable[[Any], Any] | None = None) -> Iterator[ItemResult]:
+        """Yield an ``ItemResult`` (``value`` = label) per item, as labels arrive.
+
+        Items are texts; ids come from ``key(item)``, else the position.
+        A request that raises counts as a malformed answer for its pack.
+        """
+        retries = deque()
+
+        def entries():
+            for index, item in enumerate(items):
+                with self._lock:
+                    self.items += 1
+                yield (key(item) if key else index, item, 0, None)
+
+        def feed(source):
+            for entry in source:
+                while len(retries) >= self.max_items:  # a full pack of retries goes before more input
+                    yield retries.popleft()
+                yield entry
+
+        pending = entries()
+        while True:
+            processor = BatchProcessor(self._call, window=self.window, concurrency=self.concurrency)
+            for result in processor.run(self.packs(feed(pending))):
+                yield from self._settle(result.item, result.value if result.ok else None, result.error, retries)
+            if not retries:
+                return
+            pending = [retries.popleft() for _ in range(len(retries))]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "items": self.items,
+                "requests": self.requests,
+                "labels_per_request": round(self.labelled / self.requests, 2) if self.requests else 0.0,
+                "labelled": self.labelled,
+                "requeued": self.requeued,
+                "failed": self.failed,
+                "pack_limit": self.pack_limit,
+                "num_ctx": self.num_ctx,
+            }
@@ -0,0 +1,181 @@
+"""Bounded-memory batch processing over any iterable of items.
+
+Submitting every item to an executor up front keeps one future (and, later,
+one result) per item alive until the batch ends, so memory grows with the
+input. ``BatchProcessor.run`` instead pulls items from the input lazily and
+keeps at most ``window`` of them between "taken from the input" and "handed
+to the caller": a slow consumer stops the input from being read
+(backpressure), and a million-row job holds ``window`` items at a time.
+
+Results are yielded as ``ItemResult`` objects, in completion order or, with
+``ordered=True``, in input order (items that finish early wait in the
+window). An exception raised for one item is captured in its result and the
+batch goes on.
+
+With a ``Journal`` (``lib.helper_batch.journal``), every result is appended
+to a JSONL file as it completes and items finished by an earlier run are
+skipped, so an interrupted job resumes where it stopped.
+
+With a ``concurrency`` controller (``lib.helper_batch.concurrency``), the
+number of items in flight follows the controller's limit, which adapts to
+measured throughput, latency and timeouts; ``window`` still bounds memory.
+
+Calls run on worker threads at ``bulk`` priority by default (see
+``lib.helper_ollama.scheduler``), so interactive requests are served first.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator
+
+from lib.helper_ollama import scheduler
+
+
+@dataclass
+class ItemResult:
+    """Outcome of one item: ``value`` on success, ``error`` (and ``exception``) on failure."""
+
+    id: Any
+    item: Any
+    value: Any = None
+    error: str | None = None
+    exception: BaseException | None = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class BatchProcessor:
+    """Run ``fn(item)`` over a stream of items with a bounded window."""
+
+    def __init__(
+        self,
+        fn: Callable[[Any], Any],
+        window: int = 8,
+        ordered: bool = False,
+        key: Callable[[Any], Any] | None = None,
+        priority: str | None = scheduler.BULK,
+        concurrency=None,
+    ):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.fn = fn
+        self.window = window
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self.key = key
+        self.priority = priority
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.max_pending = 0
+
+    def _call(self, item_id, item) -> ItemResult:
+        start = time.perf_counter()
+        try:
+            if self.priority:
+                with scheduler.priority(self.priority):
+                    value = self.fn(item)
+            else:
+                value = self.fn(item)
+            return ItemResult(item_id, item, value=value, seconds=time.perf_counter() - start)
+        except Exception as e:
+            return ItemResult(item_id, item, error=str(e) or type(e).__name__, exception=e, seconds=time.perf_counter() - start)
+
+    def _count(self, result: ItemResult):
+        with self._lock:
+            self.completed += 1
+            self.failed += not result.ok
+        if self.concurrency is not None:
+            self.concurrency.observe(result.seconds, result.value, result.exception)
+
+    def _in_flight_limit(self) -> int:
+        if self.concurrency is None:
+            return self.window
+        return min(self.window, self.concurrency.limit)
+
+    def run(self, items: Iterable, journal=None) -> Iterator[ItemResult]:
+        """Yield an ``ItemResult`` per item; at most ``window`` items are held at once.
+
+        Item ids come from ``key(item)``, else from the position in the input.
+        With ``journal``, items it already holds are skipped (not yielded)
+        and each result is recorded before it is yielded. Closing the
+        iterator early cancels items not yet started.
+        """
+        source = enumerate(items)
+        executor = ThreadPoolExecutor(max_workers=self.window, thread_name_prefix="batch")
+        running = {}   # future -> input position
+        finished = {}  # input position -> result, waiting for earlier ones (ordered mode)
+        taken = 0
+        next_position = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(running) < self._in_flight_limit() and len(running) + len(finished) < self.window:
+                    try:
+                        index, item = next(source)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    item_id = self.key(item) if self.key else index
+                    if journal is not None and journal.should_skip(item_id):
+                        with self._lock:
+                            self.skipped += 1
+                        continue
+                    running[executor.submit(self._call, item_id, item)] = taken
+                    taken += 1
+                    with self._lock:
+                        self.submitted += 1
+                        self.max_pending = max(self.max_pending, len(running) + len(finished))
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    position = running.pop(future)
+                    result = future.result()
+                    self._count(result)
+                    if journal is not None:
+                        journal.record(result)
+                    if self.ordered:
+                        finished[position] = result
+                    else:
+                        yield result
+                while next_position in finished:
+                    yield finished.pop(next_position)
+                    next_position += 1
+        finally:
+            for future in running:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+            if journal is not None:
+                journal.sync()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "window": self.window,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "skipped": self.skipped,
+                "max_pending": self.max_pending,
+            } | ({"concurrency": self.concurrency.stats()} if self.concurrency is not None else {})
+
+
+def prompt_fn(model: str, options: dict | None = None) -> Callable[[Any], str]:
+    """``fn`` for ``BatchProcessor`` that answers a prompt (or ``item['prompt']``) with ``model``."""
+    from lib.helper_ollama import client
+
+    def generate(item) -> str:
+        prompt = item["prompt"] if isinstance(item, dict) else item
+        return client.generate(model=model, prompt=prompt, options=options or {})["response"]
+
+    return generate
@@ -0,0 +1,240 @@
+"""Append-only, memory-mapped embedding cache.
+
+Each model gets two files in the cache directory:
+
+- ``<model>.f32``   raw float32 vectors, one row per cached text, only ever appended
+- ``<model>.keys``  one 16-byte key per row, in the same order
+
+The key is a hash of the model and the normalized text (Unicode NFC,
+collapsed whitespace). The keys file is read once into a dict from key to
+row, and vectors are read through ``numpy.memmap``, so a lookup costs a dict
+probe and a page-cache read whatever the cache size, instead of unpickling
+the whole cache.
+
+Vectors are written before their keys, so a crash can at worst leave a row
+without a key; on open both files are trimmed to the rows that are complete
+in both. Appends are serialised with an advisory file lock, so several
+processes can share a directory and pick up each other's rows.
+
+Settings: ``OLLAMA_EMBEDDING_CACHE_DIR`` (default ``.cache/embeddings``).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process locking only
+    fcntl = None
+
+KEY_BYTES = 16
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def make_key(model: str, text: str) -> bytes:
+    return hashlib.sha256(f"{model}\0{normalize(text)}".encode()).digest()[:KEY_BYTES]
+
+
+class _ModelStore:
+    """Vector and key files for one model."""
+
+    def __init__(self, directory: str, model: str):
+        slug = re.sub(r"[^A-Za-z0-9_.-]", "_", model)
+        self.model = model
+        self.vectors_path = os.path.join(directory, f"{slug}.f32")
+        self.keys_path = os.path.join(directory, f"{slug}.keys")
+        self.meta_path = os.path.join(directory, f"{slug}.json")
+        self.dim = None
+        self.rows = {}
+        self._count = 0
+        self._map = None
+        self._lock = threading.Lock()
+        if self._load_meta():
+            with self._file_lock():
+                self._repair()
+                self._refresh()
+
+    def _load_meta(self) -> bool:
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                self.dim = json.load(f)["dim"]
+        return self.dim is not None
+
+    # -- files --------------------------------------------------------------
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        with open(self.keys_path, "ab") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _complete_rows(self) -> int:
+        vector_rows = os.path.getsize(self.vectors_path) // (self.dim * 4) if os.path.exists(self.vectors_path) else 0
+        key_rows = os.path.getsize(self.keys_path) // KEY_BYTES if os.path.exists(self.keys_path) else 0
+        return min(vector_rows, key_rows)
+
+    def _repair(self):
+        """Trim a torn trailing write from either file."""
+        rows = self._complete_rows()
+        for path, width in ((self.vectors_path, self.dim * 4), (self.keys_path, KEY_BYTES)):
+            if os.path.exists(path) and os.path.getsize(path) != rows * width:
+                os.truncate(path, rows * width)
+
+    def _refresh(self):
+        """Index rows appended since the last look (by this or another process)."""
+        rows = self._complete_rows()
+        if rows <= self._count:
+            return
+        with open(self.keys_path, "rb") as f:
+            f.seek(self._count * KEY_BYTES)
+            data = f.read((rows - self._count) * KEY_BYTES)
+        for i in range(rows - self._count):
+            self.rows.setdefault(data[i * KEY_BYTES:(i + 1) * KEY_BYTES], self._count + i)
+        self._count = rows
+        self._map = None
+
+    def _vectors(self) -> np.ndarray:
+        if self._map is None:
+            self._map = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self._count, self.dim))
+        return self._map
+
+    # -- lookups and appends --------------------------------------------------
+
+    def get_many(self, keys: list) -> list:
+        with self._lock:
+            if self.dim is None and not self._load_meta():
+                return [None] * len(keys)
+            if any(k not in self.rows for k in keys):
+                self._refresh()
+            if not self._count:
+                return [None] * len(keys)
+            vectors = self._vectors()
+            return [vectors[self.rows[k]] if k in self.rows else None for k in keys]
+
+    def put_many(self, keys: list, vectors: np.ndarray):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            if not self._load_meta():
+                self.dim = int(vectors.shape[1])
+                tmp = f"{self.meta_path}.tmp"
+                with open(tmp, "w") as f:
+                    json.dump({"model": self.model, "dim": self.dim}, f)
+                os.replace(tmp, self.meta_path)
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"{self.model} vectors have {self.dim} dimensions, got {vectors.shape[1]}")
+            with self._file_lock():
+                self._repair()
+                self._refresh()
+                new = {}
+                for key, vector in zip(keys, vectors):
+                    if key not in self.rows and key not in new:
+                        new[key] = vector
+                if not new:
+                    return
+                with open(self.vectors_path, "ab") as f:
+                    f.write(np.stack(list(new.values())).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                with open(self.keys_path, "ab") as f:
+                    f.write(b"".join(new))
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._refresh()
+
+
+class EmbeddingCache:
+    """Embedding cache for any number of models in one directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._stores = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, model: str) -> _ModelStore:
+        with self._lock:
+            if model not in self._stores:
+                self._stores[model] = _ModelStore(self.directory, model)
+            return self._stores[model]
+
+    def get_many(self, model: str, texts: list) -> list:
+        """Cached vector (read-only view) or None for each of ``texts``."""
+        found = self._store(model).get_many([make_key(model, t) for t in texts])
+        with self._lock:
+            hits = sum(v is not None for v in found)
+            self.hits += hits
+            self.misses += len(found) - hits
+        return found
+
+    def put_many(self, model: str, texts: list, vectors):
+        """Append vectors for ``texts``; texts already cached are skipped."""
+        self._store(model).put_many([make_key(model, t) for t in texts], np.asarray(vectors))
+
+    def embed(self, model: str, texts: list, batch_size: int = 64) -> np.ndarray:
+        """Embeddings for ``texts`` as an ``(n, dim)`` array, computing only cache misses.
+
+        Misses are sent to ``ollama.embed`` in batches of ``batch_size``.
+        """
+        from lib.helper_ollama import client
+
+        found = self.get_many(model, texts)
+        missing = [i for i, v in enumerate(found) if v is None]
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            batch_texts = [texts[i] for i in batch]
+            vectors = np.asarray(client.embed(model=model, input=batch_texts)["embeddings"], dtype=np.float32)
+            self.put_many(model, batch_texts, vectors)
+            for i, vector in zip(batch, vectors):
+                found[i] = vector
+        if not found:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack(found)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stores = list(self._stores.values())
+            hits, misses = self.hits, self.misses
+        return {
+            "models": len(stores),
+            "vectors": sum(len(s.rows) for s in stores),
+            "bytes": sum(os.path.getsize(s.vectors_path) for s in stores if os.path.exists(s.vectors_path)),
+            "hits": hits,
+            "misses": misses,
+        }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache() -> EmbeddingCache:
+    """Return the process-wide cache for the configured directory."""
+    directory = os.getenv("OLLAMA_EMBEDDING_CACHE_DIR", os.path.join(".cache", "embeddings"))
+    with _caches_lock:
+        if directory not in _caches:
+            _caches[directory] = EmbeddingCache(directory)
+        return _caches[directory]
+
+
+def embed_cached(model: str, texts: list, batch_size: int = 64) -> np.ndarray:
+    """``EmbeddingCache.embed`` on the shared cache."""
+    return get_cache().embed(model, texts, batch_size)
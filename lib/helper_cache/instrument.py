@@ -0,0 +1,251 @@
+"""Instrumented ``st.cache_data`` / ``st.cache_resource`` decorators.
+
+Streamlit's caches do not report what they hold. ``cache_data`` and
+``cache_resource`` here are drop-in replacements for the Streamlit
+decorators (same options, bare or called) that count, per function and per
+worker process:
+
+- calls and hits (a call whose body did not run)
+- entries and their approximate size in bytes (pandas ``memory_usage``,
+  numpy ``nbytes``, else the pickled size)
+- compute time saved: for every hit, the time the body took when that entry
+  was computed
+- evictions: an argument set computed again after it had been cached (TTL
+  expiry, ``max_entries`` or a cleared cache)
+
+Entries evicted by Streamlit are only noticed when they are computed again,
+so entry counts and bytes are upper bounds.
+
+``report()`` gathers these with the stats of the ``lib.helper_cache`` stores
+and ``export_json()`` serialises it for the admin page.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+def approximate_size(value) -> int:
+    """Approximate in-memory size of a cached value in bytes."""
+    if hasattr(value, "memory_usage") and hasattr(value, "columns"):
+        return int(value.memory_usage(deep=True).sum())
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    try:
+        return len(pickle.dumps(value))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class CacheStats:
+    """Counters for one cached function."""
+
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind
+        self.calls = 0
+        self.hits = 0
+        self.evictions = 0
+        self.clears = 0
+        self.compute_seconds = 0.0
+        self.saved_seconds = 0.0
+        self._entries = {}      # argument key -> (bytes, compute seconds)
+        self._computed = set()  # every key computed since the last clear
+        self._lock = threading.Lock()
+
+    def record_miss(self, key: str, value, seconds: float):
+        size = approximate_size(value)
+        with self._lock:
+            if key in self._computed:
+                self.evictions += 1
+            self._computed.add(key)
+            self._entries[key] = (size, seconds)
+            self.compute_seconds += seconds
+
+    def record_call(self, key: str, computed: bool):
+        with self._lock:
+            self.calls += 1
+            if not computed:
+                self.hits += 1
+                self.saved_seconds += self._entries.get(key, (0, 0.0))[1]
+
+    def record_clear(self):
+        with self._lock:
+            self.clears += 1
+            self._entries.clear()
+            self._computed.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "kind": self.kind,
+                "calls": self.calls,
+                "hits": self.hits,
+                "hit_ratio": round(self.hits / self.calls, 3) if self.calls else 0.0,
+                "entries": len(self._entries),
+                "bytes": sum(size for size, _ in self._entries.values()),
+                "compute_seconds": round(self.compute_seconds, 3),
+                "saved_seconds": round(self.saved_seconds, 3),
+                "evictions": self.evictions,
+                "clears": self.clears,
+            }
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _stats_for(name: str, kind: str) -> CacheStats:
+    # Pages redefine their cached functions on every rerun; the counters are
+    # kept by name so they add up across reruns, like Streamlit's cache does.
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = CacheStats(name, kind)
+        return _registry[name]
+
+
+def _value_digest(value) -> bytes:
+    # Hash the content, not ``repr``: pandas and numpy abbreviate large values,
+    # so different frames or arrays would share a key.
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        try:
+            digest = hashlib.sha256(pd.util.hash_pandas_object(value).values.tobytes())
+            layout = value.dtypes.items() if isinstance(value, pd.DataFrame) else [(getattr(value, "name", None), value.dtype)]
+            digest.update(repr([type(value).__name__, [(name, str(dtype)) for name, dtype in layout]]).encode())
+            return digest.digest()
+        except TypeError:
+            pass  # unhashable cells (lists, dicts): pickled below
+    elif isinstance(value, np.ndarray) and value.dtype != object:
+        digest = hashlib.sha256(repr((value.dtype.str, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+        return digest.digest()
+    try:
+        return hashlib.sha256(pickle.dumps(value)).digest()
+    except Exception:
+        return repr(value).encode()
+
+
+def _argument_key(signature: inspect.Signature, args: tuple, kwargs: dict) -> str:
+    # Like Streamlit, parameters starting with "_" are not part of the key.
+    try:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        items = [(k, v) for k, v in bound.arguments.items() if not k.startswith("_")]
+    except TypeError:
+        items = list(enumerate(args)) + sorted(kwargs.items())
+    digest = hashlib.sha256()
+    for name, value in items:
+        digest.update(repr(name).encode())
+        digest.update(_value_digest(value))
+    return digest.hexdigest()
+
+
+def _instrument(decorator, kind: str, func, options: dict):
+    if func is None:
+        return lambda f: _instrument(decorator, kind, f, options)
+
+    name = f"{os.path.basename(func.__code__.co_filename)}:{func.__qualname__}"
+    stats = _stats_for(name, kind)
+    signature = inspect.signature(func)
+    local = threading.local()
+
+    @functools.wraps(func)
+    def compute(*args, **kwargs):
+        start = time.perf_counter()
+        value = func(*args, **kwargs)
+        stats.record_miss(local.key, value, time.perf_counter() - start)
+        local.computed = True
+        return value
+
+    cached = decorator(**options)(compute) if options else decorator(compute)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = _argument_key(signature, args, kwargs)  # once per call; ``compute`` runs on this thread
+        local.computed, local.key = False, key
+        value = cached(*args, **kwargs)
+        stats.record_call(key, local.computed)
+        return value
+
+    def clear(*args, **kwargs):
+        cached.clear(*args, **kwargs)
+        stats.record_clear()
+
+    wrapper.clear = clear
+    wrapper.stats = stats
+    return wrapper
+
+
+def cache_data(func=None, **options):
+    """``st.cache_data`` with hit, size and time-saved counters."""
+    return _instrument(st.cache_data, "data", func, options)
+
+
+def cache_resource(func=None, **options):
+    """``st.cache_resource`` with hit, size and time-saved counters."""
+    return _instrument(st.cache_resource, "resource", func, options)
+
+
+def clear_all():
+    """``st.cache_data.clear()`` and reset the entry counts it invalidates."""
+    st.cache_data.clear()
+    with _registry_lock:
+        stats = [s for s in _registry.values() if s.kind == "data"]
+    for s in stats:
+        s.record_clear()
+
+
+def snapshot() -> list[dict]:
+    """Counters for every instrumented function in this process, by name."""
+    with _registry_lock:
+        stats = sorted(_registry.values(), key=lambda s: s.name)
+    return [s.snapshot() for s in stats]
+
+
+def store_stats() -> dict:
+    """Stats of the response, embedding, semantic and vision caches in ``lib.helper_cache``."""
+    from lib.helper_cache import embeddings, semantic, tiered, vision
+
+    stores = {}
+    try:
+        cache = tiered.get_cache()
+        stores["responses"] = cache.stats() if cache is not None else None
+    except Exception as e:
+        stores["responses"] = {"error": str(e)}
+    stores["embeddings"] = embeddings.get_cache().stats()
+    stores["semantic"] = semantic.get_cache().stats()
+    stores["vision"] = vision.get_cache().stats()
+    return stores
+
+
+def report() -> dict:
+    """Everything the admin page shows: functions, stores, process and time."""
+    functions = snapshot()
+    return {
+        "pid": os.getpid(),
+        "generated_at": time.time(),
+        "functions": functions,
+        "totals": {
+            "bytes": sum(f["bytes"] for f in functions),
+            "saved_seconds": round(sum(f["saved_seconds"] for f in functions), 3),
+        },
+        "stores": store_stats(),
+    }
+
+
+def export_json(data: dict | None = None, indent: int | None = 2) -> str:
+    """``data`` (default: a fresh ``report()``) as JSON."""
+    return json.dumps(data if data is not None else report(), indent=indent, default=str)
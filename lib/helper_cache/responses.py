@@ -0,0 +1,273 @@
+"""Persistent cache for deterministic model responses, stored in SQLite.
+
+Only deterministic calls (temperature 0 or a fixed seed) are cached: the
+same model weights, prompt and options give the same answer, so it can be
+served from disk in milliseconds, across restarts and across worker
+processes sharing the file. Keys include the requested model name and its
+digest, so pulling a new version of a model naturally misses and two tags
+of one model never share answers.
+
+Entries expire after ``ttl`` seconds; when the stored answers exceed
+``max_bytes``, the least recently used are evicted. The stored size is a
+running total updated with each write, so ``put`` never sums the table.
+Hit and miss counts are kept in the database, so they add up over all
+processes. A hit is only a read: its access time and the counts are
+buffered and written in one transaction every ``flush_every`` lookups or
+``flush_interval`` seconds, before each ``put`` and on ``stats``.
+
+Settings: ``OLLAMA_RESPONSE_CACHE_PATH`` (default
+``.cache/ollama_responses.sqlite3``), ``OLLAMA_RESPONSE_CACHE_MB`` (256),
+``OLLAMA_RESPONSE_CACHE_TTL`` (seconds, default 7 days) and
+``OLLAMA_RESPONSE_CACHE=0`` to turn it off.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def make_key(model: str, digest: str, prompt, options: dict | None, endpoint: str = "generate") -> str:
+    """Canonical hash of a model name and digest, prompt (or messages) and options."""
+    canonical = json.dumps([endpoint, model, digest, prompt, options or {}], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResponseCache:
+    """Size-bounded LRU response store with a TTL, safe across threads and processes."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 256 * 1024**2,
+        ttl: float = 7 * 24 * 3600,
+        flush_every: int = 64,
+        flush_interval: float = 5.0,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._touched = {}                       # key -> last hit time, not yet written
+        self._pending = {"hits": 0, "misses": 0}
+        self._flushed = time.monotonic()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        db = self._db()
+        db.executescript(_SCHEMA)
+        with db:
+            # Stored bytes are kept as a running total; files written before it existed are summed once.
+            db.execute(
+                "INSERT OR IGNORE INTO counters (name, value) "
+                "SELECT 'bytes', COALESCE(SUM(size), 0) FROM responses"
+            )
+
+    def _db(self) -> sqlite3.Connection:
+        # sqlite3 connections belong to one thread; each thread opens its own.
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _count(self, db: sqlite3.Connection, name: str, n: int = 1):
+        db.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, n),
+        )
+
+    def get(self, key: str):
+        """Stored value for ``key``, or None when missing or expired."""
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> tuple | None:
+        """``(value, created)`` for ``key``, or None when missing or expired.
+
+        A hit is a read only: its access time and the hit count are written
+        with the next batch (see ``flush``).
+        """
+        db = self._db()
+        now = time.time()
+        row = db.execute("SELECT value, created, size FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is not None and now - row[1] > self.ttl:
+            with db:
+                if db.execute("DELETE FROM responses WHERE key = ? AND created = ?", (key, row[1])).rowcount:
+                    self._count(db, "bytes", -row[2])
+            row = None
+        with self._lock:
+            if row is None:
+                self._pending["misses"] += 1
+            else:
+                self._touched[key] = now
+                self._pending["hits"] += 1
+            due = (
+                sum(self._pending.values()) >= self.flush_every
+                or time.monotonic() - self._flushed >= self.flush_interval
+            )
+        if due:
+            self.flush()
+        return (json.loads(row[0]), row[1]) if row is not None else None
+
+    def _take_pending(self) -> tuple[dict, dict]:
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            pending, self._pending = self._pending, {"hits": 0, "misses": 0}
+            self._flushed = time.monotonic()
+        return touched, pending
+
+    def flush(self):
+        """Write buffered access times and hit/miss counts in one transaction."""
+        touched, pending = self._take_pending()
+        if not touched and not any(pending.values()):
+            return
+        db = self._db()
+        with db:
+            self._write_pending(db, touched, pending)
+
+    def _write_pending(self, db: sqlite3.Connection, touched: dict, pending: dict):
+        # max(): a hit buffered before a newer put must not make the entry look older.
+        db.executemany(
+            "UPDATE responses SET accessed = max(accessed, ?) WHERE key = ?",
+            [(at, key) for key, at in touched.items()],
+        )
+        for name, n in pending.items():
+            if n:
+                self._count(db, name, n)
+
+    def put(self, key: str, value):
+        """Store ``value`` (JSON-serialisable) and evict LRU entries over the size limit."""
+        data = json.dumps(value)
+        now = time.time()
+        db = self._db()
+        touched, pending = self._take_pending()
+        with db:
+            # IMMEDIATE: the old size read below must be the one this write replaces.
+            db.execute("BEGIN IMMEDIATE")
+            self._write_pending(db, touched, pending)  # eviction needs current access times
+            old = db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now),
+            )
+            self._count(db, "bytes", len(data) - (old[0] if old else 0))
+            self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection):
+        total = db.execute("SELECT value FROM counters WHERE name = 'bytes'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted, freed = 0, 0
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+            if total - freed <= self.max_bytes:
+                break
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            freed += size
+            evicted += 1
+        self._count(db, "bytes", -freed)
+        self._count(db, "evictions", evicted)
+
+    def clear(self):
+        self._take_pending()
+        with self._db() as db:
+            db.execute("DELETE FROM responses")
+            db.execute("DELETE FROM counters")
+            db.execute("INSERT INTO counters (name, value) VALUES ('bytes', 0)")
+
+    def stats(self) -> dict:
+        """Entry count, stored bytes and hit/miss/eviction counters."""
+        self.flush()
+        db = self._db()
+        entries = db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        counters = dict(db.execute("SELECT name, value FROM counters").fetchall())
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "entries": entries,
+            "bytes": counters.get("bytes", 0),
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+        }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache | None:
+    """Return the process-wide cache for the configured path (None if disabled)."""
+    if os.getenv("OLLAMA_RESPONSE_CACHE", "1") == "0":
+        return None
+    path = os.getenv("OLLAMA_RESPONSE_CACHE_PATH", os.path.join(".cache", "ollama_responses.sqlite3"))
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = ResponseCache(
+                path,
+                max_bytes=int(float(os.getenv("OLLAMA_RESPONSE_CACHE_MB", 256)) * 1024**2),
+                ttl=float(os.getenv("OLLAMA_RESPONSE_CACHE_TTL", 7 * 24 * 3600)),
+            )
+        return cache
+
+
+@atexit.register
+def _flush_caches():
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.flush()
+
+
+_digests = {}
+_digests_checked = float("-inf")
+_digests_lock = threading.Lock()
+
+
+def model_digest(model: str, max_age: float = 60.0) -> str | None:
+    """Digest of the installed ``model`` (refreshed from ``/api/tags`` at most every ``max_age`` s).
+
+    A name without a tag means ``:latest``, as in Ollama; it never falls
+    back to another tag of the same model.
+    """
+    global _digests, _digests_checked
+    from lib.helper_ollama import client
+
+    with _digests_lock:
+        age = time.monotonic() - _digests_checked
+        if age > max_age or (model not in _digests and age > 5):
+            models = client.list_models()["models"]
+            _digests = {}
+            for m in models:
+                _digests[m["model"]] = m["digest"]
+                name, _, tag = m["model"].partition(":")
+                if tag == "latest":
+                    _digests[name] = m["digest"]
+            _digests_checked = time.monotonic()
+        return _digests.get(model)
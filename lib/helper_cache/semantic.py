@@ -0,0 +1,138 @@
+"""Semantic answer cache: reuse answers to paraphrased questions.
+
+FAQ-style traffic is mostly the same few questions worded differently. Each
+answered question is stored with its embedding under a *scope*, a hash of
+everything else that shapes the answer (knowledge base, instructions,
+model). A new question in the same scope whose cosine similarity to a stored
+one reaches ``threshold`` gets the stored answer without a generation.
+
+Changing the knowledge base changes the scope, so old answers stop matching
+at once; only the ``max_scopes`` most recently used scopes are kept.
+
+Settings: ``OLLAMA_SEMANTIC_EMBED_MODEL`` (default ``nomic-embed-text``) and
+``OLLAMA_SEMANTIC_THRESHOLD`` (default 0.92).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def scope(*parts) -> str:
+    """Hash of the inputs besides the question that determine an answer."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+class _Scope:
+    def __init__(self, dim: int):
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.questions = []
+        self.answers = []
+
+
+class SemanticCache:
+    """Per-scope store of (question embedding, answer) pairs."""
+
+    def __init__(self, threshold: float = 0.92, embed_model: str = "nomic-embed-text", max_scopes: int = 32, embed=None):
+        self.threshold = threshold
+        self.embed_model = embed_model
+        self.max_scopes = max_scopes
+        self._embed = embed or self._ollama_embed
+        self._scopes = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _ollama_embed(self, text: str):
+        from lib.helper_ollama import client
+
+        return client.embed(model=self.embed_model, input=text)["embeddings"][0]
+
+    def _vector(self, question: str) -> np.ndarray:
+        vector = np.asarray(self._embed(question.strip()), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, scope_key: str, vector: np.ndarray):
+        """Best stored ``(question, answer, similarity)`` at or above the threshold, else None."""
+        with self._lock:
+            entry = self._scopes.get(scope_key)
+            if entry is None or not entry.answers or entry.vectors.shape[1] != vector.shape[0]:
+                return None
+            self._scopes.move_to_end(scope_key)
+            similarities = entry.vectors @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            return entry.questions[best], entry.answers[best], float(similarities[best])
+
+    def store(self, scope_key: str, question: str, vector: np.ndarray, answer: str):
+        with self._lock:
+            entry = self._scopes.get(scope_key)
+            if entry is None or entry.vectors.shape[1] != vector.shape[0]:
+                entry = self._scopes[scope_key] = _Scope(vector.shape[0])
+            self._scopes.move_to_end(scope_key)
+            entry.vectors = np.vstack([entry.vectors, vector])
+            entry.questions.append(question)
+            entry.answers.append(answer)
+            while len(self._scopes) > self.max_scopes:
+                self._scopes.popitem(last=False)
+
+    def get_or_generate(self, scope_key: str, question: str, generate) -> dict:
+        """Answer ``question`` from the cache, or with ``generate()`` and remember it.
+
+        Returns ``{'answer', 'cached', 'similarity', 'matched_question'}``. If
+        the question cannot be embedded (e.g. the embedding model is not
+        installed), the answer is generated and not cached.
+        """
+        try:
+            vector = self._vector(question)
+        except Exception:
+            vector = None
+
+        match = self.lookup(scope_key, vector) if vector is not None else None
+        with self._lock:
+            if match:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if match:
+            matched_question, answer, similarity = match
+            return {"answer": answer, "cached": True, "similarity": similarity, "matched_question": matched_question}
+
+        answer = generate()
+        if vector is not None:
+            self.store(scope_key, question, vector, answer)
+        return {"answer": answer, "cached": False, "similarity": None, "matched_question": None}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "scopes": len(self._scopes),
+                "entries": sum(len(s.answers) for s in self._scopes.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "threshold": self.threshold,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> SemanticCache:
+    """Return the process-wide semantic cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticCache(
+                threshold=float(os.getenv("OLLAMA_SEMANTIC_THRESHOLD", 0.92)),
+                embed_model=os.getenv("OLLAMA_SEMANTIC_EMBED_MODEL", "nomic-embed-text"),
+            )
+        return _cache
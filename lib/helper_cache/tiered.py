@@ -0,0 +1,170 @@
+"""Two-tier response cache: a per-process LRU in front of the shared SQLite store.
+
+Several Streamlit processes behind a proxy share one SQLite file (see
+``responses``), so an answer generated by one worker is free for the others.
+Each process also keeps the answers it used recently in a small in-memory
+LRU bounded in bytes, so repeated hits skip SQLite and JSON decoding
+altogether. Lookups try memory, then the shared store; store hits are
+promoted into memory.
+
+The shared store is bounded and evicts least-recently-used entries for all
+workers; the memory tier only holds copies, bounded per process. Memory
+entries expire with the store's TTL, and ``clear`` empties both tiers of this
+process (other workers drop their copies by LRU or TTL).
+
+The text helpers (``lib.helper_text.generator``) and the chatbot's
+conversations (``lib.helper_chat.conversation``) use ``key_for``, ``lookup``
+and ``store``; only deterministic calls (temperature 0 or a fixed seed) are cached.
+
+Settings: those of ``responses`` plus ``OLLAMA_RESPONSE_CACHE_MEMORY_MB``
+(per-process memory tier, default 16; 0 turns the tier off).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from lib.helper_cache import responses
+from lib.helper_ollama import singleflight
+
+
+class MemoryTier:
+    """Thread-safe LRU of JSON strings, bounded by their total size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (data, stored_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, ttl: float):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[1] > ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, data: str, stored_at: float | None = None):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (data, stored_at or time.time())
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: str):
+        data, _ = self._entries.pop(key)
+        self._bytes -= len(data)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_entries": len(self._entries),
+                "memory_bytes": self._bytes,
+                "memory_max_bytes": self.max_bytes,
+                "memory_hits": self.hits,
+                "memory_misses": self.misses,
+                "memory_evictions": self.evictions,
+            }
+
+
+class TieredCache:
+    """``MemoryTier`` in front of a ``ResponseCache``; same ``get``/``put`` interface."""
+
+    def __init__(self, store: responses.ResponseCache, memory_bytes: int = 16 * 1024**2):
+        self.store = store
+        self.memory = MemoryTier(memory_bytes)
+
+    def get(self, key: str):
+        data = self.memory.get(key, self.store.ttl)
+        if data is not None:
+            return json.loads(data)
+        entry = self.store.get_entry(key)
+        if entry is None:
+            return None
+        value, created = entry
+        self.memory.put(key, json.dumps(value), stored_at=created)  # expires when the row does
+        return value
+
+    def put(self, key: str, value):
+        self.store.put(key, value)
+        self.memory.put(key, json.dumps(value))
+
+    def clear(self):
+        self.memory.clear()
+        self.store.clear()
+
+    def stats(self) -> dict:
+        """Shared-store stats (all processes) plus this process's memory tier."""
+        return self.store.stats() | self.memory.stats()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache() -> TieredCache | None:
+    """Return the process-wide two-tier cache over ``responses.get_cache()`` (None if disabled)."""
+    store = responses.get_cache()
+    if store is None:
+        return None
+    with _caches_lock:
+        cache = _caches.get(store.path)
+        if cache is None:
+            memory_bytes = int(float(os.getenv("OLLAMA_RESPONSE_CACHE_MEMORY_MB", 16)) * 1024**2)
+            cache = _caches[store.path] = TieredCache(store, memory_bytes)
+        return cache
+
+
+def key_for(model: str, request, options: dict, endpoint: str = "generate") -> str | None:
+    """Cache key for a deterministic call (``request`` is the prompt or messages); None if not cacheable."""
+    if not singleflight.is_deterministic(options) or get_cache() is None:
+        return None
+    try:
+        digest = responses.model_digest(model)
+    except Exception:
+        return None  # server unreachable; the call itself will report it
+    return responses.make_key(model, digest, request, options, endpoint) if digest else None
+
+
+def lookup(key: str | None):
+    """Cached value for ``key`` (None for no key, a miss or a database error)."""
+    if key is None:
+        return None
+    try:
+        return get_cache().get(key)
+    except sqlite3.Error:
+        return None
+
+
+def store(key: str | None, value):
+    """Cache ``value`` under ``key``; database errors are ignored."""
+    if key is None:
+        return
+    try:
+        get_cache().put(key, value)
+    except sqlite3.Error:
+        pass
@@ -0,0 +1,213 @@
+"""Content-addressed cache for vision-model answers.
+
+Uploading the same image again with the same question would otherwise
+resize, re-encode and send the whole image to the vision model each time.
+Images are identified by the SHA-256 of their bytes; the preprocessed image
+(downscaled to ``max_side`` and re-encoded as JPEG) is kept on disk under
+that hash, and answers are stored per (image, question, model).
+
+Optionally (``perceptual=True``, off by default), an image whose bytes are
+new but whose difference hash (dHash) is within ``max_distance`` bits of a
+known image (the same picture re-encoded, resized or re-saved) is treated
+as that image, so it reuses its preprocessed bytes and answers. Distinct
+but similar images (screenshots, documents, charts) can collide at that
+distance and get another image's answer, so results report
+``perceptual_match`` whenever the image was matched this way.
+
+Layout of the cache directory:
+
+- ``images/<sha256>.jpg``  preprocessed images, written once
+- ``index.sqlite3``        image hashes and answers (WAL, shared by processes)
+
+Settings: ``OLLAMA_VISION_CACHE_DIR`` (default ``.cache/vision``) and
+``OLLAMA_VISION_PERCEPTUAL`` (``1`` to enable perceptual matching).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    sha TEXT PRIMARY KEY,
+    canonical TEXT NOT NULL,
+    phash INTEGER
+);
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    answer TEXT NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def perceptual_hash(data: bytes) -> int:
+    """64-bit difference hash: brightness gradients of a 9x8 grayscale thumbnail."""
+    from PIL import Image
+
+    pixels = Image.open(io.BytesIO(data)).convert("L").resize((9, 8)).tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return bits - (1 << 63)  # signed, to fit an SQLite INTEGER
+
+
+def preprocess(data: bytes, max_side: int = 1024, quality: int = 90) -> bytes:
+    """Downscale to at most ``max_side`` pixels and re-encode as JPEG."""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(data)).convert("RGB")
+    image.thumbnail((max_side, max_side))
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=quality)
+    return out.getvalue()
+
+
+class VisionCache:
+    """Preprocessed images and answers keyed on image content, question and model."""
+
+    def __init__(self, directory: str, perceptual: bool = False, max_distance: int = 4, max_side: int = 1024, chat=None):
+        self.directory = directory
+        self.perceptual = perceptual
+        self.max_distance = max_distance
+        self.max_side = max_side
+        self._chat = chat or self._ollama_chat
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.images_reused = 0
+        os.makedirs(os.path.join(directory, "images"), exist_ok=True)
+        self._db().executescript(_SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(os.path.join(self.directory, "index.sqlite3"), timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _image_path(self, canonical: str) -> str:
+        return os.path.join(self.directory, "images", f"{canonical}.jpg")
+
+    @staticmethod
+    def _ollama_chat(model: str, question: str, image: bytes) -> str:
+        from lib.helper_ollama import client
+
+        response = client.chat(model=model, messages=[{"role": "user", "content": question, "images": [image]}])
+        return response["message"]["content"]
+
+    def image(self, data: bytes) -> tuple[str, bytes, bool]:
+        """``(canonical hash, preprocessed bytes, reused)`` for uploaded image ``data``."""
+        sha = content_hash(data)
+        db = self._db()
+        row = db.execute("SELECT canonical FROM images WHERE sha = ?", (sha,)).fetchone()
+        if row is None and self.perceptual:
+            phash = perceptual_hash(data)
+            row = self._similar(db, phash)
+            with db:
+                db.execute(
+                    "INSERT OR IGNORE INTO images (sha, canonical, phash) VALUES (?, ?, ?)",
+                    (sha, row[0] if row else sha, phash),
+                )
+        if row is not None and os.path.exists(self._image_path(row[0])):
+            with open(self._image_path(row[0]), "rb") as f:
+                return row[0], f.read(), True
+
+        canonical = row[0] if row is not None else sha
+        processed = preprocess(data, self.max_side)
+        tmp = f"{self._image_path(canonical)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(processed)
+        os.replace(tmp, self._image_path(canonical))
+        with db:
+            db.execute("INSERT OR IGNORE INTO images (sha, canonical) VALUES (?, ?)", (sha, canonical))
+        return canonical, processed, False
+
+    def _similar(self, db: sqlite3.Connection, phash: int):
+        best = None
+        for canonical, other in db.execute("SELECT canonical, phash FROM images WHERE phash IS NOT NULL AND sha = canonical"):
+            distance = ((phash ^ other) & (2**64 - 1)).bit_count()
+            if distance <= self.max_distance and (best is None or distance < best[1]):
+                best = (canonical, distance)
+        return (best[0],) if best else None
+
+    @staticmethod
+    def answer_key(canonical: str, question: str, model: str) -> str:
+        return hashlib.sha256(json.dumps([canonical, " ".join(question.split()), model]).encode()).hexdigest()
+
+    def analyze(self, data: bytes, question: str, model: str = "llava") -> dict:
+        """Answer ``question`` about image ``data``, from the cache when possible.
+
+        Returns ``{'answer', 'cached', 'image_reused', 'image_key', 'perceptual_match'}``;
+        ``perceptual_match`` is true when the image was matched to a different
+        (similar-looking) upload rather than identical bytes.
+        """
+        canonical, image, reused = self.image(data)
+        similar = canonical != content_hash(data)
+        key = self.answer_key(canonical, question, model)
+        db = self._db()
+        row = db.execute("SELECT answer FROM answers WHERE key = ?", (key,)).fetchone()
+        with self._lock:
+            self.images_reused += reused
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if row:
+            return {"answer": row[0], "cached": True, "image_reused": reused, "image_key": canonical, "perceptual_match": similar}
+
+        answer = self._chat(model, question, image)
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO answers (key, answer, created) VALUES (?, ?, ?)",
+                (key, answer, time.time()),
+            )
+        return {"answer": answer, "cached": False, "image_reused": reused, "image_key": canonical, "perceptual_match": similar}
+
+    def stats(self) -> dict:
+        db = self._db()
+        images = db.execute("SELECT COUNT(DISTINCT canonical) FROM images").fetchone()[0]
+        answers = db.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        image_dir = os.path.join(self.directory, "images")
+        size = sum(os.path.getsize(os.path.join(image_dir, f)) for f in os.listdir(image_dir))
+        with self._lock:
+            return {
+                "images": images,
+                "image_bytes": size,
+                "answers": answers,
+                "hits": self.hits,
+                "misses": self.misses,
+                "images_reused": self.images_reused,
+            }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache() -> VisionCache:
+    """Return the process-wide cache for the configured directory."""
+    directory = os.getenv("OLLAMA_VISION_CACHE_DIR", os.path.join(".cache", "vision"))
+    perceptual = os.getenv("OLLAMA_VISION_PERCEPTUAL", "0") == "1"
+    with _caches_lock:
+        if (directory, perceptual) not in _caches:
+            _caches[(directory, perceptual)] = VisionCache(directory, perceptual=perceptual)
+        return _caches[(directory, perceptual)]
+
+
+def analyze_cached(data: bytes, question: str, model: str = "llava") -> dict:
+    """``VisionCache.analyze`` on the shared cache."""
+    return get_cache().analyze(data, question, model)
@@ -0,0 +1,122 @@
+"""Incremental multi-turn chat that keeps the server's context between turns.
+
+Re-sending the whole message list each turn makes the server re-evaluate
+the full history, so prompt evaluation grows with the conversation.
+``Conversation`` instead uses ``generate`` with the ``context`` returned by
+the previous turn: the server already holds those tokens, and only the new
+user message is evaluated, keeping ``prompt_eval_count`` flat per turn.
+
+The stored context is only valid for the model and system prompt that
+produced it and for the exact history it covers. When any of these change
+(another model is picked, the system prompt is edited, the chat is cleared
+or edited), the next turn resends the earlier history once as a transcript
+and incremental turns resume from there.
+
+Turns go through the shared path: identical concurrent requests (including
+streams) share one upstream call (``singleflight``), and at temperature 0
+answers come from the two-tier response cache (``tiered``) when possible,
+with their context, so the conversation continues from a cached turn too.
+"""
+
+from __future__ import annotations
+
+from lib.helper_cache import tiered
+from lib.helper_ollama import singleflight
+from lib.helper_ollama.scheduler import INTERACTIVE
+
+_CACHED_FIELDS = ("model", "context", "total_duration", "prompt_eval_count", "eval_count", "eval_duration")
+
+
+def _transcript(history: list[dict], content: str) -> str:
+    lines = [f"{m['role'].capitalize()}: {m['content']}" for m in history]
+    return "Conversation so far:\n" + "\n\n".join(lines) + f"\n\nUser: {content}"
+
+
+def _cacheable(response, answer: str) -> dict:
+    """JSON-friendly copy of a final ``generate`` response, with the full answer."""
+    return {f: response.get(f) for f in _CACHED_FIELDS} | {"response": answer, "done": True}
+
+
+class Conversation:
+    """One chat session's server-side context and per-turn prompt-eval counts."""
+
+    def __init__(self):
+        self.model = None
+        self.system_prompt = None
+        self.context = None
+        self.history = []          # the messages ``context`` covers
+        self.prompt_eval_counts = []
+        self.resends = 0
+
+    def _is_current(self, model: str, system_prompt: str | None, history: list[dict]) -> bool:
+        return (
+            self.context is not None
+            and model == self.model
+            and system_prompt == self.system_prompt
+            and [(m["role"], m["content"]) for m in history] == [(m["role"], m["content"]) for m in self.history]
+        )
+
+    def reply(
+        self,
+        model: str,
+        history: list[dict],
+        content: str,
+        system_prompt: str | None = None,
+        temperature: float = 0.7,
+        stream: bool = False,
+    ):
+        """Answer ``content`` after ``history`` (the earlier user/assistant messages).
+
+        Returns the ``generate`` response, or an iterator of its chunks when
+        ``stream`` is true (a cached answer is then one chunk); the context is
+        updated once the answer is complete.
+        """
+        request = {"model": model, "options": {"temperature": temperature}, "priority": INTERACTIVE}
+        if self._is_current(model, system_prompt, history):
+            request.update(prompt=content, context=self.context)
+        else:
+            # Start over: system prompt plus any earlier turns as one prompt.
+            if history:
+                self.resends += 1
+            request.update(prompt=_transcript(history, content) if history else content)
+            if system_prompt:
+                request["system"] = system_prompt
+
+        done = {"model": model, "system_prompt": system_prompt, "history": list(history), "content": content}
+        sent = {k: request[k] for k in ("prompt", "context", "system") if k in request}
+        key = tiered.key_for(model, sent, request["options"])
+        cached = tiered.lookup(key)
+        if cached is not None:
+            self._finish(cached, cached["response"], done, evaluated=0)
+            return iter([cached]) if stream else cached
+
+        if stream:
+            return self._stream(singleflight.generate(stream=True, **request), done, key)
+        response = singleflight.generate(**request)
+        self._finish(response, response["response"], done)
+        tiered.store(key, _cacheable(response, response["response"]))
+        return response
+
+    def _stream(self, chunks, done: dict, key: str | None):
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk.get("response") or "")
+            if chunk.get("done"):
+                self._finish(chunk, "".join(parts), done)
+                tiered.store(key, _cacheable(chunk, "".join(parts)))
+            yield chunk
+
+    def _finish(self, response, answer: str, done: dict, evaluated: int | None = None):
+        self.model = done["model"]
+        self.system_prompt = done["system_prompt"]
+        self.context = response.get("context")
+        self.history = done["history"] + [
+            {"role": "user", "content": done["content"]},
+            {"role": "assistant", "content": answer},
+        ]
+        if evaluated is None:
+            evaluated = response.get("prompt_eval_count") or 0
+        self.prompt_eval_counts.append(evaluated)
+
+    def reset(self):
+        self.__init__()
@@ -0,0 +1,16 @@
+"""Chat helpers used by the chatbot mini app.
+
+Chat turns themselves go through ``lib.helper_chat.conversation.Conversation``
+(server-side context, single-flight and the response cache).
+"""
+
+from __future__ import annotations
+
+
+def prepare_chat_messages(messages: list[dict], system_prompt: str | None = None) -> list[dict]:
+    """Return the message list to send, with ``system_prompt`` prepended."""
+    prepared = []
+    if system_prompt:
+        prepared.append({"role": "system", "content": system_prompt})
+    prepared.extend({"role": m["role"], "content": m["content"]} for m in messages)
+    return prepared
@@ -0,0 +1,29 @@
+"""Shared Ollama call path for pages and ``lib`` helpers."""
+
+from lib.helper_ollama.client import (
+    ClientSettings,
+    breaker_state,
+    chat,
+    create_client,
+    embed,
+    embeddings,
+    generate,
+    get_client,
+    list_models,
+    ps,
+    show,
+)
+
+__all__ = [
+    "ClientSettings",
+    "breaker_state",
+    "chat",
+    "create_client",
+    "embed",
+    "embeddings",
+    "generate",
+    "get_client",
+    "list_models",
+    "ps",
+    "show",
+]
@@ -0,0 +1,187 @@
+"""Asyncio facade over the shared Ollama settings.
+
+``agenerate``/``achat``/``aembed`` run on whatever event loop awaits them,
+using one pooled ``ollama.AsyncClient`` per loop and host. They go through
+the same stages as the synchronous client, sharing its process-wide state:
+
+- the negative cache (known missing models and unreachable hosts fail fast);
+- host routing and outstanding-request counts (``hostpool``);
+- the host/model governor and the priority scheduler;
+- the host/model circuit breaker and its adaptive timeout (``breaker.acall``;
+  a timed-out request is cancelled, not left running);
+- model residency tracking for the pre-warmer (``residency``).
+
+Two stages are not applied here: hedging (the pool only hedges sync calls)
+and streaming (``stream=True`` is rejected; use the sync client).
+Single-flight coalescing is opt-in as in the sync API, through
+``singleflight.agenerate``/``singleflight.achat``.
+
+``agather_many`` runs many awaitables with bounded concurrency, so
+thousands of outstanding requests cost one task each instead of one OS
+thread each.
+
+Streamlit scripts should not run their own event loop; they hand coroutines
+to the process-wide background loop with ``submit`` and get back a
+``concurrent.futures.Future`` they can poll, wait on or cancel.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+import weakref
+from dataclasses import replace
+from typing import Awaitable, Iterable
+
+from lib.helper_cache import instrument
+from lib.helper_ollama import negative, residency
+from lib.helper_ollama.breaker import get_breaker
+from lib.helper_ollama.client import ClientSettings, http_options
+from lib.helper_ollama.governor import get_governor
+from lib.helper_ollama.hostpool import get_pool
+from lib.helper_ollama.scheduler import current_priority, get_scheduler
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+
+def create_async_client(settings: ClientSettings):
+    """Create a new ``ollama.AsyncClient`` with a bounded keep-alive pool."""
+    import ollama
+
+    return ollama.AsyncClient(host=settings.host, **http_options(settings))
+
+
+def get_async_client(settings: ClientSettings | None = None):
+    """Return the client for ``settings`` bound to the running event loop."""
+    settings = settings or ClientSettings.from_env()
+    per_loop = _clients.setdefault(asyncio.get_running_loop(), {})
+    if settings not in per_loop:
+        per_loop[settings] = create_async_client(settings)
+    return per_loop[settings]
+
+
+async def _call(endpoint: str, kwargs: dict):
+    """Run one call on the routed pool host, like ``client._call``.
+
+    Known failures for that host/model are raised at once (see ``negative``),
+    and so is ``CircuitOpenError`` while the host/model breaker is open;
+    otherwise the call passes the host's governor and the scheduler, then
+    runs under the breaker's timeout.
+    """
+    if kwargs.get("stream"):
+        raise ValueError("Async calls do not stream; use lib.helper_ollama.client for streaming.")
+    priority = kwargs.pop("priority", None) or current_priority()
+    model = kwargs.get("model", "")
+    if model:
+        residency.record_use(model)
+    pool = get_pool()
+    host = pool.route(model)
+    client = get_async_client(replace(ClientSettings.from_env(), host=host))
+    method = getattr(client, endpoint)
+    failures = negative.get_cache()
+    failures.check(host, model)
+    guard = get_breaker(host, model)
+    try:
+        guard.before()  # fail fast while open, before queueing for slots
+        queued = True
+        try:
+            with pool.use(host, model):
+                async with get_governor(host, model).aslot(priority), get_scheduler().aslot(priority):
+                    queued = False
+                    response = await guard.acall(lambda: method(**kwargs), admitted=True)
+        except BaseException:
+            if queued:
+                guard.cancel_probe()
+            raise
+    except Exception as e:
+        # No model list is fetched here, so the error carries no suggestion.
+        cached = failures.record(host, model, e)
+        if cached is not None:
+            raise cached from e
+        raise
+    if model:
+        residency.record_success(model, response)
+    return response
+
+
+async def agenerate(**kwargs):
+    """Async ``ollama.generate`` through the loop's shared client."""
+    return await _call("generate", kwargs)
+
+
+async def achat(**kwargs):
+    """Async ``ollama.chat`` through the loop's shared client."""
+    return await _call("chat", kwargs)
+
+
+async def aembed(**kwargs):
+    """Async ``ollama.embed`` through the loop's shared client."""
+    return await _call("embed", kwargs)
+
+
+async def agather_many(
+    awaitables: Iterable[Awaitable],
+    limit: int | None = None,
+    return_exceptions: bool = False,
+) -> list:
+    """Await ``awaitables`` with at most ``limit`` in flight; results keep input order.
+
+    ``limit`` defaults to the client pool size so requests wait here rather
+    than inside the HTTP pool. If one fails (and ``return_exceptions`` is
+    false) or the caller is cancelled, the remaining work is cancelled.
+    """
+    semaphore = asyncio.Semaphore(limit or ClientSettings.from_env().pool_size)
+
+    async def run(awaitable):
+        async with semaphore:
+            return await awaitable
+
+    tasks = [asyncio.ensure_future(run(a)) for a in awaitables]
+    try:
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _cancel_all():
+    tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class BackgroundLoop:
+    """An event loop running forever on a daemon thread."""
+
+    def __init__(self, name: str = "ollama-aio"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """Schedule ``coro`` on the loop; cancelling the future cancels the task."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def close(self):
+        """Cancel outstanding tasks, then stop and close the loop."""
+        self.submit(_cancel_all()).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+@instrument.cache_resource(show_spinner=False)
+def get_background_loop() -> BackgroundLoop:
+    """Return the process-wide background loop shared by all sessions."""
+    return BackgroundLoop()
+
+
+def submit(coro) -> concurrent.futures.Future:
+    """Run ``coro`` on the shared background loop without blocking the script."""
+    return get_background_loop().submit(coro)
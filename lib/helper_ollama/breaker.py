@@ -0,0 +1,382 @@
+"""Circuit breakers with latency-based adaptive timeouts, per host and model.
+
+Each (host, model) pair has a breaker:
+
+- **closed**: calls go through. The timeout is ``multiplier`` x the recent
+  p95 latency, clamped to ``[min_timeout, max_timeout]``; until enough
+  samples exist it is ``max_timeout``. After ``failure_threshold``
+  consecutive failures (timeouts, connection errors or HTTP 5xx) the
+  breaker opens. HTTP 4xx answers such as "model not found" show the server
+  is responsive and do not count.
+- **open**: calls fail immediately with ``CircuitOpenError`` until
+  ``reset_timeout`` has passed.
+- **half-open**: one probe call is let through; success closes the breaker,
+  failure opens it again.
+
+Timeouts are enforced by running the call on a worker thread, so the
+Streamlit script thread is released on time even if the socket hangs. The
+clock starts when a worker picks the call up, so time spent queued behind
+the client's own backlog is not blamed on the server (a call that finds no
+free worker within the timeout fails with ``TimeoutError`` without counting
+as a failure). The abandoned request finishes in the background (bounded by
+the client's own read timeout) and keeps its concurrency slots until then:
+callers pass a ``release`` function, which the breaker calls once the
+request has really finished, so timeouts never put more requests on the
+server than the governor allows.
+
+Callers that queue for slots check ``before`` first and pass
+``admitted=True``: while the breaker is open, the slots are held by
+abandoned calls, and new callers must fail at once rather than queue
+behind them.
+
+``acall`` is the asyncio counterpart for ``ollama.AsyncClient`` calls: the
+timeout cancels the awaited request, which closes its connection, so
+nothing is left running and slots are released at once.
+
+Settings come from ``OLLAMA_BREAKER_FAILURES`` (5), ``OLLAMA_BREAKER_RESET``
+(30 s), ``OLLAMA_BREAKER_MIN_TIMEOUT`` (10 s) and ``OLLAMA_CLIENT_TIMEOUT``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="ollama-call")
+
+
+class _Backlog(TimeoutError):
+    """No worker thread picked the call up in time; not the server's fault."""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a host/model whose breaker is open."""
+
+    def __init__(self, host: str, model: str, retry_after: float):
+        self.host = host
+        self.model = model
+        self.retry_after = retry_after
+        super().__init__(
+            f"Model '{model}' on {host} is temporarily unavailable after repeated failures; "
+            f"retrying in {retry_after:.0f}s."
+        )
+
+
+class Dispatch:
+    """Hooks a caller (the host pool's hedging) can attach to the calls it makes.
+
+    ``sent`` is set (and ``sent_at`` recorded) when a worker starts the
+    request; once ``cancelled`` is set, a call that has not been sent yet is
+    dropped with ``CancelledError`` instead.
+    """
+
+    def __init__(self):
+        self.sent = threading.Event()
+        self.sent_at = None
+        self.cancelled = threading.Event()
+
+    def mark_sent(self, at: float):
+        self.sent_at = at
+        self.sent.set()
+
+
+_dispatch = contextvars.ContextVar("ollama_dispatch", default=None)
+
+
+@contextlib.contextmanager
+def tracking(dispatch: Dispatch):
+    """Attach ``dispatch`` to breaker calls made in this block (this thread)."""
+    token = _dispatch.set(dispatch)
+    try:
+        yield dispatch
+    finally:
+        _dispatch.reset(token)
+
+
+def _percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CircuitBreaker:
+    """Breaker and adaptive timeout for one host/model pair."""
+
+    def __init__(
+        self,
+        host: str,
+        model: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        min_timeout: float = 10.0,
+        max_timeout: float = 120.0,
+        multiplier: float = 2.0,
+        percentile: float = 0.95,
+        window: int = 50,
+        min_samples: int = 10,
+    ):
+        self.host = host
+        self.model = model
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.multiplier = multiplier
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._latencies = {"call": deque(maxlen=window), "stream": deque(maxlen=window)}
+        self._lock = threading.Lock()
+
+    def timeout(self, kind: str = "call") -> float:
+        """Timeout for the next call: whole call, or first chunk for streams."""
+        samples = self._latencies[kind]
+        if len(samples) < self.min_samples:
+            return self.max_timeout
+        adaptive = _percentile(samples, self.percentile) * self.multiplier
+        return min(self.max_timeout, max(self.min_timeout, adaptive))
+
+    def before(self):
+        """Raise ``CircuitOpenError`` unless a call may proceed now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            elapsed = time.monotonic() - self.opened_at
+            if self.state == OPEN and elapsed >= self.reset_timeout:
+                self.state = HALF_OPEN
+            # A probe that never reported back (e.g. an abandoned stream) is replaced.
+            stale_probe = time.monotonic() - self._probe_started > self.reset_timeout
+            if self.state == HALF_OPEN and (not self._probing or stale_probe):
+                self._probing = True
+                self._probe_started = time.monotonic()
+                return
+            raise CircuitOpenError(self.host, self.model, max(0.0, self.reset_timeout - elapsed))
+
+    def record_success(self, latency: float, kind: str = "call"):
+        with self._lock:
+            self._latencies[kind].append(latency)
+            self.failures = 0
+            self.state = CLOSED
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def record_error(self, error: Exception):
+        """Count ``error`` as a failure unless the server answered it (HTTP 4xx)."""
+        if getattr(error, "status_code", 500) < 500:
+            with self._lock:
+                self.failures = 0
+                self.state = CLOSED
+                self._probing = False
+        else:
+            self.record_failure()
+
+    def cancel_probe(self):
+        """Give back a half-open probe reserved by ``before`` for a call that is not made."""
+        with self._lock:
+            self._probing = False
+
+    def _run(self, fn, timeout: float, on_abandon=None):
+        """``(fn(), seconds)`` from a worker thread, waiting ``timeout`` from when it starts.
+
+        Raises ``_Backlog`` if no worker starts ``fn`` within ``timeout``, and
+        ``FutureTimeout`` if it runs longer; ``on_abandon`` is then called
+        once ``fn`` has finished in the background.
+        """
+        hooks = _dispatch.get()
+        if hooks is not None and hooks.cancelled.is_set():
+            self.cancel_probe()
+            raise CancelledError()
+        started = []
+        ready = threading.Event()
+
+        def run():
+            started.append(time.monotonic())
+            ready.set()
+            return fn()
+
+        future = _executor.submit(run)
+        if not ready.wait(timeout) and future.cancel():
+            self.cancel_probe()
+            raise _Backlog(f"No worker was free to call model '{self.model}' on {self.host} within {timeout:.0f}s")
+        ready.wait()
+        if hooks is not None:
+            hooks.mark_sent(started[0])
+        try:
+            result = future.result(timeout=max(0.0, timeout - (time.monotonic() - started[0])))
+        except FutureTimeout:
+            if on_abandon is not None:
+                future.add_done_callback(lambda _: on_abandon())
+            raise
+        return result, time.monotonic() - started[0]
+
+    def call(self, fn, release=None, admitted: bool = False):
+        """Run ``fn()`` under this breaker and its adaptive timeout.
+
+        ``release`` is called exactly once, when ``fn`` has finished (later
+        than the return of ``call`` if ``fn`` timed out and was abandoned).
+        ``admitted`` means the caller already passed ``before``.
+        """
+        abandoned = False
+        try:
+            if not admitted:
+                self.before()
+            timeout = self.timeout("call")
+            try:
+                result, seconds = self._run(fn, timeout, release)
+            except (_Backlog, CancelledError):
+                raise
+            except FutureTimeout:
+                abandoned = True
+                self.record_failure()
+                raise TimeoutError(f"Model '{self.model}' on {self.host} did not answer within {timeout:.0f}s") from None
+            except Exception as e:
+                self.record_error(e)
+                raise
+        finally:
+            if release is not None and not abandoned:
+                release()
+        self.record_success(seconds, "call")
+        return result
+
+    async def acall(self, fn, admitted: bool = False):
+        """Await ``fn()`` under this breaker and its adaptive timeout.
+
+        The caller holds its slots around ``acall``: a timed-out request is
+        cancelled rather than abandoned, so it is over when ``acall`` raises.
+        """
+        if not admitted:
+            self.before()
+        timeout = self.timeout("call")
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(fn(), timeout)
+        except asyncio.TimeoutError:
+            self.record_failure()
+            raise TimeoutError(f"Model '{self.model}' on {self.host} did not answer within {timeout:.0f}s") from None
+        except asyncio.CancelledError:
+            self.cancel_probe()
+            raise
+        except Exception as e:
+            self.record_error(e)
+            raise
+        self.record_success(time.monotonic() - start, "call")
+        return result
+
+    def stream(self, fn, release=None, admitted: bool = False):
+        """Like ``call`` for streaming calls; the timeout covers the first chunk.
+
+        ``release`` is called when the stream ends or is closed.
+        """
+        try:
+            if not admitted:
+                self.before()
+        except CircuitOpenError:
+            if release is not None:
+                release()
+            raise
+        return self._stream(fn, release)
+
+    def _stream(self, fn, release):
+        abandoned = False
+        try:
+            timeout = self.timeout("stream")
+            try:
+                iterator = iter(fn())
+
+                def finish():
+                    close = getattr(iterator, "close", None)
+                    if close is not None:
+                        close()
+                    if release is not None:
+                        release()
+
+                first, seconds = self._run(lambda: next(iterator, _END), timeout, finish)
+            except (_Backlog, CancelledError):
+                raise
+            except FutureTimeout:
+                abandoned = True
+                self.record_failure()
+                raise TimeoutError(f"Model '{self.model}' on {self.host} did not start answering within {timeout:.0f}s") from None
+            except Exception as e:
+                self.record_error(e)
+                raise
+            self.record_success(seconds, "stream")
+            if first is _END:
+                return
+            yield first
+            yield from iterator
+        finally:
+            if release is not None and not abandoned:
+                release()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            retry_after = 0.0
+            if self.state == OPEN:
+                retry_after = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            return {
+                "host": self.host,
+                "model": self.model,
+                "state": self.state,
+                "failures": self.failures,
+                "timeout": round(self.timeout("call"), 1),
+                "stream_timeout": round(self.timeout("stream"), 1),
+                "samples": len(self._latencies["call"]) + len(self._latencies["stream"]),
+                "retry_after": round(retry_after, 1),
+            }
+
+
+_END = object()
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(host: str, model: str) -> CircuitBreaker:
+    """Return the process-wide breaker for ``host`` and ``model``."""
+    with _breakers_lock:
+        breaker = _breakers.get((host, model))
+        if breaker is None:
+            breaker = _breakers[(host, model)] = CircuitBreaker(
+                host,
+                model,
+                failure_threshold=int(os.getenv("OLLAMA_BREAKER_FAILURES", 5)),
+                reset_timeout=float(os.getenv("OLLAMA_BREAKER_RESET", 30)),
+                min_timeout=float(os.getenv("OLLAMA_BREAKER_MIN_TIMEOUT", 10)),
+                max_timeout=float(os.getenv("OLLAMA_CLIENT_TIMEOUT", 120)),
+            )
+        return breaker
+
+
+def breaker_states() -> list:
+    """Snapshots of every breaker, for status displays."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [b.snapshot() for b in breakers]
+
+
+def state_for(host: str, model: str) -> str:
+    """Current state of the breaker for ``host``/``model`` (closed if unknown)."""
+    with _breakers_lock:
+        breaker = _breakers.get((host, model))
+    return breaker.snapshot()["state"] if breaker else CLOSED
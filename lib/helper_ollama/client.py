@@ -0,0 +1,244 @@
+"""Shared, pooled Ollama client used by every page and lib helper.
+
+One ``ollama.Client`` per host is created per process (held by
+``st.cache_resource``) on top of a keep-alive ``httpx`` connection pool, so
+button clicks reuse open sockets instead of paying for TCP setup and client
+construction each time.
+
+Configuration comes from the environment:
+
+- ``OLLAMA_HOST``                    server URL (default ``http://127.0.0.1:11434``)
+- ``OLLAMA_HOSTS``                   several server URLs, comma-separated (see ``hostpool``)
+- ``OLLAMA_CLIENT_TIMEOUT``          read/write timeout in seconds (default 120)
+- ``OLLAMA_CLIENT_CONNECT_TIMEOUT``  connect timeout in seconds (default 5)
+- ``OLLAMA_CLIENT_POOL_SIZE``        max open connections (default 10)
+- ``OLLAMA_CLIENT_KEEPALIVE_EXPIRY`` idle seconds before a socket is closed (default 60)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, replace
+
+from lib.helper_cache import instrument
+from lib.helper_ollama import breaker, governor, hostpool, negative, residency, scheduler
+
+DEFAULT_HOST = "http://127.0.0.1:11434"
+
+
+@dataclass(frozen=True)
+class ClientSettings:
+    """Connection settings for the shared client."""
+
+    host: str = DEFAULT_HOST
+    timeout: float = 120.0
+    connect_timeout: float = 5.0
+    pool_size: int = 10
+    keepalive_expiry: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "ClientSettings":
+        """Build settings from ``OLLAMA_*`` environment variables."""
+        return cls(
+            host=os.getenv("OLLAMA_HOST") or DEFAULT_HOST,
+            timeout=float(os.getenv("OLLAMA_CLIENT_TIMEOUT", cls.timeout)),
+            connect_timeout=float(os.getenv("OLLAMA_CLIENT_CONNECT_TIMEOUT", cls.connect_timeout)),
+            pool_size=int(os.getenv("OLLAMA_CLIENT_POOL_SIZE", cls.pool_size)),
+            keepalive_expiry=float(os.getenv("OLLAMA_CLIENT_KEEPALIVE_EXPIRY", cls.keepalive_expiry)),
+        )
+
+
+def http_options(settings: ClientSettings) -> dict:
+    """Return the ``httpx`` timeout and pool limits for ``settings``."""
+    import httpx
+
+    return {
+        "timeout": httpx.Timeout(settings.timeout, connect=settings.connect_timeout),
+        "limits": httpx.Limits(
+            max_connections=settings.pool_size,
+            max_keepalive_connections=settings.pool_size,
+            keepalive_expiry=settings.keepalive_expiry,
+        ),
+    }
+
+
+def create_client(settings: ClientSettings):
+    """Create a new ``ollama.Client`` with a bounded keep-alive pool."""
+    import ollama
+
+    return ollama.Client(host=settings.host, **http_options(settings))
+
+
+@instrument.cache_resource(show_spinner=False)
+def _cached_client(settings: ClientSettings):
+    return create_client(settings)
+
+
+def get_client(settings: ClientSettings | None = None):
+    """Return the process-wide client for ``settings`` (default: from env)."""
+    return _cached_client(settings or ClientSettings.from_env())
+
+
+def client_for(model: str = ""):
+    """Client for the pool host that would serve ``model`` now."""
+    host = hostpool.get_pool().route(model)
+    return get_client(replace(ClientSettings.from_env(), host=host))
+
+
+def _call(endpoint: str, kwargs: dict):
+    """Run one model call on the routed pool host.
+
+    Known failures for that host/model are raised at once (see ``negative``),
+    and so is ``CircuitOpenError`` while the host/model breaker is open;
+    otherwise the call passes that host's per-model governor and the
+    scheduler, then runs under the breaker's timeout. ``kwargs`` may carry ``priority`` (see ``scheduler``); the rest goes to Ollama.
+    """
+    priority = kwargs.pop("priority", None) or scheduler.current_priority()
+    model = kwargs.get("model", "")
+    if model:
+        residency.record_use(model)
+    pool = hostpool.get_pool()
+    if kwargs.get("stream"):
+        return _observe_stream(model, pool.stream(model, lambda host: _stream_on(host, endpoint, priority, kwargs)))
+    response = pool.call(model, lambda host: _call_on(host, endpoint, priority, kwargs))
+    if model:
+        residency.record_success(model, response)
+    return response
+
+
+def _observe_stream(model: str, stream):
+    for chunk in stream:
+        if model and chunk.get("done"):
+            residency.record_success(model, chunk)
+        yield chunk
+
+
+def _acquire_slots(host: str, model: str, priority: str):
+    """Take ``host``/``model``'s governor slot and a scheduler slot; returns their release.
+
+    The breaker calls the release once the request has finished, which for
+    an abandoned (timed-out) request is after the caller has moved on.
+    """
+    gate = governor.get_governor(host, model)
+    queue = scheduler.get_scheduler()
+    gate.acquire(priority)
+    try:
+        queue.acquire(priority)
+    except BaseException:
+        gate.release()
+        raise
+    released = []
+    lock = threading.Lock()
+
+    def release():
+        with lock:
+            if released:
+                return
+            released.append(True)
+        queue.release(priority)
+        gate.release()
+
+    return release
+
+
+def _admit(guard: breaker.CircuitBreaker, host: str, model: str, priority: str):
+    """Pass ``guard`` (fails fast while open), then take the slots; returns their release."""
+    guard.before()
+    try:
+        return _acquire_slots(host, model, priority)
+    except BaseException:
+        guard.cancel_probe()
+        raise
+
+
+def _call_on(host: str, endpoint: str, priority: str, kwargs: dict):
+    client = get_client(replace(ClientSettings.from_env(), host=host))
+    method = getattr(client, endpoint)
+    model = kwargs.get("model", "")
+    failures = negative.get_cache()
+    failures.check(host, model)
+    guard = breaker.get_breaker(host, model)
+    try:
+        release = _admit(guard, host, model, priority)
+        return guard.call(lambda: method(**kwargs), release, admitted=True)
+    except Exception as e:
+        cached = failures.record(host, model, e, lambda: client.list()["models"])
+        if cached is not None:
+            raise cached from e
+        raise
+
+
+def _stream_on(host: str, endpoint: str, priority: str, kwargs: dict):
+    # Slots are taken on the first ``next`` and held until the stream ends or is closed.
+    client = get_client(replace(ClientSettings.from_env(), host=host))
+    method = getattr(client, endpoint)
+    model = kwargs.get("model", "")
+    failures = negative.get_cache()
+    failures.check(host, model)
+    guard = breaker.get_breaker(host, model)
+    try:
+        release = _admit(guard, host, model, priority)
+        yield from guard.stream(lambda: method(**kwargs), release, admitted=True)
+    except Exception as e:
+        cached = failures.record(host, model, e, lambda: client.list()["models"])
+        if cached is not None:
+            raise cached from e
+        raise
+
+
+def breaker_state(model: str) -> dict:
+    """Breaker snapshot for ``model`` on the host it would be routed to."""
+    return breaker.get_breaker(hostpool.get_pool().route(model), model).snapshot()
+
+
+def generate(**kwargs):
+    """``ollama.generate`` through the shared client."""
+    return _call("generate", kwargs)
+
+
+def chat(**kwargs):
+    """``ollama.chat`` through the shared client."""
+    return _call("chat", kwargs)
+
+
+def embed(**kwargs):
+    """``ollama.embed`` through the shared client."""
+    return _call("embed", kwargs)
+
+
+def embeddings(**kwargs):
+    """``ollama.embeddings`` through the shared client."""
+    return _call("embeddings", kwargs)
+
+
+def list_models():
+    """``ollama.list`` through the shared client; refreshes the negative cache."""
+    host = hostpool.get_pool().route()
+    response = get_client(replace(ClientSettings.from_env(), host=host)).list()
+    negative.get_cache().observe_tags(host, response["models"])
+    return response
+
+
+def ps():
+    """``ollama.ps`` through the shared client."""
+    return client_for().ps()
+
+
+def pull(model: str):
+    """``ollama.pull`` through the shared client; refreshes the negative cache."""
+    host = hostpool.get_pool().route()
+    client = get_client(replace(ClientSettings.from_env(), host=host))
+    response = client.pull(model)
+    negative.get_cache().observe_tags(host, client.list()["models"])
+    return response
+
+
+def delete(model: str):
+    """``ollama.delete`` through the shared client."""
+    return client_for(model).delete(model)
+
+
+def show(model: str):
+    """``ollama.show`` through the shared client."""
+    return client_for(model).show(model)
@@ -0,0 +1,345 @@
+"""Local stand-in for an Ollama server, for offline load and latency testing.
+
+Implements the endpoints the app uses (``/api/generate``, ``/api/chat``,
+``/api/embed``, ``/api/embeddings``, ``/api/tags``, ``/api/ps``) with
+deterministic output: the same model, prompt and seed always produce the same
+tokens and embeddings. Timing and failures are configurable, so pages and
+batch code can be exercised end-to-end without a model or network::
+
+    python -m lib.helper_ollama.fake_server --port 11435 --ttft 0.2 --tokens-per-sec 40
+    OLLAMA_HOST=http://127.0.0.1:11435 streamlit run app.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_MODELS = ("phi4-mini", "mistral", "codellama", "phi", "llama2", "llava", "nomic-embed-text")
+
+_VOCABULARY = (
+    "the model answers with short deterministic words so that tests can compare "
+    "output across runs while latency and throughput follow the configured profile "
+    "python streamlit ollama local server token stream data result"
+).split()
+
+
+@dataclass
+class FakeConfig:
+    """Behaviour of the fake server."""
+
+    models: tuple = DEFAULT_MODELS
+    ttft: float = 0.0                # seconds before the first token
+    tokens_per_sec: float = 0.0      # 0 = no delay between tokens
+    load_delay: float = 0.0          # seconds to "load" a model that is not resident
+    error_rate: float = 0.0          # probability of an injected HTTP 500
+    num_predict: int = 32            # tokens generated when options.num_predict is unset
+    embedding_dim: int = 64
+    model_size: int = 2_000_000_000  # bytes reported by /api/tags and /api/ps
+    seed: int = 0                    # seed for error injection
+
+
+@dataclass
+class _State:
+    loaded: dict = field(default_factory=dict)   # model -> loaded-at timestamp
+    requests: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _digest(model: str) -> str:
+    return hashlib.sha256(model.encode()).hexdigest()
+
+
+def _tokenize(text: str) -> list:
+    return [int(hashlib.md5(word.encode()).hexdigest()[:6], 16) for word in text.split()]
+
+
+def _tokens(model: str, prompt: str, seed, count: int) -> list:
+    rng = random.Random(hashlib.sha256(f"{model}\0{seed}\0{prompt}".encode()).digest())
+    return [rng.choice(_VOCABULARY) + " " for _ in range(count)]
+
+
+def _embedding(model: str, text: str, dim: int) -> list:
+    rng = random.Random(hashlib.sha256(f"{model}\0{text}".encode()).digest())
+    vector = [rng.gauss(0, 1) for _ in range(dim)]
+    norm = sum(v * v for v in vector) ** 0.5
+    return [v / norm for v in vector]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def log_message(self, format, *args):
+        pass
+
+    # -- plumbing ---------------------------------------------------------
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _write_chunk(self, payload: dict):
+        data = json.dumps(payload).encode() + b"\n"
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _read_body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    # -- routing ----------------------------------------------------------
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [self.server.describe(m) for m in self.server.config.models]})
+        elif self.path == "/api/ps":
+            self._send_json(200, {"models": [self.server.describe(m, running=True) for m in self.server.loaded()]})
+        elif self.path in ("/", "/api/version"):
+            self._send_json(200, {"version": "0.0.0-fake"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        routes = {
+            "/api/generate": self._generate,
+            "/api/chat": self._chat,
+            "/api/embed": self._embed,
+            "/api/embeddings": self._embeddings,
+        }
+        handler = routes.get(self.path)
+        if handler is None:
+            self._send_json(404, {"error": "not found"})
+            return
+
+        request = self._read_body()
+        model = request.get("model", "")
+        if model not in self.server.config.models:
+            self._send_json(404, {"error": f"model '{model}' not found"})
+            return
+        if self.server.inject_error():
+            self._send_json(500, {"error": "injected failure"})
+            return
+
+        load_duration = self.server.load(model, request.get("keep_alive"))
+        handler(request, load_duration)
+
+    # -- endpoints --------------------------------------------------------
+
+    def _completion(self, request: dict, prompt: str, load_duration: int, wrap):
+        config = self.server.config
+        options = request.get("options") or {}
+        count = int(options.get("num_predict") or config.num_predict)
+        context = request.get("context") or []
+        prompt_tokens = _tokenize(prompt)
+        tokens = _tokens(request["model"], prompt, options.get("seed"), count)
+
+        started = time.perf_counter()
+        if config.ttft:
+            time.sleep(config.ttft)
+        prompt_done = time.perf_counter()
+
+        stream = request.get("stream", True)
+        if stream:
+            self._start_stream()
+        for i, token in enumerate(tokens):
+            if i and config.tokens_per_sec:
+                time.sleep(1 / config.tokens_per_sec)
+            if stream:
+                self._write_chunk({"model": request["model"], "created_at": _now(), **wrap(token), "done": False})
+        finished = time.perf_counter()
+
+        final = {
+            "model": request["model"],
+            "created_at": _now(),
+            **wrap("" if stream else "".join(tokens)),
+            "done": True,
+            "done_reason": "length" if options.get("num_predict") else "stop",
+            "total_duration": int((finished - started) * 1e9) + load_duration,
+            "load_duration": load_duration,
+            "prompt_eval_count": len(prompt_tokens),
+            "prompt_eval_duration": int((prompt_done - started) * 1e9),
+            "eval_count": len(tokens),
+            "eval_duration": int((finished - prompt_done) * 1e9),
+        }
+        if wrap is _as_generate:
+            final["context"] = list(context) + prompt_tokens + _tokenize("".join(tokens))
+        if stream:
+            self._write_chunk(final)
+            self._end_stream()
+        else:
+            self._send_json(200, final)
+
+    def _generate(self, request: dict, load_duration: int):
+        prompt = (request.get("system") or "") + (request.get("prompt") or "")
+        self._completion(request, prompt, load_duration, _as_generate)
+
+    def _chat(self, request: dict, load_duration: int):
+        prompt = "\n".join(f"{m.get('role')}: {m.get('content')}" for m in request.get("messages") or [])
+        self._completion(request, prompt, load_duration, _as_chat)
+
+    def _embed(self, request: dict, load_duration: int):
+        inputs = request.get("input") or []
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dim = self.server.config.embedding_dim
+        self._send_json(200, {
+            "model": request["model"],
+            "embeddings": [_embedding(request["model"], text, dim) for text in inputs],
+            "load_duration": load_duration,
+            "prompt_eval_count": sum(len(text.split()) for text in inputs),
+        })
+
+    def _embeddings(self, request: dict, load_duration: int):
+        dim = self.server.config.embedding_dim
+        self._send_json(200, {"embedding": _embedding(request["model"], request.get("prompt") or "", dim)})
+
+
+def _as_generate(text: str) -> dict:
+    return {"response": text}
+
+
+def _as_chat(text: str) -> dict:
+    return {"message": {"role": "assistant", "content": text}}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: FakeConfig):
+        super().__init__(address, _Handler)
+        self.config = config
+        self.state = _State()
+        self._random = random.Random(config.seed)
+
+    def inject_error(self) -> bool:
+        with self.state.lock:
+            self.state.requests += 1
+            return self.config.error_rate > 0 and self._random.random() < self.config.error_rate
+
+    def load(self, model: str, keep_alive) -> int:
+        """Mark ``model`` resident; return the simulated load time in ns."""
+        with self.state.lock:
+            resident = model in self.state.loaded
+            if keep_alive in (0, "0", "0s", "0m"):
+                self.state.loaded.pop(model, None)
+            else:
+                self.state.loaded[model] = time.time()
+        if resident or not self.config.load_delay:
+            return 0
+        time.sleep(self.config.load_delay)
+        return int(self.config.load_delay * 1e9)
+
+    def loaded(self) -> list:
+        with self.state.lock:
+            return list(self.state.loaded)
+
+    def describe(self, model: str, running: bool = False) -> dict:
+        info = {
+            "name": model,
+            "model": model,
+            "modified_at": _now(),
+            "size": self.config.model_size,
+            "digest": _digest(model),
+            "details": {"format": "gguf", "family": model.split("-")[0], "parameter_size": "3B"},
+        }
+        if running:
+            info["size_vram"] = self.config.model_size
+            info["expires_at"] = _now()
+        return info
+
+
+class FakeOllamaServer:
+    """Run the fake server on a background thread.
+
+    Use as a context manager; ``url`` is suitable for ``OLLAMA_HOST``.
+    """
+
+    def __init__(self, config: FakeConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or FakeConfig()
+        self._server = _Server((host, port), self.config)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def request_count(self) -> int:
+        return self._server.state.requests
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--models", default=",".join(DEFAULT_MODELS), help="comma-separated model names")
+    parser.add_argument("--ttft", type=float, default=0.0, help="seconds to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0, help="0 = unthrottled")
+    parser.add_argument("--load-delay", type=float, default=0.0, help="seconds to load a cold model")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of HTTP 500")
+    parser.add_argument("--num-predict", type=int, default=FakeConfig.num_predict)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    config = FakeConfig(
+        models=tuple(m.strip() for m in args.models.split(",") if m.strip()),
+        ttft=args.ttft,
+        tokens_per_sec=args.tokens_per_sec,
+        load_delay=args.load_delay,
+        error_rate=args.error_rate,
+        num_predict=args.num_predict,
+        seed=args.seed,
+    )
+    server = _Server((args.host, args.port), config)
+    print(f"Fake Ollama listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
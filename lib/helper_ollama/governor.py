@@ -0,0 +1,172 @@
+"""Per-model concurrency governor matching the server's parallel slots.
+
+Ollama serves at most ``OLLAMA_NUM_PARALLEL`` requests per loaded model at a
+time; anything beyond that waits inside the server where no client can see
+it, and the extra connections only add latency. The governor keeps the
+number of in-flight calls per host and model at that parallelism and makes
+the excess wait here instead, in priority order, where queue depth and wait
+time are visible.
+
+Parallelism per model is taken, in order, from ``OLLAMA_GOVERNOR_PARALLEL``
+(``"mistral=2,phi4-mini=4"``), then ``OLLAMA_NUM_PARALLEL`` (the server
+setting, when the app shares the server's environment), then Ollama's own
+default of 4.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import os
+import threading
+import time
+
+from lib.helper_ollama.scheduler import PRIORITIES, current_priority
+
+DEFAULT_PARALLEL = 4
+
+
+class Governor:
+    """At most ``limit`` concurrent calls; waiters are granted by priority, then arrival."""
+
+    def __init__(self, host: str, model: str, limit: int):
+        self.host = host
+        self.model = model
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._waiters = []  # heap of (priority rank, seq, grant)
+        self._seq = itertools.count()
+        self.in_flight = 0
+        self.served = 0
+        self.max_queued = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _enqueue(self, name: str, grant) -> tuple:
+        entry = (PRIORITIES.index(name), next(self._seq), grant)
+        with self._lock:
+            if self.in_flight < self.limit and not self._waiters:
+                self.in_flight += 1
+                self.served += 1
+                granted = True
+            else:
+                heapq.heappush(self._waiters, entry)
+                self.max_queued = max(self.max_queued, len(self._waiters))
+                granted = False
+        if granted:
+            grant()
+        return entry
+
+    def _record_wait(self, started: float):
+        waited = time.monotonic() - started
+        with self._lock:
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def acquire(self, name: str | None = None):
+        """Block until this model has a free slot."""
+        started = time.monotonic()
+        event = threading.Event()
+        self._enqueue(name or current_priority(), event.set)
+        event.wait()
+        self._record_wait(started)
+
+    async def aacquire(self, name: str | None = None):
+        """Async ``acquire``; cancelling while queued gives up the place in line."""
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def grant():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        entry = self._enqueue(name or current_priority(), grant)
+        try:
+            await granted
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = entry in self._waiters
+                if queued:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+            if not queued:
+                self.release()
+            raise
+        self._record_wait(started)
+
+    def has_free_slot(self) -> bool:
+        """True if a call could start now without queueing."""
+        with self._lock:
+            return self.in_flight < self.limit and not self._waiters
+
+    def release(self):
+        with self._lock:
+            if self._waiters:  # hand the slot straight to the next waiter
+                grant = heapq.heappop(self._waiters)[2]
+                self.served += 1
+            else:
+                self.in_flight -= 1
+                grant = None
+        if grant:
+            grant()
+
+    @contextlib.contextmanager
+    def slot(self, name: str | None = None):
+        self.acquire(name)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @contextlib.asynccontextmanager
+    async def aslot(self, name: str | None = None):
+        await self.aacquire(name)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "host": self.host,
+                "model": self.model,
+                "parallel": self.limit,
+                "in_flight": self.in_flight,
+                "queued": len(self._waiters),
+                "max_queued": self.max_queued,
+                "served": self.served,
+                "avg_wait_s": round(self.total_wait / self.served, 3) if self.served else 0.0,
+                "max_wait_s": round(self.max_wait, 3),
+            }
+
+
+def parallelism(model: str) -> int:
+    """Configured parallel slots for ``model``."""
+    for item in os.getenv("OLLAMA_GOVERNOR_PARALLEL", "").split(","):
+        name, _, value = item.partition("=")
+        if value and name.strip() in (model, model.split(":")[0]):
+            return int(value)
+    return int(os.getenv("OLLAMA_NUM_PARALLEL") or DEFAULT_PARALLEL)
+
+
+_governors = {}
+_governors_lock = threading.Lock()
+
+
+def get_governor(host: str, model: str) -> Governor:
+    """Return the process-wide governor for ``host`` and ``model``."""
+    with _governors_lock:
+        governor = _governors.get((host, model))
+        if governor is None:
+            governor = _governors[(host, model)] = Governor(host, model, parallelism(model))
+        return governor
+
+
+def governor_states() -> list:
+    """Snapshots of every governor, for status displays."""
+    with _governors_lock:
+        governors = list(_governors.values())
+    return [g.snapshot() for g in governors]
@@ -0,0 +1,302 @@
+"""Treat several Ollama servers as one pool.
+
+List the servers in ``OLLAMA_HOSTS`` (comma-separated); without it the pool
+is just ``OLLAMA_HOST`` and behaves exactly like a single client.
+
+- **Health checks**: a background thread polls ``/api/tags`` and ``/api/ps``
+  on every host each ``OLLAMA_POOL_HEALTH_INTERVAL`` seconds (default 10),
+  recording whether it answers, which models it has and which are loaded.
+- **Routing**: each request goes to a healthy host whose breaker for the
+  model is not open, preferring hosts that already have the model loaded,
+  then hosts that have it installed, and among those the one with the fewest
+  outstanding requests.
+- **Hedging**: when a non-streaming call has not answered within the
+  model's recent p95 latency, a duplicate is sent to the next best host and
+  whichever answers first wins. The delay counts from when the request is
+  actually sent (after the governor, scheduler and worker queues), so the
+  client's own queueing never triggers a hedge. Hedges are rationed by a
+  token bucket to about ``OLLAMA_POOL_HEDGE_BUDGET`` (default 0.05) of calls,
+  and skipped when the second host has no free governor slot, so they do
+  not double the load on saturated hosts. The losing request is dropped if
+  it has not been sent yet; one already running finishes in the background
+  (Ollama has no way to abort it) and its answer is discarded. Set
+  ``OLLAMA_POOL_HEDGE=0`` to disable.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from lib.helper_ollama import breaker, governor, negative
+
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="ollama-hedge")
+
+
+def _url(host: str) -> str:
+    return host if "://" in host else f"http://{host}"
+
+
+def _base_name(model: str) -> str:
+    return model.split(":")[0]
+
+
+def _percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Host:
+    def __init__(self, url: str):
+        self.url = url
+        self.healthy = True
+        self.outstanding = 0
+        self.served = 0
+        self.errors = 0
+        self.installed = set()
+        self.resident = set()
+        self.last_check = 0.0
+
+    def has(self, models: set, model: str) -> bool:
+        return model in models or _base_name(model) in {_base_name(m) for m in models}
+
+
+class HostPool:
+    """Route calls across ``hosts`` by health, residency and outstanding requests."""
+
+    def __init__(
+        self,
+        hosts: list,
+        health_interval: float = 10.0,
+        hedge: bool = True,
+        health_timeout: float = 2.0,
+        window: int = 100,
+        min_samples: int = 10,
+        hedge_budget: float = 0.05,
+        hedge_burst: float = 5.0,
+    ):
+        self.hosts = {url: _Host(url) for url in hosts}
+        self.health_interval = health_interval
+        self.hedge = hedge and len(hosts) > 1
+        self.health_timeout = health_timeout
+        self.min_samples = min_samples
+        self.hedge_budget = hedge_budget
+        self.hedge_burst = hedge_burst
+        self._hedge_tokens = min(1.0, hedge_burst)
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.hedges_skipped = 0
+        self._window = window
+        self._latencies = {}
+        self._lock = threading.Lock()
+        self._checker = None
+
+    # -- health -----------------------------------------------------------
+
+    def check(self):
+        """Poll every host once; updates health, installed and loaded models."""
+        import httpx
+
+        for host in list(self.hosts.values()):
+            try:
+                tags = httpx.get(f"{_url(host.url)}/api/tags", timeout=self.health_timeout).json()
+                running = httpx.get(f"{_url(host.url)}/api/ps", timeout=self.health_timeout).json()
+            except (httpx.HTTPError, ValueError):
+                with self._lock:
+                    host.healthy = False
+                    host.last_check = time.time()
+                continue
+            with self._lock:
+                host.healthy = True
+                host.installed = {m["model"] for m in tags.get("models", [])}
+                host.resident = {m["model"] for m in running.get("models", [])}
+                host.last_check = time.time()
+            negative.get_cache().observe_tags(host.url, tags.get("models", []))
+
+    def start(self):
+        """Start background health checks (only needed with more than one host)."""
+        if self._checker is None and len(self.hosts) > 1:
+            self.check()
+            self._checker = threading.Thread(target=self._check_forever, name="ollama-pool-health", daemon=True)
+            self._checker.start()
+
+    def _check_forever(self):
+        while True:
+            time.sleep(self.health_interval)
+            self.check()
+
+    # -- routing ----------------------------------------------------------
+
+    def route(self, model: str = "", exclude=()) -> str | None:
+        """Best host for ``model``; None only if every host is excluded."""
+        with self._lock:
+            hosts = [h for h in self.hosts.values() if h.url not in exclude]
+            if not hosts:
+                return None
+            usable = [h for h in hosts if h.healthy and breaker.state_for(h.url, model) != breaker.OPEN]
+            candidates = usable or hosts
+            if model:
+                candidates = (
+                    [h for h in candidates if h.has(h.resident, model)]
+                    or [h for h in candidates if h.has(h.installed, model)]
+                    or candidates
+                )
+            return min(candidates, key=lambda h: h.outstanding).url
+
+    @contextlib.contextmanager
+    def use(self, url: str, model: str = "", timed: bool = True):
+        """Count a request to ``url`` as outstanding; record its outcome (and latency if ``timed``)."""
+        with self._lock:
+            self.hosts[url].outstanding += 1
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            with self._lock:
+                host = self.hosts[url]
+                host.outstanding -= 1
+                host.errors += 1
+                if isinstance(e, ConnectionError):
+                    host.healthy = False
+            raise
+        except BaseException:
+            with self._lock:
+                self.hosts[url].outstanding -= 1
+            raise
+        with self._lock:
+            host = self.hosts[url]
+            host.outstanding -= 1
+            host.served += 1
+            host.healthy = True
+            if model:
+                host.resident.add(model)
+        if timed:
+            self._record_latency(model, time.monotonic() - start)
+
+    def _record_latency(self, model: str, seconds: float):
+        if model:
+            with self._lock:
+                self._latencies.setdefault(model, deque(maxlen=self._window)).append(seconds)
+
+    def _run(self, url: str, model: str, fn, dispatch: breaker.Dispatch | None = None):
+        """``fn(url)``; its latency counts from when the request was sent."""
+        dispatch = dispatch or breaker.Dispatch()
+        start = time.monotonic()
+        with self.use(url, model, timed=False), breaker.tracking(dispatch):
+            result = fn(url)
+        self._record_latency(model, time.monotonic() - (dispatch.sent_at or start))
+        return result
+
+    def hedge_delay(self, model: str) -> float | None:
+        """p95 latency for ``model`` once enough samples exist."""
+        with self._lock:
+            samples = list(self._latencies.get(model, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return _percentile(samples, 0.95)
+
+    def _take_hedge(self, url: str, model: str) -> bool:
+        """Spend a hedge token, unless the bucket is empty or ``url`` has no free slot."""
+        free = governor.get_governor(url, model).has_free_slot()
+        with self._lock:
+            if not free or self._hedge_tokens < 1:
+                self.hedges_skipped += 1
+                return False
+            self._hedge_tokens -= 1
+            self.hedges += 1
+            return True
+
+    def call(self, model: str, fn):
+        """Return ``fn(host)`` on the routed host, hedged to a second host past p95."""
+        with self._lock:
+            self._hedge_tokens = min(self.hedge_burst, self._hedge_tokens + self.hedge_budget)
+        primary = self.route(model)
+        delay = self.hedge_delay(model) if self.hedge else None
+        if delay is None:
+            return self._run(primary, model, fn)
+
+        sent = breaker.Dispatch()
+        first = _executor.submit(self._run, primary, model, fn, sent)
+        first.add_done_callback(lambda _: sent.sent.set())
+        sent.sent.wait()  # queued here, not at the server: no reason to hedge yet
+        waited = time.monotonic() - sent.sent_at if sent.sent_at is not None else 0.0
+        try:
+            return first.result(timeout=max(0.0, delay - waited))
+        except FutureTimeout:
+            pass
+        secondary = self.route(model, exclude=(primary,))
+        if secondary is None or not self._take_hedge(secondary, model):
+            return first.result()
+
+        backup = breaker.Dispatch()
+        second = _executor.submit(self._run, secondary, model, fn, backup)
+        dispatches = {first: sent, second: backup}
+        pending = set(dispatches)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        dispatches[loser].cancelled.set()  # not sent yet: dropped
+                        loser.cancel()
+                    if future is second:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    def stream(self, model: str, fn):
+        """Iterate ``fn(host)`` on the routed host; streams are not hedged."""
+        url = self.route(model)
+        with self.use(url, model, timed=False):
+            yield from fn(url)
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [
+                {
+                    "host": h.url,
+                    "healthy": h.healthy,
+                    "outstanding": h.outstanding,
+                    "served": h.served,
+                    "errors": h.errors,
+                    "loaded_models": ", ".join(sorted(h.resident)),
+                    "last_check": time.strftime("%H:%M:%S", time.localtime(h.last_check)) if h.last_check else "",
+                }
+                for h in self.hosts.values()
+            ]
+
+
+def configured_hosts() -> tuple:
+    """Hosts from ``OLLAMA_HOSTS``, else the single ``OLLAMA_HOST``."""
+    from lib.helper_ollama.client import DEFAULT_HOST
+
+    hosts = [h.strip() for h in os.getenv("OLLAMA_HOSTS", "").split(",") if h.strip()]
+    return tuple(hosts or [os.getenv("OLLAMA_HOST") or DEFAULT_HOST])
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool() -> HostPool:
+    """Return the process-wide pool for the configured hosts."""
+    hosts = configured_hosts()
+    with _pools_lock:
+        pool = _pools.get(hosts)
+        if pool is None:
+            pool = _pools[hosts] = HostPool(
+                list(hosts),
+                health_interval=float(os.getenv("OLLAMA_POOL_HEALTH_INTERVAL", 10)),
+                hedge=os.getenv("OLLAMA_POOL_HEDGE", "1") != "0",
+                hedge_budget=float(os.getenv("OLLAMA_POOL_HEDGE_BUDGET", 0.05)),
+            )
+            pool.start()
+        return pool
@@ -0,0 +1,166 @@
+"""Short-lived cache of known failures, so they fail fast.
+
+A model that is not pulled (the 700 pages default to ``llama2``) or a host
+that refuses connections fails the same way for every session and rerun,
+each time after a round-trip or a connect timeout. The shared call path
+records such failures here and, for the next ``ttl`` seconds, raises the
+cached error before any request is made:
+
+- HTTP 404 "model not found" is cached per (host, model) as
+  ``ModelNotFoundError``, an ``ollama.ResponseError`` whose message names
+  the closest installed model.
+- Connection errors are cached per host (``connect_ttl``, shorter) as
+  ``HostUnavailableError``, a ``ConnectionError``.
+
+Both keep the types the pages already catch. Each host's entries are dropped
+as soon as its ``/api/tags`` is seen to change (e.g. after ``ollama pull``),
+whether it is listed through ``client.list_models`` or by the host pool's
+health checks.
+
+Settings: ``OLLAMA_NEGATIVE_TTL`` (30 s, 0 disables the cache) and
+``OLLAMA_NEGATIVE_CONNECT_TTL`` (5 s).
+"""
+
+from __future__ import annotations
+
+import difflib
+import os
+import threading
+import time
+
+import ollama
+
+
+class ModelNotFoundError(ollama.ResponseError):
+    """Cached "model not found" answer, with the closest installed model."""
+
+    def __init__(self, host: str, model: str, suggestion: str | None, retry_after: float):
+        self.host = host
+        self.model = model
+        self.suggestion = suggestion
+        self.retry_after = retry_after
+        hint = f" Try '{suggestion}', or run `ollama pull {model}`." if suggestion else f" Run `ollama pull {model}`."
+        super().__init__(f"model '{model}' not found on {host}.{hint}", 404)
+
+
+class HostUnavailableError(ConnectionError):
+    """Cached connection failure for a host."""
+
+    def __init__(self, host: str, retry_after: float):
+        self.host = host
+        self.retry_after = retry_after
+        super().__init__(f"Failed to connect to Ollama at {host}; retrying in {retry_after:.0f}s.")
+
+
+def _model_names(models) -> list[str]:
+    return sorted(m["model"] for m in models)
+
+
+def suggest(model: str, installed: list[str]) -> str | None:
+    """Installed model closest to ``model`` by name, else the first installed one."""
+    if not installed:
+        return None
+    base = {name.split(":")[0]: name for name in installed}
+    close = difflib.get_close_matches(model.split(":")[0], list(base), n=1, cutoff=0.3)
+    return base[close[0]] if close else installed[0]
+
+
+class NegativeCache:
+    """Failures per (host, model) with a TTL, invalidated by model-list changes."""
+
+    def __init__(self, ttl: float = 30.0, connect_ttl: float = 5.0):
+        self.ttl = ttl
+        self.connect_ttl = connect_ttl
+        self._missing = {}      # (host, model) -> (expires, suggestion)
+        self._down = {}         # host -> expires
+        self._tags = {}         # host -> model names last seen
+        self._lock = threading.Lock()
+        self.fast_failures = 0
+
+    def check(self, host: str, model: str):
+        """Raise the cached error for ``host``/``model``, if any is still fresh."""
+        if self.ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            down = self._down.get(host)
+            if down is not None and down > now:
+                self.fast_failures += 1
+                raise HostUnavailableError(host, down - now)
+            missing = self._missing.get((host, model))
+            if missing is not None and missing[0] > now:
+                self.fast_failures += 1
+                raise ModelNotFoundError(host, model, missing[1], missing[0] - now)
+
+    def record(self, host: str, model: str, error: Exception, list_models=None) -> Exception | None:
+        """Remember ``error`` if it is a missing model or a refused connection.
+
+        ``list_models()`` (the host's ``/api/tags`` models) is called for a
+        missing model, to suggest a replacement. Returns the error that
+        later calls will get, to raise in place of ``error``, or None.
+        """
+        if self.ttl <= 0 or isinstance(error, (HostUnavailableError, ModelNotFoundError)):
+            return None
+        if isinstance(error, ConnectionError):
+            with self._lock:
+                self._down[host] = time.monotonic() + self.connect_ttl
+            return HostUnavailableError(host, self.connect_ttl)
+        if getattr(error, "status_code", None) == 404 and model:
+            installed = None
+            if list_models is not None:
+                try:
+                    installed = _model_names(list_models())
+                except Exception:
+                    pass
+            suggestion = suggest(model, installed or [])
+            with self._lock:
+                if installed is not None:
+                    self._tags[host] = installed
+                self._missing[(host, model)] = (time.monotonic() + self.ttl, suggestion)
+            return ModelNotFoundError(host, model, suggestion, self.ttl)
+        return None
+
+    def observe_tags(self, host: str, models):
+        """Note ``host``'s current model list; its entries are dropped if it changed."""
+        names = _model_names(models)
+        with self._lock:
+            if self._tags.get(host) != names:
+                self._missing = {k: v for k, v in self._missing.items() if k[0] != host}
+            self._tags[host] = names
+            self._down.pop(host, None)
+
+    def clear(self):
+        with self._lock:
+            self._missing.clear()
+            self._down.clear()
+
+    def snapshot(self) -> list[dict]:
+        now = time.monotonic()
+        with self._lock:
+            rows = [
+                {"host": host, "model": model, "error": "model not found", "suggestion": suggestion or "", "expires_in": round(expires - now, 1)}
+                for (host, model), (expires, suggestion) in self._missing.items()
+                if expires > now
+            ]
+            rows += [
+                {"host": host, "model": "", "error": "connection failed", "suggestion": "", "expires_in": round(expires - now, 1)}
+                for host, expires in self._down.items()
+                if expires > now
+            ]
+        return rows
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> NegativeCache:
+    """Return the process-wide negative cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = NegativeCache(
+                ttl=float(os.getenv("OLLAMA_NEGATIVE_TTL", 30)),
+                connect_ttl=float(os.getenv("OLLAMA_NEGATIVE_CONNECT_TTL", 5)),
+            )
+        return _cache
@@ -0,0 +1,189 @@
+"""Model residency manager: pre-warm selected models within a memory budget.
+
+The first request after a model switch normally pays the full model load.
+Pages pass ``prewarm_selected`` as a model selectbox's ``on_change``; a
+single background worker then loads it (an empty ``generate`` with a
+``keep_alive``) so the load happens before the user presses the button.
+
+If loading would exceed the memory budget, resident models are unloaded in
+least-recently-used order (``keep_alive=0``). Models used through the
+shared client are tracked, so the most-used ones stay resident. The loads
+and unloads go through the shared client at ``bulk`` priority, so they
+respect the governor, scheduler and breakers and yield to real requests.
+
+The load time paid in the background counts as *saved* once a later
+request for the model succeeds without loading it (its ``load_duration``
+is a small fraction of the pre-warm's), i.e. while it was still resident.
+If the model had been evicted in between, the saving is dropped.
+
+Settings: ``OLLAMA_RESIDENCY_BUDGET_GB`` (default 8) and
+``OLLAMA_RESIDENCY_KEEP_ALIVE`` (default ``30m``).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import streamlit as st
+
+from lib.helper_cache import instrument
+
+
+def _name(model: str) -> str:
+    return model if ":" in model else f"{model}:latest"
+
+
+class ResidencyManager:
+    """Keep frequently used models loaded within ``budget_bytes``."""
+
+    def __init__(self, budget_bytes: int, keep_alive: str = "30m", client_factory=None):
+        self.budget_bytes = budget_bytes
+        self.keep_alive = keep_alive
+        self._client_factory = client_factory
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ollama-prewarm")
+        self._pending = {}
+        self._models = {}  # name -> usage record
+        self._local = threading.local()  # set on the pre-warm thread
+        self.saved_load_ns = 0
+
+    def _client(self, model: str):
+        if self._client_factory is not None:
+            return self._client_factory()
+        from lib.helper_ollama.client import client_for
+
+        return client_for(model)
+
+    def _record(self, name: str) -> dict:
+        return self._models.setdefault(name, {
+            "model": name,
+            "uses": 0,
+            "last_used": 0.0,
+            "prewarms": 0,
+            "pending_saving_ns": 0,
+            "saved_load_ns": 0,
+        })
+
+    def _prewarming(self) -> bool:
+        return getattr(self._local, "active", False)
+
+    def record_use(self, model: str):
+        """Note a real request for ``model`` (ignored for the pre-warm's own calls)."""
+        if self._prewarming():
+            return
+        with self._lock:
+            record = self._record(_name(model))
+            record["uses"] += 1
+            record["last_used"] = time.time()
+
+    def record_success(self, model: str, response):
+        """Claim the pending pre-warm saving if ``response`` shows no model load."""
+        if self._prewarming():
+            return
+        load_ns = (response.get("load_duration") if response is not None else None) or 0
+        with self._lock:
+            record = self._record(_name(model))
+            pending = record["pending_saving_ns"]
+            if not pending:
+                return
+            record["pending_saving_ns"] = 0
+            if load_ns <= pending * 0.1:  # still resident; otherwise it was loaded again
+                record["saved_load_ns"] += pending
+                self.saved_load_ns += pending
+
+    def prewarm(self, model: str) -> Future:
+        """Load ``model`` in the background; repeated calls share one job."""
+        name = _name(model)
+        with self._lock:
+            future = self._pending.get(name)
+            if future is None:
+                future = self._pending[name] = self._executor.submit(self._prewarm, model)
+                future.add_done_callback(lambda _: self._done(name))
+        return future
+
+    def _done(self, name: str):
+        with self._lock:
+            self._pending.pop(name, None)
+
+    def _generate(self, **kwargs):
+        if self._client_factory is not None:
+            return self._client_factory().generate(**kwargs)
+        from lib.helper_ollama import client, scheduler
+
+        return client.generate(priority=scheduler.BULK, **kwargs)
+
+    def _prewarm(self, model: str) -> int:
+        self._local.active = True
+        try:
+            return self._load(model)
+        finally:
+            self._local.active = False
+
+    def _load(self, model: str) -> int:
+        name = _name(model)
+        client = self._client(model)
+        resident = {_name(m["model"]): m for m in client.ps()["models"]}
+        if name in resident:
+            return 0
+        running = {n: m.get("size") or 0 for n, m in resident.items()}
+
+        sizes = {_name(m["model"]): m.get("size") or 0 for m in client.list()["models"]}
+        needed = sizes.get(name, 0)
+        with self._lock:
+            last_used = {n: self._models[n]["last_used"] if n in self._models else 0.0 for n in running}
+        for victim in sorted(running, key=last_used.get):
+            if sum(running.values()) + needed <= self.budget_bytes:
+                break
+            self._generate(model=resident[victim]["model"], prompt="", keep_alive=0)
+            running.pop(victim)
+
+        response = self._generate(model=model, prompt="", keep_alive=self.keep_alive)
+        load_ns = response.get("load_duration") or 0
+        with self._lock:
+            record = self._record(name)
+            record["prewarms"] += 1
+            record["pending_saving_ns"] = load_ns
+            record["last_used"] = time.time()
+        return load_ns
+
+    def stats(self) -> dict:
+        """Usage and savings per model, plus the total load time saved."""
+        with self._lock:
+            models = [dict(r) for r in self._models.values()]
+        return {
+            "budget_bytes": self.budget_bytes,
+            "saved_load_seconds": self.saved_load_ns / 1e9,
+            "models": models,
+        }
+
+
+@instrument.cache_resource(show_spinner=False)
+def get_manager() -> ResidencyManager:
+    """Return the process-wide residency manager."""
+    return ResidencyManager(
+        budget_bytes=int(float(os.getenv("OLLAMA_RESIDENCY_BUDGET_GB", 8)) * 1024**3),
+        keep_alive=os.getenv("OLLAMA_RESIDENCY_KEEP_ALIVE", "30m"),
+    )
+
+
+def prewarm(model: str) -> Future:
+    """Pre-warm ``model`` on the shared manager without blocking the script."""
+    return get_manager().prewarm(model)
+
+
+def prewarm_selected(key: str):
+    """``on_change`` callback for a model ``st.selectbox`` stored under ``key``."""
+    prewarm(st.session_state[key])
+
+
+def record_use(model: str):
+    """Record a real request for ``model`` on the shared manager."""
+    get_manager().record_use(model)
+
+
+def record_success(model: str, response):
+    """Record a successful request for ``model`` (its response or final stream chunk)."""
+    get_manager().record_success(model, response)
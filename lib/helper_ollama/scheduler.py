@@ -0,0 +1,204 @@
+"""Client-side priority scheduler in front of every model call.
+
+Requests belong to one of three classes:
+
+- ``interactive``  a person is waiting on screen (the chatbot)
+- ``standard``     the default for pages and helpers
+- ``bulk``         batch jobs that should only use spare capacity
+
+At most ``slots`` calls run at once. Waiting calls are dispatched by
+weighted fair queuing: each class has a weight (default 16/4/1), so under
+contention interactive requests get sixteen turns for every bulk one, while
+an idle server still lets bulk work use every free slot. Per-class caps keep
+bulk work from taking the last slots, so a new chat message never waits
+behind a full batch.
+
+The class comes from the ``priority`` keyword of ``client.generate`` and
+friends, or from the surrounding ``with priority(BULK):`` block.
+
+Settings: ``OLLAMA_SCHEDULER_SLOTS`` (default: the client pool size) and
+``OLLAMA_SCHEDULER_BULK_CAP`` (default: one slot less than ``slots``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import itertools
+import os
+import threading
+import time
+from collections import deque
+
+INTERACTIVE = "interactive"
+STANDARD = "standard"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, STANDARD, BULK)
+DEFAULT_WEIGHTS = {INTERACTIVE: 16, STANDARD: 4, BULK: 1}
+
+_current = contextvars.ContextVar("ollama_priority", default=STANDARD)
+
+
+@contextlib.contextmanager
+def priority(name: str):
+    """Run calls made in this block (and tasks it starts) at priority ``name``."""
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown priority {name!r}; expected one of {PRIORITIES}")
+    token = _current.set(name)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def current_priority() -> str:
+    return _current.get()
+
+
+class _Ticket:
+    def __init__(self, tag: float, seq: int, grant):
+        self.tag = tag
+        self.seq = seq
+        self.grant = grant
+        self.enqueued = time.monotonic()
+
+
+class Scheduler:
+    """Weighted fair queue with a global slot limit and per-class caps."""
+
+    def __init__(self, slots: int, weights: dict | None = None, caps: dict | None = None):
+        self.slots = slots
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.caps = {p: slots for p in PRIORITIES}
+        self.caps[BULK] = max(1, slots - 1)
+        self.caps.update(caps or {})
+        self._lock = threading.Lock()
+        self._queues = {p: deque() for p in PRIORITIES}
+        self._running = {p: 0 for p in PRIORITIES}
+        self._last_tag = {p: 0.0 for p in PRIORITIES}
+        self._vtime = 0.0
+        self._seq = itertools.count()
+        self._served = {p: 0 for p in PRIORITIES}
+        self._waited = {p: 0.0 for p in PRIORITIES}
+
+    def _enqueue(self, name: str, grant) -> _Ticket:
+        if name not in PRIORITIES:
+            raise ValueError(f"Unknown priority {name!r}; expected one of {PRIORITIES}")
+        with self._lock:
+            start = max(self._vtime, self._last_tag[name])
+            ticket = _Ticket(start + 1 / self.weights[name], next(self._seq), grant)
+            self._last_tag[name] = ticket.tag
+            self._queues[name].append(ticket)
+            granted = self._dispatch()
+        for fn in granted:
+            fn()
+        return ticket
+
+    def _dispatch(self) -> list:
+        """Grant queued tickets while slots are free; call with the lock held."""
+        granted = []
+        while sum(self._running.values()) < self.slots:
+            eligible = [
+                p for p in PRIORITIES
+                if self._queues[p] and self._running[p] < self.caps[p]
+            ]
+            if not eligible:
+                break
+            name = min(eligible, key=lambda p: (self._queues[p][0].tag, self._queues[p][0].seq))
+            ticket = self._queues[name].popleft()
+            self._vtime = max(self._vtime, ticket.tag)
+            self._running[name] += 1
+            self._served[name] += 1
+            self._waited[name] += time.monotonic() - ticket.enqueued
+            granted.append(ticket.grant)
+        return granted
+
+    def _withdraw(self, name: str, ticket: _Ticket) -> bool:
+        """Remove a ticket that is still queued; False if it was already granted."""
+        with self._lock:
+            try:
+                self._queues[name].remove(ticket)
+            except ValueError:
+                return False
+            return True
+
+    def acquire(self, name: str = STANDARD):
+        """Block until a slot for class ``name`` is free."""
+        event = threading.Event()
+        self._enqueue(name, event.set)
+        event.wait()
+
+    async def aacquire(self, name: str = STANDARD):
+        """Async ``acquire``; cancelling while queued gives up the place in line."""
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def grant():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        ticket = self._enqueue(name, grant)
+        try:
+            await granted
+        except asyncio.CancelledError:
+            if not self._withdraw(name, ticket):
+                self.release(name)
+            raise
+
+    def release(self, name: str = STANDARD):
+        with self._lock:
+            self._running[name] -= 1
+            granted = self._dispatch()
+        for fn in granted:
+            fn()
+
+    @contextlib.contextmanager
+    def slot(self, name: str | None = None):
+        name = name or current_priority()
+        self.acquire(name)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    @contextlib.asynccontextmanager
+    async def aslot(self, name: str | None = None):
+        name = name or current_priority()
+        await self.aacquire(name)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    def stats(self) -> list:
+        """Per-class running, queued and average wait, for status displays."""
+        with self._lock:
+            return [
+                {
+                    "priority": p,
+                    "weight": self.weights[p],
+                    "cap": self.caps[p],
+                    "running": self._running[p],
+                    "queued": len(self._queues[p]),
+                    "served": self._served[p],
+                    "avg_wait_s": round(self._waited[p] / self._served[p], 3) if self._served[p] else 0.0,
+                }
+                for p in PRIORITIES
+            ]
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    """Return the process-wide scheduler shared by all sessions."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            slots = int(os.getenv("OLLAMA_SCHEDULER_SLOTS") or os.getenv("OLLAMA_CLIENT_POOL_SIZE", 10))
+            caps = {}
+            if os.getenv("OLLAMA_SCHEDULER_BULK_CAP"):
+                caps[BULK] = int(os.environ["OLLAMA_SCHEDULER_BULK_CAP"])
+            _scheduler = Scheduler(slots, caps=caps)
+        return _scheduler
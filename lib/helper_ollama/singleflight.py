@@ -0,0 +1,216 @@
+"""Single-flight coalescing of identical in-flight requests.
+
+When several sessions send the same deterministic request at the same time
+(same model, prompt and options, with temperature 0 or a fixed seed), only
+the first one goes upstream; the others wait for and share its result.
+Streaming requests are fanned out: every consumer replays the chunks
+received so far and then follows the live stream.
+
+Coroutines (``agenerate``/``achat``) are coalesced the same way among the
+callers awaiting on one event loop; the shared request is cancelled only
+when every caller waiting for it has been cancelled.
+
+Nothing is kept after a request finishes; this is not a cache.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import hashlib
+import json
+import threading
+import weakref
+
+from lib.helper_ollama import aio, client
+
+
+def is_deterministic(options: dict | None) -> bool:
+    """True when ``options`` pin sampling: temperature 0 or an explicit seed."""
+    options = options or {}
+    return options.get("temperature") == 0 or options.get("seed") is not None
+
+
+def request_key(endpoint: str, **kwargs) -> str:
+    """Canonical hash of an API call; ``stream`` does not change the key."""
+    payload = {k: v for k, v in kwargs.items() if k != "stream"}
+    canonical = json.dumps([endpoint, payload], sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Task:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class _Stream:
+    def __init__(self):
+        self.chunks = []
+        self.finished = False
+        self.error = None
+        self.cond = threading.Condition()
+
+
+class SingleFlight:
+    """Share the result of concurrent calls that have the same key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._streams = {}
+        self._tasks = weakref.WeakKeyDictionary()  # event loop -> {key: _Task}
+        self.leaders = 0
+        self.joined = 0
+
+    def do(self, key: str, fn):
+        """Return ``fn()``, or the result of an identical call already running."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.joined += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:  # followers must not read a missing result as None
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def ado(self, key: str, fn):
+        """Await ``fn()``, or the identical call already awaited on this event loop."""
+        with self._lock:
+            flights = self._tasks.setdefault(asyncio.get_running_loop(), {})
+            flight = flights.get(key)
+            if flight is None:
+                flight = flights[key] = _Task(asyncio.ensure_future(fn()))
+                flight.task.add_done_callback(lambda _: self._forget(flights, key, flight))
+                self.leaders += 1
+            else:
+                self.joined += 1
+            flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            with self._lock:
+                flight.waiters -= 1
+                abandoned = flight.waiters == 0 and not flight.task.done()
+            if abandoned:  # every caller was cancelled
+                self._forget(flights, key, flight)
+                flight.task.cancel()
+
+    def _forget(self, flights: dict, key: str, flight: _Task):
+        with self._lock:
+            if flights.get(key) is flight:
+                del flights[key]
+
+    def stream(self, key: str, fn):
+        """Iterate ``fn()`` shared with every concurrent consumer of ``key``."""
+        with self._lock:
+            flight = self._streams.get(key)
+            if flight is None:
+                flight = self._streams[key] = _Stream()
+                self.leaders += 1
+                # The pump runs in the caller's context (scheduler priority and other context variables).
+                context = contextvars.copy_context()
+                threading.Thread(target=context.run, args=(self._pump, key, flight, fn), daemon=True).start()
+            else:
+                self.joined += 1
+        return self._follow(flight)
+
+    def _pump(self, key: str, flight: _Stream, fn):
+        try:
+            for chunk in fn():
+                with flight.cond:
+                    flight.chunks.append(chunk)
+                    flight.cond.notify_all()
+        except BaseException as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                del self._streams[key]
+            with flight.cond:
+                flight.finished = True
+                flight.cond.notify_all()
+
+    @staticmethod
+    def _follow(flight: _Stream):
+        index = 0
+        while True:
+            with flight.cond:
+                while index >= len(flight.chunks) and not flight.finished:
+                    flight.cond.wait()
+                pending = flight.chunks[index:]
+                finished = flight.finished
+            yield from pending
+            index += len(pending)
+            if finished and index >= len(flight.chunks):
+                break
+        if flight.error is not None:
+            raise flight.error
+
+    def stats(self) -> dict:
+        return {"leaders": self.leaders, "joined": self.joined}
+
+
+_group = SingleFlight()
+
+
+def get_group() -> SingleFlight:
+    """Return the process-wide group shared by all sessions."""
+    return _group
+
+
+def _call(endpoint: str, fn, kwargs: dict):
+    if not is_deterministic(kwargs.get("options")):
+        return fn(**kwargs)
+    key = request_key(endpoint, **kwargs)
+    if kwargs.get("stream"):
+        return _group.stream(key, lambda: fn(**kwargs))
+    return _group.do(key, lambda: fn(**kwargs))
+
+
+async def _acall(endpoint: str, fn, kwargs: dict):
+    if not is_deterministic(kwargs.get("options")):
+        return await fn(**kwargs)
+    return await _group.ado(request_key(endpoint, **kwargs), lambda: fn(**kwargs))
+
+
+def generate(**kwargs):
+    """``client.generate`` with deterministic requests coalesced."""
+    return _call("generate", client.generate, kwargs)
+
+
+def chat(**kwargs):
+    """``client.chat`` with deterministic requests coalesced."""
+    return _call("chat", client.chat, kwargs)
+
+
+async def agenerate(**kwargs):
+    """``aio.agenerate`` with deterministic requests coalesced."""
+    return await _acall("generate", aio.agenerate, kwargs)
+
+
+async def achat(**kwargs):
+    """``aio.achat`` with deterministic requests coalesced."""
+    return await _acall("chat", aio.achat, kwargs)
@@ -0,0 +1,78 @@
+"""Throttled rendering of streamed model output into a Streamlit placeholder.
+
+Updating a placeholder on every token rebuilds the whole answer string and
+sends one websocket delta per token, so long answers spend more time
+re-rendering markdown than generating. ``render_stream`` keeps the chunks
+in a list, redraws at most ``fps`` times a second (or sooner once
+``flush_bytes`` of new text has arrived) and joins the text once at the
+end.
+"""
+
+from __future__ import annotations
+
+import time
+
+CURSOR = "▌"
+
+
+def chunk_text(chunk) -> str:
+    """Text carried by a ``chat`` or ``generate`` stream chunk ('' if none)."""
+    message = chunk.get("message")
+    if message is not None:
+        return message.get("content") or ""
+    return chunk.get("response") or ""
+
+
+class StreamRenderer:
+    """Collect streamed text and redraw ``placeholder`` at a bounded rate."""
+
+    def __init__(self, placeholder, fps: float = 10, flush_bytes: int = 2048, cursor: str = CURSOR, clock=time.monotonic):
+        self.placeholder = placeholder
+        self.interval = 1 / fps
+        self.flush_bytes = flush_bytes
+        self.cursor = cursor
+        self.renders = 0
+        self._clock = clock
+        self._parts = []
+        self._pending_bytes = 0
+        self._last_flush = clock()
+
+    def write(self, text: str):
+        """Add ``text``; redraws only when the frame interval or byte threshold is reached."""
+        if not text:
+            return
+        self._parts.append(text)
+        self._pending_bytes += len(text.encode())
+        now = self._clock()
+        if self._pending_bytes >= self.flush_bytes or now - self._last_flush >= self.interval:
+            self._render(self.text() + self.cursor)
+            self._last_flush = now
+
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def close(self) -> str:
+        """Draw the final text without the cursor and return it."""
+        text = self.text()
+        self._render(text)
+        return text
+
+    def _render(self, text: str):
+        self.placeholder.markdown(text)
+        self.renders += 1
+        self._pending_bytes = 0
+
+
+def render_stream(stream, placeholder, fps: float = 10, flush_bytes: int = 2048) -> str:
+    """Render a ``chat``/``generate`` stream into ``placeholder``; return the full text.
+
+    If the stream fails part-way, the text received so far stays on screen
+    (without the cursor) and the error propagates.
+    """
+    renderer = StreamRenderer(placeholder, fps=fps, flush_bytes=flush_bytes)
+    try:
+        for chunk in stream:
+            renderer.write(chunk_text(chunk))
+    finally:
+        text = renderer.close()
+    return text
@@ -0,0 +1,101 @@
+"""Text analysis helper used by the text analyzer mini app."""
+
+from __future__ import annotations
+
+from lib.helper_text import prompts
+from lib.helper_text.generator import agenerate_text, generate_text
+
+# Each request is the shared preamble, the text and then the task, so
+# repeated analyses of one text share everything up to the task line and the
+# server only evaluates the part after it (see ``lib.helper_text.prompts``).
+ANALYSIS_PREAMBLE = "You are a careful text analyst. Read the text below, then carry out the task that follows it."
+
+ANALYSIS_PROMPTS = {
+    "Summarize": "Summarize the text in 2-3 sentences.",
+    "Extract Key Points": "Extract the key points from the text as bullet points.",
+    "Sentiment Analysis": (
+        "Analyze the sentiment of the text. Give the overall sentiment "
+        "(Positive/Negative/Neutral), the key emotions and a brief explanation."
+    ),
+    "Find Main Topics": "List the main topics discussed in the text.",
+    "Translate to Simple Language": "Rewrite the text in simple, easy-to-understand language.",
+    "Grammar Check": "Check the text for grammar and spelling mistakes and list corrections.",
+}
+
+SAMPLE_TEXTS = {
+    "Technology News": (
+        "Artificial intelligence is transforming how we work and live. Machine learning models "
+        "now write code, translate languages and help doctors read medical images. While these "
+        "tools bring many benefits, they also raise important questions about privacy, bias and "
+        "the future of employment."
+    ),
+    "Product Review": (
+        "I absolutely love this coffee maker! It brews quickly, the coffee tastes great and it is "
+        "easy to clean. The only downside is that the water tank is a bit small, so I have to "
+        "refill it every other day."
+    ),
+    "Climate Report": (
+        "Rising global temperatures are causing ice caps to melt, sea levels to rise and weather "
+        "patterns to become more extreme. Scientists agree that burning fossil fuels is the primary "
+        "cause. Transitioning to renewable energy and improving efficiency are essential steps."
+    ),
+}
+
+ANALYSIS_TEMPERATURE = 0.3
+ANALYSIS_MAX_TOKENS = 400
+# A fixed seed makes analyses repeatable, so identical requests can be shared.
+ANALYSIS_SEED = 42
+
+
+def get_sample_text(title: str) -> str:
+    """Return the sample text stored under ``title``."""
+    return SAMPLE_TEXTS[title]
+
+
+def build_prompt(text: str, analysis_type: str) -> str:
+    """Return the prompt for ``analysis_type`` applied to ``text``."""
+    return prompts.assemble(ANALYSIS_PREAMBLE, {"Text": text}, task=f"Task: {ANALYSIS_PROMPTS[analysis_type]}")
+
+
+def analyze_text(model: str, text: str, analysis_type: str, track: bool = True) -> dict:
+    """Run ``analysis_type`` on ``text``; same result shape as ``generate_text``.
+
+    Prompts sent to the server are recorded for ``prompts.shared_prefix``
+    unless ``track`` is false (background warm-up).
+    """
+    if analysis_type not in ANALYSIS_PROMPTS:
+        return {"status": "error", "message": f"Unknown analysis type: {analysis_type}"}
+
+    prompt = build_prompt(text, analysis_type)
+    result = generate_text(
+        model=model,
+        prompt=prompt,
+        temperature=ANALYSIS_TEMPERATURE,
+        max_tokens=ANALYSIS_MAX_TOKENS,
+        seed=ANALYSIS_SEED,
+    )
+    return _track(model, prompt, result, track)
+
+
+async def aanalyze_text(model: str, text: str, analysis_type: str, track: bool = True) -> dict:
+    """Async ``analyze_text``; same result shape."""
+    if analysis_type not in ANALYSIS_PROMPTS:
+        return {"status": "error", "message": f"Unknown analysis type: {analysis_type}"}
+
+    prompt = build_prompt(text, analysis_type)
+    result = await agenerate_text(
+        model=model,
+        prompt=prompt,
+        temperature=ANALYSIS_TEMPERATURE,
+        max_tokens=ANALYSIS_MAX_TOKENS,
+        seed=ANALYSIS_SEED,
+    )
+    return _track(model, prompt, result, track)
+
+
+def _track(model: str, prompt: str, result: dict, track: bool) -> dict:
+    # Only prompts that reached the server: a cached answer leaves its reuse unchanged.
+    if track and result["status"] == "success" and result["stats"].get("source") != "cache":
+        shared = prompts.shared_prefix(model, prompt)
+        result["stats"]["shared_prefix"] = f"{shared}/{len(prompt)} chars"
+    return result
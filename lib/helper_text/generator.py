@@ -0,0 +1,97 @@
+"""Text generation helper used by the text generator mini app."""
+
+from __future__ import annotations
+
+from lib.helper_cache import tiered
+from lib.helper_ollama import singleflight
+
+
+def generate_text(
+    model: str,
+    prompt: str,
+    temperature: float = 0.7,
+    max_tokens: int = 200,
+    seed: int | None = None,
+) -> dict:
+    """Generate text for ``prompt``.
+
+    Returns ``{'status': 'success', 'response', 'stats'}`` on success and
+    ``{'status': 'error', 'message'}`` on failure. With ``temperature`` 0 or
+    a ``seed``, answers come from the two-tier response cache (shared by all
+    worker processes) when possible, and identical concurrent calls share
+    one upstream request.
+    """
+    options = _options(temperature, max_tokens, seed)
+    key = tiered.key_for(model, prompt, options)
+    cached = tiered.lookup(key)
+    if cached is not None:
+        return _result(model, cached, cached=True)
+
+    try:
+        response = singleflight.generate(model=model, prompt=prompt, options=options)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+    _cache_put(key, response)
+    return _result(model, response)
+
+
+async def agenerate_text(
+    model: str,
+    prompt: str,
+    temperature: float = 0.7,
+    max_tokens: int = 200,
+    seed: int | None = None,
+) -> dict:
+    """Async ``generate_text``; same result shape and response cache."""
+    options = _options(temperature, max_tokens, seed)
+    key = tiered.key_for(model, prompt, options)
+    cached = tiered.lookup(key)
+    if cached is not None:
+        return _result(model, cached, cached=True)
+
+    try:
+        response = await singleflight.agenerate(model=model, prompt=prompt, options=options)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+    _cache_put(key, response)
+    return _result(model, response)
+
+
+def _options(temperature: float, max_tokens: int, seed: int | None) -> dict:
+    options = {"temperature": temperature, "num_predict": max_tokens}
+    if seed is not None:
+        options["seed"] = seed
+    return options
+
+
+_CACHED_FIELDS = ("response", "total_duration", "prompt_eval_count", "eval_count", "eval_duration")
+
+
+def _cache_put(key: str | None, response):
+    tiered.store(key, {f: response.get(f) for f in _CACHED_FIELDS})
+
+
+def _result(model: str, response, cached: bool = False) -> dict:
+    stats = _stats(model, response)
+    if cached:
+        stats["source"] = "cache"
+    return {
+        "status": "success",
+        "response": response["response"],
+        "stats": stats,
+    }
+
+
+def _stats(model: str, response) -> dict:
+    total_duration = (response.get("total_duration") or 0) / 1e9
+    eval_count = response.get("eval_count") or 0
+    eval_duration = (response.get("eval_duration") or 0) / 1e9
+    return {
+        "model": model,
+        "total_duration": f"{total_duration:.2f}s",
+        "prompt_tokens": response.get("prompt_eval_count") or 0,
+        "tokens": eval_count,
+        "tokens_per_second": f"{eval_count / eval_duration:.1f}" if eval_duration else "N/A",
+    }
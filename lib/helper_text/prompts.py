@@ -0,0 +1,82 @@
+"""Prefix-stable prompt assembly.
+
+Ollama keeps the evaluated tokens of a model's previous prompt and only
+evaluates the part of the next prompt after the longest common prefix. A
+prompt that starts with options ("Summarize ... in 2-3 sentences as bullet
+points: <text>") changes at its first words whenever the user tweaks an
+option, so the whole text is evaluated again.
+
+``assemble`` orders prompts from most to least stable: a fixed preamble,
+then the user's material (which stays the same while they iterate on it),
+then the task and options, which change most often. Only the preamble's
+whitespace is canonicalized (it is usually an indented triple-quoted
+literal in the code, and the same instructions must always produce the same
+prefix); the user's material and the task lines are sent as given, since
+their whitespace can be meaningful (code, tables, poetry).
+
+``shared_prefix`` reports how many leading characters a prompt shares with
+the previous prompt sent to the same model in this process, an estimate of
+what the server can reuse. Call it once a prompt has actually been sent:
+answers served from a cache never reach the server, so they do not change
+what it can reuse.
+"""
+
+from __future__ import annotations
+
+import inspect
+import os
+import re
+import threading
+
+
+def canonicalize(text: str) -> str:
+    """Dedent, strip trailing spaces, collapse blank-line runs and trim.
+
+    Dedenting follows ``inspect.cleandoc``: an unindented first line does not
+    stop the following lines of a triple-quoted literal from being dedented.
+    """
+    text = inspect.cleandoc(text.replace("\r\n", "\n"))
+    text = "\n".join(line.rstrip() for line in text.split("\n"))
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def assemble(preamble: str, sections: dict, task: str | list = ()) -> str:
+    """Build ``preamble`` (canonicalized), then each ``Label:`` section, then the ``task`` lines."""
+    parts = [canonicalize(preamble)]
+    for label, text in sections.items():
+        parts.append(f"{label}:\n{text}")
+    lines = [task] if isinstance(task, str) else list(task)
+    if lines:
+        parts.append("\n".join(line for line in lines if line))
+    return "\n\n".join(p for p in parts if p)
+
+
+class PrefixTracker:
+    """Remember the last prompt per model and measure overlap with the next one."""
+
+    def __init__(self):
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model: str, prompt: str) -> int:
+        """Characters ``prompt`` shares with the previous prompt for ``model``."""
+        with self._lock:
+            previous = self._last.get(model, "")
+            self._last[model] = prompt
+        return len(os.path.commonprefix([previous, prompt]))
+
+
+_tracker = PrefixTracker()
+
+
+def shared_prefix(model: str, prompt: str) -> int:
+    """``PrefixTracker.observe`` on the process-wide tracker."""
+    return _tracker.observe(model, prompt)
+
+
+def describe_reuse(shared: int, prompt: str, response=None) -> str:
+    """One-line summary of prefix reuse for a request, for captions."""
+    summary = f"Shared prompt prefix: {shared}/{len(prompt)} chars"
+    if response is not None and response.get("prompt_eval_count") is not None:
+        summary += f" · prompt tokens evaluated: {response['prompt_eval_count']}"
+    return summary
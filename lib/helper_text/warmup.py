@@ -0,0 +1,149 @@
+"""Background warm-up of the text analyzer's most common requests.
+
+The text analyzer's sample texts run through its analysis types on the
+default model make up most demo traffic. Analyses are deterministic (fixed
+seed), so their answers live in the shared response cache;
+``start`` computes the configured (model, sample, analysis type)
+combinations once per process on a background thread at ``bulk`` priority,
+so the first click is served from the cache and real users still go first.
+
+Warming is idempotent: combinations already in the response cache are
+served from it and not generated again, so restarts and several worker
+processes sharing the cache cost only lookups.
+
+The combinations come from a TOML file (``OLLAMA_WARMUP_CONFIG``, default
+``warmup.toml`` in the working directory)::
+
+    enabled = true
+    models = ["phi4-mini"]
+    samples = []          # titles from analyzer.SAMPLE_TEXTS; empty = all
+    analysis_types = []   # keys of analyzer.ANALYSIS_PROMPTS; empty = all
+
+Without the file, with ``enabled = false`` or with the response cache
+disabled (``OLLAMA_RESPONSE_CACHE=0``), nothing is warmed.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import tomllib
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from lib.helper_cache import tiered
+from lib.helper_ollama import scheduler
+from lib.helper_text import analyzer
+
+
+@dataclass(frozen=True)
+class WarmupConfig:
+    enabled: bool = False
+    models: tuple = ("phi4-mini",)
+    samples: tuple = ()
+    analysis_types: tuple = ()
+
+    @classmethod
+    def load(cls, path: str | None = None) -> "WarmupConfig":
+        """Read ``path`` (default ``OLLAMA_WARMUP_CONFIG``); disabled when the file is missing."""
+        path = path or os.getenv("OLLAMA_WARMUP_CONFIG", "warmup.toml")
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+        return cls(
+            enabled=bool(data.get("enabled", True)),
+            models=tuple(data.get("models") or cls.models),
+            samples=tuple(data.get("samples") or ()),
+            analysis_types=tuple(data.get("analysis_types") or ()),
+        )
+
+    def jobs(self) -> list[tuple[str, str, str]]:
+        """``(model, sample title, analysis type)`` for every configured combination."""
+        samples = self.samples or tuple(analyzer.SAMPLE_TEXTS)
+        types = self.analysis_types or tuple(analyzer.ANALYSIS_PROMPTS)
+        unknown = [s for s in samples if s not in analyzer.SAMPLE_TEXTS]
+        unknown += [t for t in types if t not in analyzer.ANALYSIS_PROMPTS]
+        if unknown:
+            raise ValueError(f"Unknown warm-up samples or analysis types: {', '.join(unknown)}")
+        return [(m, s, t) for m in self.models for s in samples for t in types]
+
+
+@dataclass
+class WarmupStatus:
+    state: str = "idle"   # idle, running, done, error or disabled
+    total: int = 0
+    generated: int = 0
+    cached: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def run(config: WarmupConfig, status: WarmupStatus | None = None) -> WarmupStatus:
+    """Analyze every configured combination at bulk priority; combinations are independent.
+
+    ``status`` is updated under the module lock as jobs finish, so
+    ``status()`` can be read from other threads meanwhile.
+    """
+    status = status or WarmupStatus()
+    if tiered.get_cache() is None:
+        with _lock:
+            status.state = "disabled"  # answers would not be kept: warming would only load the server
+        return status
+    start = time.monotonic()
+    try:
+        jobs = config.jobs()
+        with _lock:
+            status.state, status.total = "running", len(jobs)
+        with scheduler.priority(scheduler.BULK):
+            for model, sample, analysis_type in jobs:
+                result = analyzer.analyze_text(model, analyzer.get_sample_text(sample), analysis_type, track=False)
+                with _lock:
+                    if result["status"] != "success":
+                        status.failed += 1
+                        status.errors.append(f"{model} / {sample} / {analysis_type}: {result['message']}")
+                    elif result["stats"].get("source") == "cache":
+                        status.cached += 1
+                    else:
+                        status.generated += 1
+    except Exception as e:
+        with _lock:
+            status.state, status.seconds = "error", time.monotonic() - start
+            status.errors.append(str(e) or type(e).__name__)
+        return status
+    with _lock:
+        status.state, status.seconds = "done", time.monotonic() - start
+    return status
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="warmup")
+_started = None
+_status = WarmupStatus()
+_lock = threading.Lock()
+
+
+def start(config: WarmupConfig | None = None) -> Future | None:
+    """Warm the cache in the background, once per process; None when disabled."""
+    global _started
+    with _lock:
+        if _started is not None or _status.state != "idle":
+            return _started
+        try:
+            config = config or WarmupConfig.load()
+        except (OSError, ValueError) as e:  # unreadable or invalid TOML
+            _status.state = "error"
+            _status.errors.append(f"Cannot read the warm-up config: {e}")
+            return None
+        if not config.enabled or tiered.get_cache() is None:
+            _status.state = "disabled"
+            return None
+        _started = _executor.submit(run, config, _status)
+        return _started
+
+
+def status() -> dict:
+    """Progress of this process's warm-up."""
+    with _lock:
+        return dict(vars(_status), errors=list(_status.errors))
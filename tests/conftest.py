@@ -0,0 +1,25 @@
+import pytest
+
+from lib.helper_ollama.fake_server import FakeConfig, FakeOllamaServer
+
+
+@pytest.fixture(autouse=True)
+def _isolated_caches(tmp_path, monkeypatch):
+    """Keep on-disk caches written by the helpers inside the test's tmp dir."""
+    monkeypatch.setenv("OLLAMA_RESPONSE_CACHE_PATH", str(tmp_path / "responses.sqlite3"))
+    monkeypatch.setenv("OLLAMA_EMBEDDING_CACHE_DIR", str(tmp_path / "embeddings"))
+    monkeypatch.setenv("OLLAMA_VISION_CACHE_DIR", str(tmp_path / "vision"))
+
+
+@pytest.fixture
+def fake_ollama(request, monkeypatch):
+    """A fake Ollama server the client talks to through OLLAMA_HOST.
+
+    Override its FakeConfig fields with indirect parametrization::
+
+        @pytest.mark.parametrize("fake_ollama", [{"num_predict": 20}], indirect=True)
+    """
+    config = {"num_predict": 5, **getattr(request, "param", {})}
+    with FakeOllamaServer(FakeConfig(**config)) as server:
+        monkeypatch.setenv("OLLAMA_HOST", server.url)
+        yield server
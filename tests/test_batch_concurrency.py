@@ -0,0 +1,87 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from lib.helper_batch import concurrency
+from lib.helper_batch.concurrency import AIMDController
+from lib.helper_batch.processor import BatchProcessor
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(concurrency, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def _sample(controller, clock, tokens, latency=1.0, error=None):
+    """Finish one sample's worth of items, spread over one second."""
+    n = max(controller.sample, controller.limit)
+    for _ in range(n):
+        clock[0] += 1 / n
+        controller.observe(latency, {"eval_count": tokens // n}, error)
+
+
+def test_limit_grows_while_throughput_grows(clock):
+    controller = AIMDController(initial=1, maximum=4, sample=2)
+    for tokens in (100, 200, 300, 400, 500):
+        _sample(controller, clock, tokens)
+    assert controller.limit == 4
+    assert [d["reason"] for d in controller.decisions] == ["probe"] * 5
+
+
+def test_falling_throughput_halves_the_limit(clock):
+    controller = AIMDController(initial=8, sample=8)
+    _sample(controller, clock, 800)
+    _sample(controller, clock, 400)
+    assert controller.limit == 4
+    assert controller.decisions[-1]["reason"] == "throughput fell"
+    assert controller.stats()["decreases"] == 1
+
+
+def test_rising_latency_without_gain_holds(clock):
+    controller = AIMDController(initial=4, sample=4)
+    _sample(controller, clock, 400, latency=1.0)
+    _sample(controller, clock, 400, latency=2.0)
+    assert controller.limit == 5
+    assert controller.decisions[-1]["reason"] == "plateau"
+
+
+def test_latency_target(clock):
+    controller = AIMDController(initial=4, sample=4, latency_target=0.5)
+    _sample(controller, clock, 400, latency=1.0)
+    assert (controller.limit, controller.decisions[-1]["reason"]) == (2, "latency")
+
+
+def test_timeouts_back_off_once_per_burst(clock):
+    controller = AIMDController(initial=8, sample=8)
+    clock[0] = 10.0
+    for _ in range(4):  # four requests sent together all time out
+        controller.observe(5.0, error=TimeoutError())
+    assert controller.limit == 4
+    assert controller.stats()["timeouts"] == 4
+    assert [d["reason"] for d in controller.decisions] == ["timeout"]
+
+
+def test_processor_follows_the_limit():
+    slots = threading.Semaphore(2)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def fn(item):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        with slots:
+            time.sleep(0.005)
+        with lock:
+            active[0] -= 1
+        return "some words here"
+
+    controller = AIMDController(initial=1, maximum=3)
+    processor = BatchProcessor(fn, window=16, concurrency=controller, priority=None)
+    assert len(list(processor.run(range(100)))) == 100
+    assert peak[0] <= 3
+    assert processor.stats()["concurrency"]["decisions"] > 0
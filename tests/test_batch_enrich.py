@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+
+from lib.helper_batch.enrich import enrich_csv, render
+
+
+@pytest.fixture
+def reviews(tmp_path):
+    path = tmp_path / "reviews.csv"
+    pd.DataFrame({"id": range(25), "review_text": [f"review {i}" for i in range(25)]}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_render_maps_fields_to_columns():
+    row = {"review_text": "Great!", "stars": None}
+    assert render("Review: {review} ({stars})", row, {"review": "review_text"}) == "Review: Great! ()"
+
+
+def test_chunks_are_written_as_they_finish(reviews, tmp_path):
+    destination = str(tmp_path / "out.csv")
+    written = []
+
+    def on_chunk(chunks, rows):
+        written.append((chunks, rows, len(pd.read_csv(destination))))
+
+    stats = enrich_csv(
+        reviews, destination,
+        template="Sentiment of: {review}",
+        columns={"review": "review_text"},
+        output_column="sentiment",
+        chunksize=10, window=4,
+        fn=lambda prompt: prompt.upper(),
+        on_chunk=on_chunk,
+    )
+
+    assert (stats["rows"], stats["chunks"], stats["failed"]) == (25, 3, 0)
+    assert written == [(1, 10, 10), (2, 20, 20), (3, 25, 25)]
+    out = pd.read_csv(destination)
+    assert list(out["id"]) == list(range(25))
+    assert out["sentiment"][7] == "SENTIMENT OF: REVIEW 7"
+
+
+def test_failed_rows_keep_their_error(reviews, tmp_path):
+    def fn(prompt):
+        if prompt.endswith("review 3"):
+            raise RuntimeError("model exploded")
+        return "ok"
+
+    destination = str(tmp_path / "out.csv")
+    stats = enrich_csv(reviews, destination, "{review_text}", chunksize=10, fn=fn)
+    out = pd.read_csv(destination, keep_default_na=False)
+    assert stats["failed"] == 1
+    assert (out["enriched"][3], out["enrich_error"][3]) == ("", "model exploded")
+    assert out["enriched"][4] == "ok"
+
+
+def test_unknown_template_field(reviews, tmp_path):
+    with pytest.raises(ValueError, match="review"):
+        enrich_csv(reviews, str(tmp_path / "out.csv"), "{review}", fn=str)
+
+
+def test_header_only_source_writes_the_header(tmp_path):
+    source = tmp_path / "empty.csv"
+    source.write_text("id,review_text\n")
+    destination = str(tmp_path / "out.csv")
+
+    stats = enrich_csv(str(source), destination, "{review_text}", output_column="sentiment", fn=str)
+
+    assert (stats["rows"], stats["chunks"]) == (0, 1)
+    out = pd.read_csv(destination)
+    assert list(out.columns) == ["id", "review_text", "sentiment", "enrich_error"]
+    assert out.empty
+
+
+def test_parquet_output_is_a_directory_of_parts(reviews, tmp_path):
+    pytest.importorskip("pyarrow")
+    destination = tmp_path / "out.parquet"
+    enrich_csv(reviews, str(destination), "{review_text}", chunksize=10, fn=lambda prompt: "x")
+    assert sorted(p.name for p in destination.iterdir()) == [f"part-{i:05d}.parquet" for i in range(3)]
+    assert len(pd.read_parquet(destination)) == 25
+
+
+def test_rows_go_through_the_model(reviews, tmp_path, fake_ollama):
+    stats = enrich_csv(reviews, str(tmp_path / "out.csv"), "Summarize: {review_text}", model="phi", chunksize=10)
+    assert (stats["rows"], stats["failed"]) == (25, 0)
+    assert fake_ollama.request_count >= 25
@@ -0,0 +1,85 @@
+import json
+
+from lib.helper_batch.journal import Journal
+from lib.helper_batch.processor import BatchProcessor
+
+
+def test_resume_skips_items_already_done(tmp_path):
+    path = str(tmp_path / "job.jsonl")
+    calls = []
+
+    def fn(item):
+        calls.append(item)
+        return item * 10
+
+    with Journal(path) as journal:
+        results = BatchProcessor(fn, window=4, priority=None).run(range(100), journal=journal)
+        for _ in range(30):
+            next(results)
+        results.close()  # interrupted after 30 results
+
+    calls.clear()
+    processor = BatchProcessor(fn, window=4, priority=None)
+    with Journal(path) as journal:
+        assert journal.recovered >= 30
+        list(processor.run(range(100), journal=journal))
+        entries = journal.results()
+
+    assert len(calls) == 100 - processor.stats()["skipped"] <= 70
+    assert sorted(entries) == list(range(100))
+    assert all(entries[i]["value"] == i * 10 for i in range(100))
+
+
+def test_failures_are_retried_on_resume(tmp_path):
+    path = str(tmp_path / "job.jsonl")
+
+    def flaky(item):
+        if item == 2:
+            raise RuntimeError("boom")
+        return item
+
+    with Journal(path) as journal:
+        list(BatchProcessor(flaky, priority=None).run(range(4), journal=journal))
+        assert journal.failed == {2}
+
+    with Journal(path) as journal:
+        processor = BatchProcessor(lambda item: item, priority=None)
+        assert [r.id for r in processor.run(range(4), journal=journal)] == [2]
+        assert journal.results()[2]["error"] is None
+
+    with Journal(path, retry_failed=False) as journal:
+        assert journal.should_skip(2) and not journal.failed
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = tmp_path / "job.jsonl"
+    path.write_text(json.dumps({"id": "a", "value": 1, "error": None}) + '\n{"id": "b", "val')
+
+    with Journal(str(path)) as journal:
+        assert journal.done == {"a"}
+        assert journal.corrupt_lines == 1
+        processor = BatchProcessor(lambda item: item["n"], key=lambda item: item["id"], priority=None)
+        list(processor.run([{"id": "a", "n": 1}, {"id": "b", "n": 2}], journal=journal))
+
+    with Journal(str(path)) as journal:
+        assert journal.done == {"a", "b"}
+
+
+def test_records_are_synced_in_batches(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr("lib.helper_batch.journal.os.fsync", synced.append)
+
+    with Journal(str(tmp_path / "job.jsonl"), sync_every=10, sync_seconds=60) as journal:
+        list(BatchProcessor(lambda item: item, priority=None).run(range(25), journal=journal))
+    # two full batches, then the rest when the run ends
+    assert len(synced) == 3
+
+
+def test_values_json_cannot_represent_are_journaled_as_text(tmp_path):
+    path = str(tmp_path / "job.jsonl")
+    with Journal(path) as journal:
+        results = list(BatchProcessor(lambda x: {x}, priority=None).run(range(3), journal=journal))
+        entries = journal.results()
+
+    assert {r.id: r.value for r in results} == {0: {0}, 1: {1}, 2: {2}}
+    assert [entries[i]["value"] for i in range(3)] == ["{0}", "{1}", "{2}"]
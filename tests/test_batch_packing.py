@@ -0,0 +1,129 @@
+import json
+import re
+
+import pytest
+
+from lib.helper_batch.packing import PackedClassifier, parse_labels
+
+LABELS = ("Positive", "Negative", "Neutral")
+
+
+def _items(prompt):
+    return re.findall(r"^\d+\. (.*)$", prompt, re.MULTILINE)
+
+
+def labeller(prompt, options):
+    """Answers 'Positive' for items containing 'good', else 'Negative'."""
+    return "Sure!\n" + json.dumps(["Positive" if "good" in item else "Negative" for item in _items(prompt)])
+
+
+def test_parse_labels():
+    assert parse_labels('["positive", "Neutral"]', 2, LABELS) == ["Positive", "Neutral"]
+    assert parse_labels('Answer: ["Positive", "great"]', 2, LABELS) == ["Positive", None]
+    assert parse_labels('["Positive"]', 2, LABELS) is None
+    assert parse_labels("Positive, Negative", 2, LABELS) is None
+
+
+def test_many_items_per_request():
+    requests = []
+
+    def fn(prompt, options):
+        requests.append(options["num_predict"])
+        return labeller(prompt, options)
+
+    classifier = PackedClassifier(LABELS, max_items=20, fn=fn)
+    texts = [f"review {i} was {'good' if i % 2 else 'bad'}" for i in range(200)]
+    results = {r.id: r.value for r in classifier.run(texts)}
+
+    assert results == {i: "Positive" if i % 2 else "Negative" for i in range(200)}
+    assert len(requests) == 10
+    assert classifier.stats()["labels_per_request"] == 20
+    assert max(requests) >= 20  # room for a label per item
+
+
+def test_invalid_labels_are_requeued():
+    answers = iter([
+        json.dumps(["Positive", "Meh", "Negative"]),   # item 1 gets an unknown label
+        json.dumps(["Neutral"]),                       # item 1 alone on retry
+    ])
+    classifier = PackedClassifier(LABELS, fn=lambda prompt, options: next(answers), window=1)
+    results = {r.id: r.value for r in classifier.run(["a", "b", "c"])}
+    assert results == {0: "Positive", 1: "Neutral", 2: "Negative"}
+    assert classifier.stats()["requeued"] == 1
+
+
+def test_wrong_length_requeues_the_pack_and_shrinks_it():
+    calls = []
+
+    def fn(prompt, options):
+        items = _items(prompt)
+        calls.append(len(items))
+        if len(calls) == 1:
+            return json.dumps(["Positive"] * (len(items) - 1))  # skipped an item
+        return labeller(prompt, options)
+
+    classifier = PackedClassifier(LABELS, max_items=8, fn=fn, window=1)
+    results = list(classifier.run([f"item {i}" for i in range(8)]))
+    assert sorted(r.id for r in results) == list(range(8))
+    assert calls[0] == 8 and calls[1] == 4
+
+
+def test_items_that_never_get_a_label_fail_with_the_last_reason():
+    classifier = PackedClassifier(LABELS, max_attempts=2, fn=lambda prompt, options: "no idea")
+    results = list(classifier.run(["a", "b"]))
+    assert [r.error for r in results] == ["no valid label after 2 attempts: answer was not a JSON array of 1 labels"] * 2
+    assert classifier.stats()["failed"] == 2
+
+    def down(prompt, options):
+        raise ConnectionError("server down")
+
+    results = list(PackedClassifier(LABELS, max_attempts=2, fn=down).run(["a"]))
+    assert results[0].error == "no valid label after 2 attempts: server down"
+
+    results = list(PackedClassifier(LABELS, max_attempts=1, fn=lambda prompt, options: '["Meh"]').run(["a"]))
+    assert results[0].error.endswith("answer was not one of: Positive, Negative, Neutral")
+
+
+def test_labels_are_required():
+    with pytest.raises(ValueError, match="at least one label"):
+        PackedClassifier([])
+
+
+def test_retries_are_sent_before_the_input_runs_out():
+    pulled = []
+    waiting = []
+
+    def texts():
+        for i in range(200):
+            pulled.append(i)
+            yield f"item {i}"
+
+    def fn(prompt, options):
+        return json.dumps(["Meh"] * len(_items(prompt)))  # never a valid label
+
+    classifier = PackedClassifier(LABELS, max_items=10, max_attempts=3, window=2, fn=fn)
+    for result in classifier.run(texts()):
+        waiting.append(len(pulled) - result.id)
+    # every item is settled long before the whole input has been read
+    assert classifier.stats()["failed"] == 200
+    assert max(waiting) < 100
+
+
+def test_packs_fit_the_context_window():
+    sizes = []
+
+    def fn(prompt, options):
+        sizes.append(len(_items(prompt)))
+        return labeller(prompt, options)
+
+    classifier = PackedClassifier(LABELS, options={"num_ctx": 512}, max_items=50, fn=fn)
+    list(classifier.run(["x" * 400] * 12))  # ~100 tokens each
+    assert max(sizes) <= 4
+    assert sum(sizes) == 12
+
+
+def test_answers_from_the_server_are_validated(fake_ollama):
+    classifier = PackedClassifier(LABELS, model="phi", max_attempts=2)
+    results = list(classifier.run(["good", "bad", "fine"]))
+    # the fake server never answers with JSON: every item is retried, then fails
+    assert len(results) == 3 and not any(r.ok for r in results)
@@ -0,0 +1,86 @@
+import random
+import threading
+import time
+
+import pytest
+
+from lib.helper_batch.processor import BatchProcessor, prompt_fn
+
+
+def _jitter(item):
+    time.sleep(random.uniform(0, 0.01))
+    return item * 2
+
+
+@pytest.mark.parametrize("ordered", [False, True])
+def test_window_bounds_items_in_flight(ordered):
+    processor = BatchProcessor(_jitter, window=4, ordered=ordered, priority=None)
+    results = list(processor.run(range(50)))
+
+    values = [r.value for r in results]
+    assert sorted(values) == [i * 2 for i in range(50)]
+    if ordered:
+        assert values == [i * 2 for i in range(50)]
+    stats = processor.stats()
+    assert (stats["submitted"], stats["completed"], stats["failed"]) == (50, 50, 0)
+    assert stats["max_pending"] <= 4
+
+
+def test_input_is_not_read_ahead_of_a_slow_consumer():
+    read = 0
+
+    def items():
+        nonlocal read
+        for i in range(1000):
+            read += 1
+            yield i
+
+    processor = BatchProcessor(lambda i: i, window=3, priority=None)
+    results = processor.run(items())
+    for _ in range(5):
+        next(results)
+        time.sleep(0.01)
+    assert read <= 5 + 3
+    results.close()
+
+
+def test_failures_are_captured_per_item():
+    def fn(item):
+        if item == 3:
+            raise ValueError("bad item")
+        return item
+
+    results = {r.id: r for r in BatchProcessor(fn, window=2, priority=None).run(range(6))}
+    assert not results[3].ok
+    assert results[3].error == "bad item"
+    assert isinstance(results[3].exception, ValueError)
+    assert all(results[i].ok for i in (0, 1, 2, 4, 5))
+
+
+def test_key_sets_item_ids():
+    items = [{"id": "a", "n": 1}, {"id": "b", "n": 2}]
+    processor = BatchProcessor(lambda item: item["n"], key=lambda item: item["id"], ordered=True, priority=None)
+    assert [(r.id, r.value) for r in processor.run(items)] == [("a", 1), ("b", 2)]
+
+
+def test_closing_early_cancels_pending_items():
+    started = []
+    gate = threading.Event()
+
+    def fn(item):
+        started.append(item)
+        gate.wait(1)
+        return item
+
+    results = BatchProcessor(fn, window=2, priority=None).run(range(100))
+    gate.set()
+    next(results)
+    results.close()
+    assert len(started) <= 4
+
+
+def test_prompt_fn_runs_against_the_server(fake_ollama):
+    processor = BatchProcessor(prompt_fn("phi", {"num_predict": 5}), window=2)
+    results = list(processor.run(["one", {"prompt": "two"}, "three"]))
+    assert all(r.ok and r.value for r in results)
+    assert fake_ollama.request_count >= 3
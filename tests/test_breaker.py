@@ -0,0 +1,164 @@
+import time
+
+import pytest
+
+from lib.helper_ollama.breaker import CircuitBreaker, CircuitOpenError
+
+
+class ServerError(Exception):
+    status_code = 500
+
+
+class NotFound(Exception):
+    status_code = 404
+
+
+def fail(error):
+    def fn():
+        raise error
+    return fn
+
+
+def test_opens_after_failures_and_fails_fast():
+    breaker = CircuitBreaker("h", "m", failure_threshold=2, reset_timeout=60)
+
+    for _ in range(2):
+        with pytest.raises(ServerError):
+            breaker.call(fail(ServerError()))
+
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "never called")
+    assert breaker.snapshot()["state"] == "open"
+
+
+def test_client_errors_do_not_trip():
+    breaker = CircuitBreaker("h", "m", failure_threshold=1)
+
+    with pytest.raises(NotFound):
+        breaker.call(fail(NotFound()))
+
+    assert breaker.call(lambda: "ok") == "ok"
+
+
+def test_half_open_probe_closes_on_success():
+    breaker = CircuitBreaker("h", "m", failure_threshold=1, reset_timeout=0.05)
+    with pytest.raises(ServerError):
+        breaker.call(fail(ServerError()))
+
+    time.sleep(0.06)
+
+    assert breaker.call(lambda: "probe") == "probe"
+    assert breaker.snapshot()["state"] == "closed"
+
+
+def test_adaptive_timeout_cuts_off_slow_calls():
+    breaker = CircuitBreaker("h", "m", min_timeout=0.05, max_timeout=5, min_samples=3)
+    assert breaker.timeout() == 5
+
+    for _ in range(3):
+        breaker.call(lambda: time.sleep(0.01))
+    assert breaker.timeout() == pytest.approx(0.05, abs=0.02)
+
+    with pytest.raises(TimeoutError):
+        breaker.call(lambda: time.sleep(0.5))
+
+
+def test_stream_timeout_covers_first_chunk():
+    breaker = CircuitBreaker("h", "m", failure_threshold=1, max_timeout=0.05)
+
+    def slow_stream():
+        time.sleep(0.5)
+        yield "late"
+
+    with pytest.raises(TimeoutError):
+        list(breaker.stream(slow_stream))
+    with pytest.raises(CircuitOpenError):
+        breaker.stream(slow_stream)
+
+
+def test_abandoned_call_keeps_its_slot_until_it_finishes():
+    breaker = CircuitBreaker("h", "m", max_timeout=0.05)
+    released = []
+
+    with pytest.raises(TimeoutError):
+        breaker.call(lambda: time.sleep(0.3), release=lambda: released.append("call"))
+    assert released == []  # still running on the server
+
+    def slow_stream():
+        time.sleep(0.3)
+        yield "late"
+
+    with pytest.raises(TimeoutError):
+        list(breaker.stream(slow_stream, release=lambda: released.append("stream")))
+    assert released == []
+
+    time.sleep(0.5)
+    assert sorted(released) == ["call", "stream"]
+
+
+def test_slot_is_released_once_on_success_and_error():
+    breaker = CircuitBreaker("h", "m")
+    released = []
+
+    assert breaker.call(lambda: "ok", release=lambda: released.append(1)) == "ok"
+    with pytest.raises(ServerError):
+        breaker.call(fail(ServerError()), release=lambda: released.append(2))
+    assert list(breaker.stream(lambda: iter("ab"), release=lambda: released.append(3))) == ["a", "b"]
+    assert released == [1, 2, 3]
+
+
+def test_client_backlog_is_not_counted_against_the_server(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from lib.helper_ollama import breaker as module
+
+    busy = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(module, "_executor", busy)
+    busy.submit(time.sleep, 0.3)
+
+    breaker = CircuitBreaker("h", "m", failure_threshold=1, max_timeout=0.05)
+    released = []
+    with pytest.raises(TimeoutError, match="No worker"):
+        breaker.call(lambda: "never sent", release=lambda: released.append(1))
+    assert released == [1]
+    assert breaker.snapshot()["state"] == "closed"
+    busy.shutdown(wait=True)
+
+
+def test_timeout_starts_when_the_call_is_dispatched(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from lib.helper_ollama import breaker as module
+
+    busy = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(module, "_executor", busy)
+    busy.submit(time.sleep, 0.1)
+
+    breaker = CircuitBreaker("h", "m", max_timeout=0.15)
+    # queued for 0.1s, then runs for 0.1s: over the timeout in total, not once dispatched
+    assert breaker.call(lambda: time.sleep(0.1) or "ok") == "ok"
+    busy.shutdown(wait=True)
+
+
+def test_async_call_times_out_and_counts_a_failure():
+    import asyncio
+
+    breaker = CircuitBreaker("h", "m", failure_threshold=1, max_timeout=0.05)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(breaker.acall(lambda: asyncio.sleep(1)))
+    assert breaker.snapshot()["state"] == "open"
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(breaker.acall(lambda: asyncio.sleep(0)))
+
+
+def test_probe_reserved_for_a_call_never_made_is_given_back():
+    breaker = CircuitBreaker("h", "m", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    breaker.before()  # probe reserved, then queueing for a slot fails
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "second probe")
+    breaker.cancel_probe()
+    assert breaker.call(lambda: "probe") == "probe"
@@ -0,0 +1,55 @@
+import pytest
+
+from lib.helper_chat.conversation import Conversation
+
+pytestmark = pytest.mark.parametrize("fake_ollama", [{"num_predict": 20}], indirect=True)
+
+
+def _chat(conversation, history, content, model="phi", system="Be brief.", stream=False):
+    response = conversation.reply(model, history, content, system_prompt=system, stream=stream)
+    answer = "".join(c["response"] for c in response) if stream else response["response"]
+    history += [{"role": "user", "content": content}, {"role": "assistant", "content": answer}]
+
+
+def test_prompt_eval_stays_flat_across_turns(fake_ollama):
+    conversation, history = Conversation(), []
+    for _ in range(4):
+        _chat(conversation, history, "tell me more about that", stream=True)
+
+    first, *rest = conversation.prompt_eval_counts
+    assert rest == [rest[0]] * 3
+    assert rest[0] < first  # later turns skip the system prompt too
+    assert conversation.resends == 0
+    assert len(conversation.context) > 4 * 20
+
+
+def test_model_or_history_change_resends_once(fake_ollama):
+    conversation, history = Conversation(), []
+    _chat(conversation, history, "hello")
+    _chat(conversation, history, "hello again")
+    _chat(conversation, history, "and now?", model="mistral")
+    _chat(conversation, history, "ok", model="mistral")
+
+    counts = conversation.prompt_eval_counts
+    assert conversation.resends == 1
+    assert counts[2] > counts[1]          # the switch replays the transcript
+    assert counts[3] <= counts[1]          # then incremental again
+
+    history.clear()
+    conversation.reply("mistral", history, "fresh start", system_prompt="Be brief.")
+    assert conversation.resends == 1       # a cleared chat has nothing to replay
+
+
+def test_deterministic_turns_are_cached_and_continue_from_the_cache(fake_ollama):
+    first, second = Conversation(), Conversation()
+    streamed = "".join(c["response"] for c in first.reply("phi", [], "Name three colors.", temperature=0, stream=True))
+    calls = fake_ollama.request_count
+
+    replay = list(second.reply("phi", [], "Name three colors.", temperature=0, stream=True))
+    assert [c["response"] for c in replay] == [streamed] and replay[0]["done"]
+    assert fake_ollama.request_count == calls
+    assert second.context == first.context and second.prompt_eval_counts == [0]
+
+    history = [{"role": "user", "content": "Name three colors."}, {"role": "assistant", "content": streamed}]
+    second.reply("phi", history, "And three more?", temperature=0)
+    assert second.resends == 0  # the cached turn's context is reused
@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+import pytest
+
+from lib.helper_cache.embeddings import EmbeddingCache, embed_cached
+
+
+def test_round_trip_and_normalized_keys(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many("m", ["hello  world", "bye"], np.eye(2, 3, dtype=np.float32))
+
+    found = cache.get_many("m", ["hello world", "missing", "bye"])
+    assert np.array_equal(found[0], [1, 0, 0])
+    assert found[1] is None
+    assert np.array_equal(found[2], [0, 1, 0])
+    assert cache.get_many("other-model", ["bye"]) == [None]
+
+
+def test_persists_and_is_shared_between_instances(tmp_path):
+    writer = EmbeddingCache(str(tmp_path))
+    reader = EmbeddingCache(str(tmp_path))
+    writer.put_many("m", ["a"], [[1.0, 2.0]])
+    assert reader.get_many("m", ["a"])[0].tolist() == [1.0, 2.0]
+
+    writer.put_many("m", ["b", "a"], [[3.0, 4.0], [9.0, 9.0]])  # "a" is already cached
+    assert reader.get_many("m", ["b"])[0].tolist() == [3.0, 4.0]
+    assert os.path.getsize(tmp_path / "m.f32") == 2 * 2 * 4
+
+
+def test_torn_append_is_trimmed_on_open(tmp_path):
+    EmbeddingCache(str(tmp_path)).put_many("m", ["a", "b"], [[1.0, 1.0], [2.0, 2.0]])
+    with open(tmp_path / "m.f32", "ab") as f:
+        f.write(b"\x00" * 12)  # a vector and a half without keys
+
+    cache = EmbeddingCache(str(tmp_path))
+    assert cache.get_many("m", ["b"])[0].tolist() == [2.0, 2.0]
+    cache.put_many("m", ["c"], [[3.0, 3.0]])
+    assert EmbeddingCache(str(tmp_path)).get_many("m", ["c"])[0].tolist() == [3.0, 3.0]
+
+
+def test_dimension_mismatch_is_rejected(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many("m", ["a"], [[1.0, 2.0]])
+    with pytest.raises(ValueError):
+        cache.put_many("m", ["b"], [[1.0, 2.0, 3.0]])
+
+
+@pytest.mark.parametrize("fake_ollama", [{"embedding_dim": 8}], indirect=True)
+def test_embed_cached_only_sends_misses(fake_ollama):
+    first = embed_cached("nomic-embed-text", ["a", "b"])
+    calls = fake_ollama.request_count
+    second = embed_cached("nomic-embed-text", ["b", "a", "c"], batch_size=1)
+
+    assert first.shape == (2, 8)
+    assert np.array_equal(second[:2], first[::-1])
+    assert fake_ollama.request_count == calls + 1
@@ -0,0 +1,74 @@
+import time
+
+import ollama
+import pytest
+
+from lib.helper_ollama import client
+from lib.helper_text import analyzer
+
+
+@pytest.mark.parametrize("fake_ollama", [{"num_predict": 8}], indirect=True)
+def test_generate_is_deterministic(fake_ollama):
+    first = client.generate(model="phi4-mini", prompt="Why is the sky blue?")
+    second = client.generate(model="phi4-mini", prompt="Why is the sky blue?")
+
+    assert first["response"] == second["response"]
+    assert first["eval_count"] == 8
+    assert first["context"]
+
+
+@pytest.mark.parametrize("fake_ollama", [{"num_predict": 8}], indirect=True)
+def test_chat_streams_tokens(fake_ollama):
+    chunks = list(client.chat(
+        model="mistral",
+        messages=[{"role": "user", "content": "Hello"}],
+        stream=True,
+    ))
+
+    assert len(chunks) == 9
+    assert chunks[-1]["done"]
+    assert "".join(c["message"]["content"] for c in chunks).strip()
+
+
+def test_embed_tags_and_ps(fake_ollama):
+    result = client.embed(model="nomic-embed-text", input=["a", "b"])
+    tags = client.list_models()
+    running = client.ps()
+
+    assert len(result["embeddings"]) == 2
+    assert "phi4-mini" in [m["model"] for m in tags["models"]]
+    assert [m["model"] for m in running["models"]] == ["nomic-embed-text"]
+
+
+@pytest.mark.parametrize("fake_ollama", [{"models": ("phi",), "error_rate": 1.0}], indirect=True)
+def test_unknown_model_and_injected_errors(fake_ollama):
+    with pytest.raises(ollama.ResponseError) as missing:
+        client.generate(model="llama2", prompt="hi")
+    with pytest.raises(ollama.ResponseError) as failed:
+        client.generate(model="phi", prompt="hi")
+
+    assert missing.value.status_code == 404
+    assert failed.value.status_code == 500
+
+
+@pytest.mark.parametrize("fake_ollama", [{"ttft": 0.05, "tokens_per_sec": 200, "load_delay": 0.05}], indirect=True)
+def test_timing_profile(fake_ollama):
+    start = time.perf_counter()
+    cold = client.generate(model="phi", prompt="hi")
+    elapsed = time.perf_counter() - start
+    warm = client.generate(model="phi", prompt="hi")
+
+    assert elapsed >= 0.1
+    assert cold["load_duration"] > 0
+    assert warm["load_duration"] == 0
+
+
+def test_text_helpers_end_to_end(fake_ollama):
+    result = analyzer.analyze_text(
+        model="phi4-mini",
+        text=analyzer.get_sample_text("Product Review"),
+        analysis_type="Summarize",
+    )
+
+    assert result["status"] == "success"
+    assert result["stats"]["tokens"] == analyzer.ANALYSIS_MAX_TOKENS
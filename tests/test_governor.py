@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from lib.helper_ollama import client, governor
+from lib.helper_ollama.governor import Governor, parallelism
+from lib.helper_ollama.scheduler import BULK, INTERACTIVE
+
+
+def test_parallelism_from_env(monkeypatch):
+    monkeypatch.delenv("OLLAMA_NUM_PARALLEL", raising=False)
+    monkeypatch.setenv("OLLAMA_GOVERNOR_PARALLEL", "mistral=2")
+    assert parallelism("mistral:latest") == 2
+    assert parallelism("phi") == governor.DEFAULT_PARALLEL
+
+    monkeypatch.setenv("OLLAMA_NUM_PARALLEL", "3")
+    assert parallelism("phi") == 3
+
+
+def test_waiters_granted_by_priority():
+    gate = Governor("h", "m", limit=1)
+    gate.acquire(BULK)
+    order = []
+    threads = [
+        threading.Thread(target=lambda n=name: (gate.acquire(n), order.append(n), gate.release()))
+        for name in (BULK, BULK, INTERACTIVE)
+    ]
+    for t in threads:
+        t.start()
+        time.sleep(0.02)
+    assert gate.snapshot()["queued"] == 3
+
+    gate.release()
+    for t in threads:
+        t.join(2)
+    assert order == [INTERACTIVE, BULK, BULK]
+    assert gate.snapshot()["in_flight"] == 0
+
+
+def test_cancelled_async_waiter_leaves_queue():
+    gate = Governor("h", "m", limit=1)
+
+    async def main():
+        await gate.aacquire()
+        waiter = asyncio.ensure_future(gate.aacquire())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        gate.release()
+
+    asyncio.run(main())
+    assert gate.snapshot()["in_flight"] == 0
+    assert gate.snapshot()["queued"] == 0
+
+
+@pytest.mark.parametrize("fake_ollama", [{"tokens_per_sec": 200, "num_predict": 4}], indirect=True)
+def test_client_never_exceeds_server_parallelism(monkeypatch, fake_ollama):
+    monkeypatch.setenv("OLLAMA_GOVERNOR_PARALLEL", "mistral=2")
+    gate = governor.get_governor(fake_ollama.url, "mistral")
+    peak = []
+    original = gate.acquire
+
+    def acquire(name=None):
+        original(name)
+        peak.append(gate.snapshot()["in_flight"])
+
+    monkeypatch.setattr(gate, "acquire", acquire)
+    threads = [
+        threading.Thread(target=client.generate, kwargs={"model": "mistral", "prompt": f"q{i}"})
+        for i in range(6)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    assert max(peak) == 2
+    assert gate.snapshot()["served"] == 6
@@ -0,0 +1,105 @@
+import threading
+import time
+
+from lib.helper_ollama import breaker, client, governor
+from lib.helper_ollama.fake_server import FakeConfig, FakeOllamaServer
+from lib.helper_ollama.hostpool import HostPool
+
+
+def test_routes_to_resident_host_then_least_outstanding():
+    with FakeOllamaServer() as a, FakeOllamaServer() as b:
+        client.create_client(client.ClientSettings(host=b.url)).generate(model="mistral", prompt="")
+        pool = HostPool([a.url, b.url])
+        pool.check()
+
+        assert pool.route("mistral") == b.url
+        with pool.use(a.url):
+            assert pool.route("phi") == b.url
+        with pool.use(b.url):
+            assert pool.route("phi") == a.url
+
+
+def test_unhealthy_host_is_skipped():
+    with FakeOllamaServer() as a:
+        b = FakeOllamaServer().start()
+        pool = HostPool([b.url, a.url])
+        b.stop()
+        pool.check()
+
+        assert pool.route("phi") == a.url
+        assert [h["healthy"] for h in pool.snapshot()] == [False, True]
+
+
+def _through_breaker(answer):
+    """``fn(host)`` that sends ``answer(host)`` through the host's breaker, like the client."""
+    return lambda host: breaker.get_breaker(host, "phi").call(lambda: answer(host))
+
+
+def test_slow_call_is_hedged_to_second_host():
+    pool = HostPool(["a", "b"], min_samples=3)
+    for _ in range(3):
+        pool.call("phi", _through_breaker(lambda host: host))
+    slow = threading.Event()
+
+    def answer(host):
+        if host == "a":
+            slow.wait(1)
+        return host
+
+    start = time.monotonic()
+    assert pool.call("phi", _through_breaker(answer)) == "b"
+    assert time.monotonic() - start < 0.5
+    assert (pool.hedges, pool.hedge_wins) == (1, 1)
+    slow.set()
+
+
+def test_hedges_are_rationed():
+    pool = HostPool(["a2", "b2"], hedge_budget=0.0, hedge_burst=1.0)
+    pool.hedge_delay = lambda model: 0.01
+    for _ in range(3):
+        pool.call("phi", _through_breaker(lambda host: time.sleep(0.05) or host))
+    assert (pool.hedges, pool.hedges_skipped) == (1, 2)
+
+
+def test_no_hedge_to_a_host_without_a_free_slot():
+    pool = HostPool(["a3", "b3"], min_samples=3)
+    for _ in range(3):
+        pool.call("phi", _through_breaker(lambda host: host))
+    busy = governor.get_governor("b3", "phi")
+    for _ in range(busy.limit):
+        busy.acquire()
+    try:
+        assert pool.call("phi", _through_breaker(lambda host: time.sleep(0.05) or host)) == "a3"
+        assert (pool.hedges, pool.hedges_skipped) == (0, 1)
+    finally:
+        for _ in range(busy.limit):
+            busy.release()
+
+
+def test_time_queued_before_sending_does_not_trigger_a_hedge():
+    pool = HostPool(["a4", "b4"], min_samples=3)
+    for _ in range(3):
+        pool.call("phi", _through_breaker(lambda host: host))
+
+    def queued_then_fast(host):
+        time.sleep(0.1)  # e.g. waiting for a governor slot
+        return breaker.get_breaker(host, "phi").call(lambda: host)
+
+    assert pool.call("phi", queued_then_fast) == "a4"
+    assert pool.hedges == 0
+
+
+def test_client_spreads_calls_over_pool(monkeypatch):
+    config = FakeConfig(tokens_per_sec=100, num_predict=5)
+    with FakeOllamaServer(config) as a, FakeOllamaServer(config) as b:
+        monkeypatch.setenv("OLLAMA_HOSTS", f"{a.url},{b.url}")
+        threads = [
+            threading.Thread(target=client.generate, kwargs={"model": "phi", "prompt": f"q{i}"})
+            for i in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+
+        assert a.request_count > 0 and b.request_count > 0
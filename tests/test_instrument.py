@@ -0,0 +1,91 @@
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from lib.helper_cache import instrument
+
+
+def test_counts_hits_bytes_and_time_saved():
+    @instrument.cache_data
+    def load(n, _label=None):
+        time.sleep(0.02)
+        return np.zeros(n)
+
+    load(10)
+    load(10)
+    load(10, _label="ignored like in Streamlit")
+    load(20)
+
+    stats = load.stats.snapshot()
+    assert (stats["calls"], stats["hits"], stats["entries"]) == (4, 2, 2)
+    assert stats["bytes"] == 30 * 8
+    assert stats["saved_seconds"] >= 0.04
+
+
+def test_recompute_after_clear_is_not_an_eviction_but_ttl_expiry_is():
+    @instrument.cache_data(ttl=0.05)
+    def now(key):
+        return time.monotonic()
+
+    now("a")
+    time.sleep(0.1)
+    now("a")
+    assert now.stats.snapshot()["evictions"] == 1
+
+    now.clear()
+    now("a")
+    stats = now.stats.snapshot()
+    assert (stats["evictions"], stats["clears"], stats["entries"]) == (1, 1, 1)
+
+
+def test_report_is_json_with_functions_and_stores():
+    @instrument.cache_resource
+    def connection():
+        return {"status": "connected"}
+
+    connection()
+    connection()
+
+    report = json.loads(instrument.export_json())
+    entry = next(f for f in report["functions"] if f["name"].endswith(":test_report_is_json_with_functions_and_stores.<locals>.connection"))
+    assert (entry["kind"], entry["hits"]) == ("resource", 1)
+    assert set(report["stores"]) == {"responses", "embeddings", "semantic", "vision"}
+
+
+def test_large_frames_are_keyed_by_content():
+    @instrument.cache_data
+    def total(frame):
+        return frame["x"].sum()
+
+    frame = pd.DataFrame({"x": range(10_000)})
+    edited = frame.copy()
+    edited.loc[5_000, "x"] = -1  # same repr: pandas elides the middle rows
+
+    assert repr(frame) == repr(edited)
+    assert total(frame) != total(edited)
+    total(frame.copy())
+
+    stats = total.stats.snapshot()
+    assert (stats["entries"], stats["hits"]) == (2, 1)
+
+
+def test_caching_page_functions_are_measured():
+    from streamlit.testing.v1 import AppTest
+
+    def counters(name):
+        return next((f for f in instrument.snapshot() if f["name"] == f"216_Caching_Data.py:{name}"), {"calls": 0, "hits": 0})
+
+    before = {name: counters(name) for name in ("load_data", "generate_random_data")}
+    page = Path(__file__).parents[1] / "views" / "200_📊_Streamlit" / "216_Caching_Data.py"
+    app = AppTest.from_file(str(page), default_timeout=30).run()
+    for _ in range(2):
+        for label in ("Load Data", "Generate"):
+            next(b for b in app.button if b.label == label).click().run()
+
+    for name, counted in before.items():
+        after = counters(name)
+        assert after["calls"] == counted["calls"] + 2
+        assert after["hits"] == counted["hits"] + 1
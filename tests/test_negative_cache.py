@@ -0,0 +1,64 @@
+import time
+
+import ollama
+import pytest
+
+from lib.helper_ollama import client, negative
+
+
+FEW_MODELS = pytest.mark.parametrize(
+    "fake_ollama", [{"models": ("phi4-mini", "llama3.2:latest"), "num_predict": 4}], indirect=True
+)
+
+
+@FEW_MODELS
+def test_missing_model_fails_fast_with_a_suggestion(fake_ollama):
+    with pytest.raises(negative.ModelNotFoundError):
+        client.generate(model="llama2", prompt="hi")
+    requests = fake_ollama.request_count
+
+    start = time.perf_counter()
+    with pytest.raises(negative.ModelNotFoundError) as error:
+        client.generate(model="llama2", prompt="hi")
+    assert time.perf_counter() - start < 0.05
+    assert fake_ollama.request_count == requests
+
+    assert error.value.status_code == 404
+    assert error.value.suggestion == "llama3.2:latest"
+    assert "not found" in str(error.value)
+
+
+@FEW_MODELS
+def test_model_list_change_clears_the_entry(fake_ollama):
+    with pytest.raises(ollama.ResponseError):
+        client.generate(model="llama2", prompt="hi")
+
+    client.list_models()  # unchanged list: entry stays
+    with pytest.raises(negative.ModelNotFoundError):
+        client.generate(model="llama2", prompt="hi")
+
+    fake_ollama.config.models += ("llama2",)  # as after `ollama pull llama2`
+    client.list_models()
+    assert client.generate(model="llama2", prompt="hi")["done"]
+
+
+def test_connection_failures_are_cached_per_host():
+    cache = negative.NegativeCache(ttl=30, connect_ttl=0.05)
+    cache.record("http://down:11434", "phi", ConnectionError("refused"))
+
+    with pytest.raises(negative.HostUnavailableError):
+        cache.check("http://down:11434", "mistral")
+    cache.check("http://up:11434", "phi")
+    time.sleep(0.06)
+    cache.check("http://down:11434", "phi")
+
+
+def test_other_errors_and_disabled_cache_are_not_recorded():
+    cache = negative.NegativeCache()
+    cache.record("h", "phi", ollama.ResponseError("bad request", 400))
+    cache.record("h", "phi", TimeoutError())
+    assert cache.snapshot() == []
+
+    disabled = negative.NegativeCache(ttl=0)
+    disabled.record("h", "phi", ollama.ResponseError("model 'phi' not found", 404))
+    disabled.check("h", "phi")
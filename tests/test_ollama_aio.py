@@ -0,0 +1,72 @@
+import asyncio
+import concurrent.futures
+import time
+
+import pytest
+
+from lib.helper_ollama import aio
+
+
+def test_agather_many_bounds_concurrency_and_keeps_order():
+    in_flight = 0
+    peak = 0
+
+    async def work(i):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001 * (i % 3))
+        in_flight -= 1
+        return i
+
+    results = asyncio.run(aio.agather_many((work(i) for i in range(50)), limit=4))
+
+    assert results == list(range(50))
+    assert peak == 4
+
+
+def test_agather_many_cancels_remaining_on_error():
+    finished = []
+
+    async def work(i):
+        if i == 0:
+            raise ValueError("boom")
+        await asyncio.sleep(0.05)
+        finished.append(i)
+
+    with pytest.raises(ValueError):
+        asyncio.run(aio.agather_many((work(i) for i in range(5)), limit=5))
+
+    assert finished == []
+
+
+def test_background_loop_submit_and_cancel():
+    loop = aio.BackgroundLoop(name="test-aio")
+    try:
+        async def double(x):
+            return x * 2
+
+        assert loop.submit(double(21)).result(timeout=1) == 42
+
+        future = loop.submit(asyncio.sleep(10))
+        time.sleep(0.05)
+        future.cancel()
+        with pytest.raises(concurrent.futures.CancelledError):
+            future.result(timeout=1)
+    finally:
+        loop.close()
+
+
+@pytest.mark.parametrize("fake_ollama", [{"num_predict": 3, "models": ("aio-model",)}], indirect=True)
+def test_calls_go_through_the_breaker_and_residency(monkeypatch, fake_ollama):
+    from lib.helper_ollama import breaker, residency
+
+    used = []
+    monkeypatch.setattr(residency, "record_use", used.append)
+    response = asyncio.run(aio.agenerate(model="aio-model", prompt="hi"))
+
+    assert response["done"]
+    assert used == ["aio-model"]
+    assert breaker.get_breaker(fake_ollama.url, "aio-model").snapshot()["samples"] == 1
+    with pytest.raises(ValueError, match="stream"):
+        asyncio.run(aio.agenerate(model="aio-model", prompt="hi", stream=True))
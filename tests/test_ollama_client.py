@@ -0,0 +1,57 @@
+from lib.helper_ollama import client
+
+
+def test_settings_from_env(monkeypatch):
+    monkeypatch.setenv("OLLAMA_HOST", "http://ollama.internal:11434")
+    monkeypatch.setenv("OLLAMA_CLIENT_TIMEOUT", "30")
+    monkeypatch.setenv("OLLAMA_CLIENT_POOL_SIZE", "4")
+
+    settings = client.ClientSettings.from_env()
+
+    assert settings.host == "http://ollama.internal:11434"
+    assert settings.timeout == 30.0
+    assert settings.pool_size == 4
+    assert settings.connect_timeout == client.ClientSettings.connect_timeout
+
+
+def test_get_client_is_shared_per_settings():
+    settings = client.ClientSettings(host="http://127.0.0.1:1", pool_size=2)
+
+    first = client.get_client(settings)
+    second = client.get_client(settings)
+    other = client.get_client(client.ClientSettings(host="http://127.0.0.1:2"))
+
+    assert first is second
+    assert first is not other
+
+
+def test_open_breaker_fails_fast_while_its_slots_are_held(monkeypatch):
+    import asyncio
+    import time
+
+    import pytest
+
+    from lib.helper_ollama import aio, breaker, governor
+    from lib.helper_ollama.breaker import CircuitOpenError
+
+    host = "http://127.0.0.1:9"
+    monkeypatch.setenv("OLLAMA_HOST", host)
+    gate = governor.get_governor(host, "held")
+    guard = breaker.get_breaker(host, "held")
+    for _ in range(gate.limit):
+        gate.acquire()  # abandoned calls still running on the server
+    for _ in range(guard.failure_threshold):
+        guard.record_failure()
+    try:
+        start = time.monotonic()
+        with pytest.raises(CircuitOpenError):
+            client.generate(model="held", prompt="hi")
+        with pytest.raises(CircuitOpenError):
+            list(client.generate(model="held", prompt="hi", stream=True))
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(aio.agenerate(model="held", prompt="hi"))
+        assert time.monotonic() - start < 1
+    finally:
+        for _ in range(gate.limit):
+            gate.release()
+        guard.record_success(0.0)
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from lib.helper_text import analyzer, prompts, warmup
+
+
+def test_canonicalize_normalizes_whitespace():
+    text = "First line.  \r\n    Indented.\t\n\n\n\n    Last.\n"
+    assert prompts.canonicalize(text) == "First line.\nIndented.\n\nLast."
+
+
+def test_assemble_puts_variable_parts_last():
+    prompt = prompts.assemble("Summarize the text below.", {"Text": "Some text."}, task=["Be brief.", "", "Use bullets."])
+    assert prompt == "Summarize the text below.\n\nText:\nSome text.\n\nBe brief.\nUse bullets."
+
+
+def test_assemble_only_canonicalizes_the_preamble():
+    code = "def f():\n    return 1  \n\n\n\nf()"
+    prompt = prompts.assemble("""
+        Review the code below.
+        Be specific.  """, {"Code": code}, task="  Keep the indentation.")
+    assert prompt == f"Review the code below.\nBe specific.\n\nCode:\n{code}\n\n  Keep the indentation."
+
+
+def test_changing_options_keeps_the_text_prefix():
+    text = analyzer.get_sample_text("Climate Report")
+    brief = prompts.assemble("Summarize the text below.", {"Text": text}, task="Write it in one sentence.")
+    detailed = prompts.assemble("Summarize the text below.", {"Text": text}, task="Write it in a detailed paragraph.")
+
+    assert len(os.path.commonprefix([brief, detailed])) > len(text)
+
+
+def test_analysis_types_share_everything_before_the_task():
+    text = analyzer.get_sample_text("Product Review")
+    built = [analyzer.build_prompt(text, kind) for kind in analyzer.ANALYSIS_PROMPTS]
+
+    shared = os.path.commonprefix(built)
+    assert shared.startswith(analyzer.ANALYSIS_PREAMBLE)
+    assert shared.endswith(text + "\n\nTask: ")
+
+
+def test_tracker_reports_shared_prefix_per_model():
+    tracker = prompts.PrefixTracker()
+    assert tracker.observe("phi", "static part, then A") == 0
+    assert tracker.observe("phi", "static part, then B") == len("static part, then ")
+    assert tracker.observe("mistral", "static part, then B") == 0
+
+
+def test_describe_reuse_includes_prompt_eval_count():
+    caption = prompts.describe_reuse(10, "x" * 40, {"prompt_eval_count": 7})
+    assert caption == "Shared prompt prefix: 10/40 chars · prompt tokens evaluated: 7"
+
+
+@pytest.mark.parametrize("fake_ollama", [{"num_predict": 3}], indirect=True)
+def test_only_prompts_sent_to_the_server_are_tracked(monkeypatch, fake_ollama):
+    tracker = prompts.PrefixTracker()
+    monkeypatch.setattr(prompts, "_tracker", tracker)
+    text = analyzer.get_sample_text("Product Review")
+    warmup.run(warmup.WarmupConfig(enabled=True, models=("phi",), samples=("Product Review",), analysis_types=("Summarize",)))
+    assert tracker.observe("phi", "") == 0  # the warm-up sent its prompt untracked
+
+    cached = analyzer.analyze_text("phi", text, "Summarize")
+    assert cached["stats"]["source"] == "cache" and "shared_prefix" not in cached["stats"]
+    assert tracker.observe("phi", "") == 0
+
+    sent = analyzer.analyze_text("phi", text, "Grammar Check")
+    assert sent["stats"]["shared_prefix"] == f"0/{len(analyzer.build_prompt(text, 'Grammar Check'))} chars"
@@ -0,0 +1,68 @@
+import pytest
+
+from lib.helper_ollama import client
+from lib.helper_ollama.fake_server import FakeConfig, FakeOllamaServer
+from lib.helper_ollama.residency import ResidencyManager
+
+
+def _manager(server, budget_models):
+    settings = client.ClientSettings(host=server.url)
+    return ResidencyManager(
+        budget_bytes=budget_models * server.config.model_size,
+        client_factory=lambda: client.create_client(settings),
+    )
+
+
+def _resident(server):
+    return sorted(m["model"] for m in client.create_client(client.ClientSettings(host=server.url)).ps()["models"])
+
+
+def test_prewarm_loads_and_reports_saved_load_duration():
+    with FakeOllamaServer(FakeConfig(load_delay=0.05)) as server:
+        manager = _manager(server, budget_models=2)
+
+        assert manager.prewarm("phi").result(5) == 50_000_000
+        assert _resident(server) == ["phi"]
+        assert manager.stats()["saved_load_seconds"] == 0
+
+        manager.record_use("phi")
+        assert manager.stats()["saved_load_seconds"] == 0  # not before the request succeeds
+        manager.record_success("phi", {"load_duration": 0})
+        assert manager.stats()["saved_load_seconds"] == 0.05
+
+        # Already resident: nothing to load.
+        assert manager.prewarm("phi").result(5) == 0
+
+
+def test_prewarm_unloads_least_recently_used_within_budget():
+    with FakeOllamaServer(FakeConfig()) as server:
+        manager = _manager(server, budget_models=2)
+        manager.prewarm("phi").result(5)
+        manager.prewarm("mistral").result(5)
+        manager.record_use("phi")
+
+        manager.prewarm("codellama").result(5)
+
+        assert _resident(server) == ["codellama", "phi"]
+
+
+def test_no_saving_when_the_model_was_loaded_again():
+    with FakeOllamaServer(FakeConfig(load_delay=0.05)) as server:
+        manager = _manager(server, budget_models=2)
+        manager.prewarm("phi").result(5)
+
+        manager.record_use("phi")
+        manager.record_success("phi", {"load_duration": 50_000_000})  # evicted in between
+        assert manager.stats()["saved_load_seconds"] == 0
+
+
+@pytest.mark.parametrize("fake_ollama", [{"load_delay": 0.05}], indirect=True)
+def test_prewarm_goes_through_the_shared_client(monkeypatch, fake_ollama):
+    manager = ResidencyManager(budget_bytes=2 * fake_ollama.config.model_size)
+    calls = []
+    real = client.generate
+    monkeypatch.setattr(client, "generate", lambda **kwargs: calls.append(kwargs) or real(**kwargs))
+
+    assert manager.prewarm("phi").result(5) == 50_000_000
+    assert calls[0]["priority"] == "bulk"
+    assert manager.stats()["models"][0]["uses"] == 0  # the pre-warm is not a use
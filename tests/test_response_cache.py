@@ -0,0 +1,109 @@
+import time
+
+from lib.helper_cache import responses, tiered
+from lib.helper_cache.responses import ResponseCache, make_key
+from lib.helper_text import analyzer, generator
+
+
+def test_make_key_is_canonical():
+    a = make_key("phi", "sha256:1", "hi", {"seed": 1, "temperature": 0.3})
+    b = make_key("phi", "sha256:1", "hi", {"temperature": 0.3, "seed": 1})
+
+    assert a == b
+    assert a != make_key("phi", "sha256:2", "hi", {"seed": 1, "temperature": 0.3})
+    assert a != make_key("phi:13b", "sha256:1", "hi", {"seed": 1, "temperature": 0.3})
+
+
+def test_bare_model_name_means_latest(monkeypatch):
+    from lib.helper_ollama import client
+
+    tags = [{"model": "llama2:13b", "digest": "sha256:13b"}, {"model": "llama2:latest", "digest": "sha256:7b"}]
+    monkeypatch.setattr(client, "list_models", lambda: {"models": tags})
+    monkeypatch.setattr(responses, "_digests_checked", float("-inf"))
+
+    assert responses.model_digest("llama2") == "sha256:7b"
+    assert responses.model_digest("llama2:13b") == "sha256:13b"
+
+    tags.pop()  # only a 13b tag installed: "llama2" is not it
+    monkeypatch.setattr(responses, "_digests_checked", float("-inf"))
+    assert responses.model_digest("llama2") is None
+
+
+def test_lru_eviction_by_size(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"), max_bytes=250)
+    for key in ("a", "b", "c"):
+        cache.put(key, "x" * 100)
+        time.sleep(0.01)
+        cache.get("a")  # keep "a" recently used
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expires_entries(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"), ttl=0.01)
+    cache.put("k", {"response": "old"})
+    time.sleep(0.02)
+
+    assert cache.get("k") is None
+
+
+def test_counters_are_shared_across_instances(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    writer, reader = ResponseCache(path), ResponseCache(path)
+    writer.put("k", 1)
+    reader.get("k")
+    reader.get("missing")
+    reader.flush()
+
+    stats = writer.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_hits_are_written_in_batches(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    cache, other = ResponseCache(path, flush_every=3, flush_interval=60), ResponseCache(path)
+    cache.put("k", 1)
+    cache.get("k")
+    cache.get("k")
+    assert other.stats()["hits"] == 0
+
+    cache.get("k")
+    assert other.stats()["hits"] == 3
+
+
+def test_stored_bytes_are_a_running_total(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    cache = ResponseCache(path, max_bytes=250, ttl=0.05)
+    cache.put("a", "x" * 100)
+    cache.put("a", "x" * 50)
+    cache.put("b", "x" * 100)
+    cache.put("c", "x" * 100)  # evicts "a"
+    time.sleep(0.06)
+    cache.get("b")  # expired
+
+    actual = cache._db().execute("SELECT SUM(size) FROM responses").fetchone()[0]
+    assert cache.stats()["bytes"] == actual == 102
+    assert ResponseCache(path).stats()["bytes"] == 102
+
+
+def test_deterministic_analysis_is_served_from_cache(fake_ollama):
+    text = analyzer.get_sample_text("Product Review")
+    first = analyzer.analyze_text("phi", text, "Summarize")
+    calls = fake_ollama.request_count
+    second = analyzer.analyze_text("phi", text, "Summarize")
+
+    assert second["response"] == first["response"]
+    assert second["stats"]["source"] == "cache"
+    assert fake_ollama.request_count == calls
+    stats = tiered.get_cache().stats()
+    assert stats["hits"] + stats["memory_hits"] == 1
+
+
+def test_sampled_generation_is_not_cached(fake_ollama):
+    generator.generate_text("phi", "Tell me a story", temperature=0.8)
+    generator.generate_text("phi", "Tell me a story", temperature=0.8)
+
+    assert responses.get_cache().stats()["entries"] == 0
+    assert fake_ollama.request_count == 2
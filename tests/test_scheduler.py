@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from lib.helper_ollama.scheduler import BULK, INTERACTIVE, STANDARD, Scheduler, current_priority, priority
+
+
+def _record_order(sched, requests):
+    """Queue ``requests`` behind one busy slot; return the order they are granted."""
+    sched.acquire(STANDARD)
+    order = []
+    lock = threading.Lock()
+
+    def worker(name, label):
+        with sched.slot(name):
+            with lock:
+                order.append(label)
+
+    threads = []
+    for name, label in requests:
+        t = threading.Thread(target=worker, args=(name, label))
+        t.start()
+        threads.append(t)
+        time.sleep(0.01)
+    sched.release(STANDARD)
+    for t in threads:
+        t.join(2)
+    return order
+
+
+def test_interactive_jumps_queued_bulk_work():
+    sched = Scheduler(slots=1)
+    order = _record_order(sched, [(BULK, f"b{i}") for i in range(4)] + [(INTERACTIVE, "chat")])
+
+    assert order.index("chat") <= 1
+    assert sorted(order) == ["b0", "b1", "b2", "b3", "chat"]
+
+
+def test_bulk_is_served_by_weight_not_starved():
+    sched = Scheduler(slots=1, weights={STANDARD: 2, BULK: 1})
+    requests = [(STANDARD, f"s{i}") for i in range(6)] + [(BULK, f"b{i}") for i in range(3)]
+    order = _record_order(sched, requests)
+
+    assert order.index("b0") < order.index("s5")
+
+
+def test_bulk_cap_keeps_a_slot_free():
+    sched = Scheduler(slots=2)
+    sched.acquire(BULK)
+    granted = threading.Event()
+    threading.Thread(target=lambda: (sched.acquire(BULK), granted.set()), daemon=True).start()
+
+    assert not granted.wait(0.1)
+    sched.acquire(INTERACTIVE)  # would block forever if bulk held both slots
+    assert {s["priority"]: s["queued"] for s in sched.stats()}[BULK] == 1
+
+
+def test_cancelled_async_waiter_leaves_queue():
+    sched = Scheduler(slots=1)
+
+    async def main():
+        await sched.aacquire(STANDARD)
+        waiter = asyncio.ensure_future(sched.aacquire(BULK))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        sched.release(STANDARD)
+
+    asyncio.run(main())
+    assert all(s["running"] == 0 and s["queued"] == 0 for s in sched.stats())
+
+
+def test_priority_context():
+    assert current_priority() == STANDARD
+    with priority(BULK):
+        assert current_priority() == BULK
+    with pytest.raises(ValueError):
+        with priority("urgent"):
+            pass
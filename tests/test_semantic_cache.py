@@ -0,0 +1,58 @@
+import numpy as np
+
+from lib.helper_cache.semantic import SemanticCache, scope
+
+VECTORS = {
+    "What's in the Pro plan?": [1.0, 0.0, 0.0],
+    "What does the Pro plan include?": [0.98, 0.2, 0.0],
+    "How much is Basic?": [0.0, 1.0, 0.0],
+}
+
+
+def _cache(**kwargs):
+    return SemanticCache(embed=lambda text: VECTORS[text], **kwargs)
+
+
+def test_paraphrase_reuses_answer_within_scope():
+    cache = _cache(threshold=0.9)
+    kb = scope("Pro: 25 users", "Concise", "llama2")
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return f"answer {len(calls)}"
+
+    first = cache.get_or_generate(kb, "What's in the Pro plan?", generate)
+    second = cache.get_or_generate(kb, "What does the Pro plan include?", generate)
+    other = cache.get_or_generate(kb, "How much is Basic?", generate)
+
+    assert first["answer"] == second["answer"] == "answer 1"
+    assert second["cached"] and second["similarity"] > 0.9
+    assert other == {"answer": "answer 2", "cached": False, "similarity": None, "matched_question": None}
+    assert cache.stats()["hits"] == 1
+
+
+def test_changed_context_does_not_match():
+    cache = _cache()
+    cache.get_or_generate(scope("v1"), "What's in the Pro plan?", lambda: "old")
+
+    result = cache.get_or_generate(scope("v2"), "What's in the Pro plan?", lambda: "new")
+    assert result["answer"] == "new"
+
+
+def test_old_scopes_are_dropped():
+    cache = _cache(max_scopes=2)
+    for version in ("v1", "v2", "v3"):
+        cache.get_or_generate(scope(version), "How much is Basic?", lambda: version)
+
+    assert cache.stats()["scopes"] == 2
+    assert cache.lookup(scope("v1"), np.array([0.0, 1.0, 0.0], dtype=np.float32)) is None
+
+
+def test_embedding_failure_still_answers():
+    def broken(text):
+        raise ConnectionError("no embedding model")
+
+    cache = SemanticCache(embed=broken)
+    assert cache.get_or_generate(scope("kb"), "q", lambda: "a")["answer"] == "a"
+    assert cache.stats()["entries"] == 0
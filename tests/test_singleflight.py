@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from lib.helper_ollama.singleflight import SingleFlight, is_deterministic, request_key
+
+
+def test_is_deterministic():
+    assert is_deterministic({"temperature": 0})
+    assert is_deterministic({"temperature": 0.7, "seed": 1})
+    assert not is_deterministic({"temperature": 0.7})
+    assert not is_deterministic(None)
+
+
+def test_request_key_ignores_stream_and_order():
+    a = request_key("generate", model="phi", prompt="x", options={"seed": 1, "temperature": 0.3})
+    b = request_key("generate", prompt="x", model="phi", options={"temperature": 0.3, "seed": 1}, stream=True)
+    c = request_key("generate", model="phi", prompt="y", options={"seed": 1, "temperature": 0.3})
+
+    assert a == b
+    assert a != c
+
+
+def test_do_shares_one_call():
+    group = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait(1)
+        return "answer"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(group.do("k", slow))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == [1]
+    assert results == ["answer"] * 5
+    assert group.stats() == {"leaders": 1, "joined": 4}
+
+
+def test_do_propagates_errors_and_forgets_key():
+    group = SingleFlight()
+
+    def fail():
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        group.do("k", fail)
+    assert group.do("k", lambda: "ok") == "ok"
+
+
+def test_ado_shares_one_call_and_cancels_it_with_the_last_caller():
+    group = SingleFlight()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def main():
+        results = await asyncio.gather(*(group.ado("k", slow) for _ in range(5)))
+        waiters = [asyncio.ensure_future(group.ado("k", lambda: asyncio.sleep(10))) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        waiters[0].cancel()
+        await asyncio.sleep(0.01)
+        shared = group._tasks[asyncio.get_running_loop()]["k"].task
+        assert not shared.cancelled()  # one caller is still waiting
+        waiters[1].cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+        return results, shared.cancelled()
+
+    results, cancelled = asyncio.run(main())
+    assert calls == [1]
+    assert results == ["answer"] * 5
+    assert cancelled
+
+
+def test_stream_fans_out_to_late_joiners():
+    group = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    upstream_calls = []
+
+    def tokens():
+        upstream_calls.append(1)
+        yield "a"
+        started.set()
+        release.wait(1)
+        yield "b"
+        yield "c"
+
+    first = group.stream("k", tokens)
+    started.wait(1)
+    second = group.stream("k", tokens)
+    release.set()
+
+    assert list(first) == ["a", "b", "c"]
+    assert list(second) == ["a", "b", "c"]
+    assert upstream_calls == [1]
+
+
+def test_do_reraises_base_exceptions_in_followers():
+    group = SingleFlight()
+    release = threading.Event()
+
+    class Stop(BaseException):
+        pass
+
+    def interrupted():
+        release.wait(1)
+        raise Stop()
+
+    errors = []
+
+    def follow():
+        try:
+            group.do("k", interrupted)
+        except Stop as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=follow) for _ in range(3)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(errors) == 3
+
+
+def test_stream_pump_runs_in_the_callers_context():
+    from lib.helper_ollama import scheduler
+
+    group = SingleFlight()
+
+    def tokens():
+        yield scheduler.current_priority()
+
+    with scheduler.priority(scheduler.BULK):
+        stream = group.stream("k", tokens)
+    assert list(stream) == [scheduler.BULK]
@@ -0,0 +1,59 @@
+from lib.helper_ollama.streaming import StreamRenderer, chunk_text, render_stream
+
+
+class Placeholder:
+    def __init__(self):
+        self.frames = []
+
+    def markdown(self, text):
+        self.frames.append(text)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_chunk_text_handles_chat_and_generate():
+    assert chunk_text({"message": {"role": "assistant", "content": "hi"}}) == "hi"
+    assert chunk_text({"response": "yo"}) == "yo"
+    assert chunk_text({"done": True}) == ""
+
+
+def test_renders_at_frame_rate_not_per_token():
+    placeholder, clock = Placeholder(), Clock()
+    renderer = StreamRenderer(placeholder, fps=10, clock=clock)
+    for i in range(100):
+        clock.now = i * 0.01  # 100 tokens/s for one second
+        renderer.write("x")
+
+    assert renderer.close() == "x" * 100
+    assert 9 <= len(placeholder.frames) <= 12
+    assert placeholder.frames[0].endswith("▌")
+    assert placeholder.frames[-1] == "x" * 100
+
+
+def test_byte_threshold_forces_a_flush():
+    placeholder, clock = Placeholder(), Clock()
+    renderer = StreamRenderer(placeholder, fps=1, flush_bytes=10, clock=clock)
+    renderer.write("12345")
+    renderer.write("67890")
+
+    assert placeholder.frames == ["1234567890▌"]
+
+
+def test_render_stream_keeps_partial_text_on_error():
+    placeholder = Placeholder()
+
+    def stream():
+        yield {"response": "partial"}
+        raise ConnectionError("dropped")
+
+    try:
+        render_stream(stream(), placeholder)
+    except ConnectionError:
+        pass
+    assert placeholder.frames[-1] == "partial"
@@ -0,0 +1,49 @@
+import time
+
+from lib.helper_cache.responses import ResponseCache
+from lib.helper_cache.tiered import MemoryTier, TieredCache
+
+
+def test_memory_tier_is_bounded_in_bytes():
+    memory = MemoryTier(max_bytes=25)
+    for key in ("a", "b", "c"):
+        memory.put(key, "x" * 10)
+    memory.get("b", ttl=60)  # keep "b" recently used
+    memory.put("d", "x" * 10)
+
+    assert memory.get("a", ttl=60) is None
+    assert memory.get("c", ttl=60) is None
+    assert memory.get("b", ttl=60) == "x" * 10
+    assert memory.stats()["memory_bytes"] == 20
+
+
+def test_workers_share_the_store_and_keep_their_own_memory(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    worker_a, worker_b = TieredCache(ResponseCache(path)), TieredCache(ResponseCache(path))
+
+    worker_a.put("k", {"response": "hello"})
+    assert worker_b.get("k") == {"response": "hello"}  # from the shared store
+    assert worker_b.get("k") == {"response": "hello"}  # from memory
+
+    stats = worker_b.stats()
+    assert (stats["hits"], stats["memory_hits"], stats["memory_entries"]) == (1, 1, 1)
+
+
+def test_memory_entries_expire_with_the_store_ttl(tmp_path):
+    cache = TieredCache(ResponseCache(str(tmp_path / "c.sqlite3"), ttl=0.01))
+    cache.put("k", 1)
+    time.sleep(0.02)
+
+    assert cache.get("k") is None
+
+
+def test_promoted_entry_expires_at_the_original_deadline(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    writer, reader = TieredCache(ResponseCache(path, ttl=0.2)), TieredCache(ResponseCache(path, ttl=0.2))
+    writer.put("k", 1)
+    time.sleep(0.12)
+
+    assert reader.get("k") == 1  # promoted into memory 0.12s after it was stored
+    time.sleep(0.12)
+    assert reader.memory.get("k", ttl=0.2) is None
+    assert reader.get("k") is None
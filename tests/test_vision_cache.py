@@ -0,0 +1,87 @@
+import io
+
+from PIL import Image, ImageDraw
+
+from lib.helper_cache.vision import VisionCache, perceptual_hash
+
+
+def _image(fmt="PNG", size=(320, 240), quality=95) -> bytes:
+    image = Image.new("RGB", (320, 240), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((40, 40, 160, 200), fill="navy")
+    draw.ellipse((180, 60, 300, 180), fill="orange")
+    image = image.resize(size)
+    out = io.BytesIO()
+    image.save(out, format=fmt, **({"quality": quality} if fmt == "JPEG" else {}))
+    return out.getvalue()
+
+
+class _Model:
+    def __init__(self):
+        self.images = []
+
+    def __call__(self, model, question, image):
+        self.images.append(image)
+        return f"{model} answer {len(self.images)}"
+
+
+def test_same_image_and_question_skip_inference(tmp_path):
+    model = _Model()
+    cache = VisionCache(str(tmp_path), chat=model)
+
+    first = cache.analyze(_image(), "What shapes are there?")
+    second = cache.analyze(_image(), "What  shapes are there? ")
+
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert second["answer"] == first["answer"] and len(model.images) == 1
+    assert Image.open(io.BytesIO(model.images[0])).format == "JPEG"
+
+
+def test_new_question_reuses_the_preprocessed_image(tmp_path):
+    model = _Model()
+    cache = VisionCache(str(tmp_path), chat=model)
+    cache.analyze(_image(), "Describe it.")
+    result = cache.analyze(_image(), "What colors are used?")
+
+    assert not result["cached"] and result["image_reused"]
+    assert model.images[0] == model.images[1]
+
+
+def test_reencoded_duplicate_matches_by_perceptual_hash(tmp_path):
+    model = _Model()
+    cache = VisionCache(str(tmp_path), perceptual=True, chat=model)
+    png, jpeg = _image(), _image("JPEG", size=(640, 480), quality=70)
+    assert png != jpeg
+    assert abs(perceptual_hash(png) ^ perceptual_hash(jpeg)).bit_count() <= 4
+
+    first = cache.analyze(png, "Describe it.")
+    second = cache.analyze(jpeg, "Describe it.")
+    assert second["cached"] and second["image_key"] == first["image_key"]
+    assert second["perceptual_match"] and not first["perceptual_match"]
+
+    exact = VisionCache(str(tmp_path / "exact"), perceptual=False, chat=model)
+    exact.analyze(png, "Describe it.")
+    assert not exact.analyze(jpeg, "Describe it.")["cached"]
+
+
+def test_answers_are_per_model_and_survive_reopening(tmp_path):
+    model = _Model()
+    VisionCache(str(tmp_path), chat=model).analyze(_image(), "Describe it.", model="llava")
+    reopened = VisionCache(str(tmp_path), chat=model)
+
+    assert reopened.analyze(_image(), "Describe it.", model="llava")["cached"]
+    assert not reopened.analyze(_image(), "Describe it.", model="moondream")["cached"]
+    assert reopened.stats()["images"] == 1
+
+
+def test_perceptual_matching_is_off_by_default(tmp_path, monkeypatch):
+    from lib.helper_cache import vision
+
+    model = _Model()
+    cache = VisionCache(str(tmp_path / "default"), chat=model)
+    cache.analyze(_image(), "Describe it.")
+    assert not cache.analyze(_image("JPEG", size=(640, 480), quality=70), "Describe it.")["cached"]
+
+    assert not vision.get_cache().perceptual
+    monkeypatch.setenv("OLLAMA_VISION_PERCEPTUAL", "1")
+    assert vision.get_cache().perceptual
@@ -0,0 +1,68 @@
+from lib.helper_text import warmup
+
+
+def test_config_file_selects_combinations(tmp_path):
+    path = tmp_path / "warmup.toml"
+    path.write_text('models = ["phi", "mistral"]\nsamples = ["Product Review"]\n')
+
+    config = warmup.WarmupConfig.load(str(path))
+    assert config.enabled
+    assert len(config.jobs()) == 2 * 6
+    assert not warmup.WarmupConfig.load(str(tmp_path / "missing.toml")).enabled
+
+
+def test_second_run_is_served_from_the_cache(fake_ollama):
+    config = warmup.WarmupConfig(enabled=True, models=("phi",), analysis_types=("Summarize", "Grammar Check"))
+
+    first = warmup.run(config)
+    assert (first.state, first.total, first.generated, first.failed) == ("done", 6, 6, 0)
+
+    requests = fake_ollama.request_count
+    second = warmup.run(config)
+    assert (second.generated, second.cached) == (0, 6)
+    assert fake_ollama.request_count == requests
+
+
+def test_unknown_names_are_reported():
+    status = warmup.run(warmup.WarmupConfig(enabled=True, samples=("Nope",)))
+    assert status.state == "error"
+    assert "Nope" in status.errors[0]
+
+
+def test_start_runs_once_per_process(fake_ollama, monkeypatch):
+    monkeypatch.setattr(warmup, "_started", None)
+    monkeypatch.setattr(warmup, "_status", warmup.WarmupStatus())
+    config = warmup.WarmupConfig(enabled=True, models=("phi",), samples=("Climate Report",))
+
+    future = warmup.start(config)
+    assert warmup.start(config) is future
+    future.result(timeout=30)
+    assert warmup.status()["generated"] == 6
+
+
+def test_nothing_is_warmed_without_the_response_cache(fake_ollama, monkeypatch):
+    monkeypatch.setenv("OLLAMA_RESPONSE_CACHE", "0")
+    status = warmup.run(warmup.WarmupConfig(enabled=True, models=("phi",)))
+    assert status.state == "disabled"
+    assert fake_ollama.request_count == 0
+
+
+def test_unexpected_errors_end_the_run_in_error(fake_ollama, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("analyzer bug")
+
+    monkeypatch.setattr(warmup.analyzer, "analyze_text", broken)
+    status = warmup.run(warmup.WarmupConfig(enabled=True, models=("phi",)))
+    assert (status.state, status.errors) == ("error", ["analyzer bug"])
+
+
+def test_unreadable_config_is_reported(tmp_path, monkeypatch):
+    monkeypatch.setattr(warmup, "_started", None)
+    monkeypatch.setattr(warmup, "_status", warmup.WarmupStatus())
+    path = tmp_path / "warmup.toml"
+    path.write_text("models = [")
+    monkeypatch.setenv("OLLAMA_WARMUP_CONFIG", str(path))
+
+    assert warmup.start() is None
+    assert warmup.status()["state"] == "error"
+    assert warmup.start() is None and len(warmup.status()["errors"]) == 1
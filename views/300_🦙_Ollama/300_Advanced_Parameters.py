@@ -8,9 +8,9 @@ st.subheader("Customizing Model Behavior")
 
 st.markdown("**Temperature, Top-P, and More:**")
 CODE = """
-import ollama
+from lib.helper_ollama import client
 
-response = ollama.chat(
+response = client.chat(
     model='phi4-mini',
     messages=[
         {
@@ -10,10 +10,10 @@ col1, col2 = st.columns(2)
 with col1:
     st.markdown("**Code:**")
     CODE = """
-import ollama
+from lib.helper_ollama import client
 
 # Simple chat
-response = ollama.chat(
+response = client.chat(
     model='phi4-mini',
     messages=[
         {
@@ -32,7 +32,7 @@ print(response['message']['content'])
 with col2:
     st.markdown("**Explanation:**")
     st.markdown("""
-    - `ollama.chat()` is the main method for chat completions
+    - `ollama.chat()` is the main method for chat completions; `client.chat()` takes the same arguments and runs on the app's shared, pooled client
     - `model` specifies which model to use (e.g., 'phi4-mini', 'mistral')
     - `messages` is a list of message objects
     - Each message has a `role` ('user', 'assistant', or 'system')
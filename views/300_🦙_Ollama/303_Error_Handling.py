@@ -8,9 +8,10 @@ st.subheader("Handling Errors Gracefully")
 
 CODE = """
 import ollama
+from lib.helper_ollama import client
 
 try:
-	response = ollama.chat(
+	response = client.chat(
 		model='phi4-mini',
 		messages=[
 			{
@@ -37,3 +38,10 @@ st.markdown("""
 - Connection error: Ollama service not running
 - Response error: Invalid parameters or model error
 """)
+
+st.info("""
+Through `lib.helper_ollama`, a missing model or an unreachable server is remembered for a few seconds
+(`OLLAMA_NEGATIVE_TTL`): repeated calls fail immediately with the same error instead of another round-trip.
+A missing model raises `ModelNotFoundError` (an `ollama.ResponseError`) whose `suggestion` names the
+closest installed model. The entries are dropped as soon as the model list changes, e.g. after `ollama pull`.
+""")
@@ -11,10 +11,10 @@ col1, col2 = st.columns(2)
 with col1:
     st.markdown("**Code:**")
     CODE = """
-import ollama
+from lib.helper_ollama import client
 
 # Generate text
-response = ollama.generate(
+response = client.generate(
     model='phi4-mini',
     prompt='Write a haiku about coding'
 )
@@ -28,7 +28,7 @@ print(response['response'])
 with col2:
     st.markdown("**Explanation:**")
     st.markdown("""
-    - `ollama.generate()` for simple text generation
+    - `ollama.generate()` for simple text generation (`client.generate()` is the same call on the app's shared client)
     - Simpler than chat for single prompts
     - Good for completions without conversation context
     - Returns the generated text in `response['response']`
@@ -8,13 +8,13 @@ st.subheader("Working with Models")
 
 st.markdown("**List Available Models:**")
 CODE = """
-import ollama
+from lib.helper_ollama import client
 
 # List all models
-models = ollama.list()
+models = client.list_models()
 
 for model in models['models']:
-	print(f"Name: {model['name']}")
+	print(f"Name: {model['model']}")
 	print(f"Size: {model['size']}")
 	print(f"Modified: {model['modified_at']}")
 	print("---")
@@ -25,10 +25,10 @@ helper_streamlit.run_code(CODE)
 
 st.markdown("**Pull a Model:**")
 CODE = """
-import ollama
+from lib.helper_ollama import client
 
 # Pull a specific model
-ollama.pull('mistral')
+client.pull('mistral')
 
 """
 st.code(CODE, language="python")
@@ -36,10 +36,10 @@ helper_streamlit.run_code(CODE)
 
 st.markdown("**Delete a Model:**")
 CODE = """
-import ollama
+from lib.helper_ollama import client
 
 # Delete a model
-ollama.delete('model_name')
+client.delete('model_name')
 
 """
 st.code(CODE, language="python")
@@ -11,10 +11,10 @@ col1, col2 = st.columns(2)
 with col1:
     st.markdown("**Code:**")
     CODE = """
-import ollama
+from lib.helper_ollama import client
 
 # Streaming chat
-stream = ollama.chat(
+stream = client.chat(
     model='phi4-mini',
     messages=[
         {
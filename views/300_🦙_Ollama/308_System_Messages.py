@@ -11,9 +11,9 @@ col1, col2 = st.columns(2)
 with col1:
     st.markdown("**Code:**")
     CODE = """
-import ollama
+from lib.helper_ollama import client
 
-response = ollama.chat(
+response = client.chat(
     model='phi4-mini',
     messages=[
         {
@@ -225,40 +225,19 @@ st.code(vector_db_code, language="python")
 st.subheader("⚡ Caching Embeddings")
 
 caching_code = """
-import pickle
-import os
+from lib.helper_cache.embeddings import embed_cached
 
-def get_embedding_cached(text, cache_file='embeddings.pkl'):
-    '''Get embedding with caching'''
-    
-    # Load cache
-    cache = {}
-    if os.path.exists(cache_file):
-        with open(cache_file, 'rb') as f:
-            cache = pickle.load(f)
-    
-    # Check cache
-    if text in cache:
-        return cache[text]
-    
-    # Generate embedding
-    response = ollama.embeddings(model='phi4-mini', prompt=text)
-    embedding = response['embedding']
-    
-    # Save to cache
-    cache[text] = embedding
-    with open(cache_file, 'wb') as f:
-        pickle.dump(cache, f)
-    
-    return embedding
+documents = ["Python is a programming language", "Streamlit builds web apps", ...]
 
-# Usage
-embedding = get_embedding_cached("My text")
-# First call: generates embedding
-# Second call: instant (from cache)
+# Returns an (n, dim) float32 array; only texts not seen before are sent to Ollama
+vectors = embed_cached(model='nomic-embed-text', texts=documents)
+
+# Re-running after adding a few documents embeds just the new ones
+vectors = embed_cached(model='nomic-embed-text', texts=documents + ["New document"])
 """
 
 st.code(caching_code, language="python")
+st.caption("A pickle-file cache has to load and rewrite the whole file on every lookup or miss, so it gets slower as it grows. `lib.helper_cache.embeddings` only appends float32 rows to a memory-mapped file and keeps a hash index from (model, normalized text) to row, so a lookup costs the same whatever the cache size.")
 
 # Best practices
 st.subheader("💡 Best Practices")
@@ -135,6 +135,7 @@ ollama.generate(
     keep_alive='-1'
 )
 """, language="python")
+st.caption("The MiniApps automate this with `lib.helper_ollama.residency`: a model is loaded in the background when it is picked, and the least recently used models are unloaded to stay within a memory budget.")
 
 # Speed optimization
 st.subheader("⚡ Speed Optimization Techniques")
@@ -239,6 +240,7 @@ with ThreadPoolExecutor(max_workers=3) as executor:
 """
 
 st.code(batch_code, language="python")
+st.caption("For large batches, `lib.helper_ollama.aio.agather_many` runs many requests from one event loop instead of one thread each (see Batch Processing).")
 
 # Caching strategies
 st.subheader("💾 Caching Strategies")
@@ -272,6 +274,7 @@ def cached_generate(prompt):
 """
 
 st.code(caching_code, language="python")
+st.caption("Both caches live in one process, are not bounded by size and are lost on restart. They also return a cached answer for sampled (non-deterministic) prompts. `lib.helper_text.generator.generate_text` instead keeps deterministic answers (temperature 0 or a fixed seed) in a shared SQLite file, keyed by model name and digest, prompt and options, with LRU eviction by size and a TTL.")
 
 # Monitoring performance
 st.subheader("📊 Monitoring Performance")
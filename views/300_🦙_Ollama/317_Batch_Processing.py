@@ -1,5 +1,10 @@
+import random
+import time
+
 import streamlit as st
 
+from lib.helper_batch.processor import BatchProcessor
+
 st.header("📦 Batch Processing — Ollama Basics")
 st.markdown("Efficiently processing multiple requests with Ollama.")
 
@@ -99,6 +104,51 @@ print(f"Average per request: {elapsed/len(prompts):.2f}s")
 
 st.code(parallel_code, language="python")
 
+# Async processing
+st.subheader("🧵 Async Processing (one event loop)")
+
+async_code = """
+import time
+import streamlit as st
+from lib.helper_ollama import aio
+from lib.helper_ollama.scheduler import BULK
+
+prompts = [f"Question {i}" for i in range(1000)]
+
+async def main(progress):
+    async def one(prompt):
+        response = await aio.agenerate(model='phi4-mini', prompt=prompt, priority=BULK)
+        progress['done'] += 1
+        return response
+
+    # One task per prompt, at most 8 requests in flight
+    return await aio.agather_many((one(p) for p in prompts), limit=8)
+
+# Start once per session on the shared background loop; the script never blocks on it
+if 'batch' not in st.session_state:
+    progress = {'done': 0}
+    st.session_state.batch = (aio.submit(main(progress)), progress)
+future, progress = st.session_state.batch
+
+if not future.done() and st.button("Cancel batch"):
+    future.cancel()   # cancels the queued and in-flight requests
+
+if future.cancelled():
+    st.warning(f"Cancelled after {progress['done']}/{len(prompts)} prompts")
+elif future.done():
+    responses = future.result()   # already finished: returns at once
+    st.success(f"{len(responses)} responses")
+else:
+    st.progress(progress['done'] / len(prompts), text=f"{progress['done']}/{len(prompts)} prompts")
+    time.sleep(1)
+    st.rerun()   # poll again on the next run
+"""
+
+st.code(async_code, language="python")
+st.caption("Threads cost one OS thread per in-flight request; async tasks are cheap, so the limit is set by the server, not the client.")
+st.caption("Calling `future.result()` right after `submit` would hold the script until the whole batch is done, with no progress and no way to stop it. Keeping the future in `st.session_state` and rerunning lets the page show progress and cancel at any time.")
+st.caption("`priority=BULK` lets the batch use idle capacity only: chat messages sent meanwhile are scheduled ahead of the queued prompts. Threaded code can wrap its calls in `with scheduler.priority(BULK):` instead.")
+
 # Progress tracking
 st.subheader("📊 Progress Tracking")
 
@@ -250,99 +300,129 @@ st.code(streaming_batch, language="python")
 st.subheader("📄 Processing CSV Data")
 
 csv_processing = """
+from lib.helper_batch.concurrency import AIMDController
+from lib.helper_batch.enrich import enrich_csv
+
+template = '''
+Analyze the sentiment of this review.
+Respond with only: Positive, Negative, or Neutral
+
+Review: {review}
+
+Sentiment:
+'''
+
+stats = enrich_csv(
+    'reviews.csv',
+    'reviews_with_sentiment.csv',        # or a '.parquet' directory of part files
+    template=template,
+    columns={'review': 'review_text'},   # template field -> CSV column
+    output_column='sentiment',
+    model='phi4-mini',
+    options={'num_predict': 10, 'temperature': 0},
+    chunksize=1000,                      # rows read (and written) at a time
+    concurrency=AIMDController(),        # concurrent requests, adapted as it runs
+    on_chunk=lambda chunks, rows: print(f"{rows} rows written"),
+)
+
+print(stats)  # rows, chunks, failed, seconds
+"""
+
+st.code(csv_processing, language="python")
+st.caption(
+    "Loading the whole file and calling the model row by row with `progress_apply` needs the file to fit in memory, "
+    "runs one request at a time and writes nothing until the last row is done. `enrich_csv` reads the file in "
+    "chunks, keeps several requests in flight across chunk boundaries and appends each finished chunk to the "
+    "output, so partial results can be inspected while the job runs. Failed rows keep an empty output and the "
+    "error in `enrich_error`."
+)
+
+st.markdown("**Many short labels per request:**")
+
+packing_example = """
 import pandas as pd
-import ollama
-from tqdm import tqdm
+from lib.helper_batch.packing import PackedClassifier
 
-# Load data
 df = pd.read_csv('reviews.csv')
 
-def analyze_sentiment(text):
-    '''Analyze sentiment of text'''
-    prompt = f'''
-    Analyze the sentiment of this review.
-    Respond with only: Positive, Negative, or Neutral
-    
-    Review: {text}
-    
-    Sentiment:
-    '''
-    
-    response = ollama.generate(
-        model='phi4-mini',
-        prompt=prompt,
-        options={'num_predict': 10}
-    )
-    
-    return response['response'].strip()
-
-# Process all reviews
-tqdm.pandas(desc="Analyzing sentiment")
-df['sentiment'] = df['review_text'].progress_apply(analyze_sentiment)
+classifier = PackedClassifier(
+    labels=['Positive', 'Negative', 'Neutral'],
+    instruction='Analyze the sentiment of each review.',
+    model='phi4-mini',
+    options={'temperature': 0, 'num_ctx': 4096},
+    max_items=20,                        # items per request, at most
+)
 
-# Save results
-df.to_csv('reviews_with_sentiment.csv', index=False)
+labels = {r.id: r.value for r in classifier.run(df['review_text'])}
+df['sentiment'] = df.index.map(labels)
 
-print("\\nSentiment distribution:")
-print(df['sentiment'].value_counts())
+print(classifier.stats())  # requests, labels_per_request, requeued, failed
 """
 
-st.code(csv_processing, language="python")
+st.code(packing_example, language="python")
+st.caption(
+    "With `num_predict: 10`, almost all of each request's time goes to the round-trip and re-reading the "
+    "instructions. `PackedClassifier` sends up to `max_items` numbered reviews per request and asks for a JSON "
+    "array of labels. An array of the wrong length re-queues the whole pack, an entry that is not an allowed "
+    "label re-queues that review, and an item's last attempt goes alone. Packs are sized to fit `num_ctx` and "
+    "shrink after malformed answers."
+)
 
 # Optimization strategies
 st.subheader("🎯 Batch Optimization Strategies")
 
-st.write("**1. Optimal Batch Size**")
+st.write("**1. Adaptive Concurrency**")
 st.code("""
-# Find optimal batch size for your system
-def find_optimal_batch_size(prompts, sizes=[1, 2, 4, 8, 16]):
-    '''Test different batch sizes'''
-    
-    results = {}
-    
-    for size in sizes:
-        start = time.time()
-        
-        with ThreadPoolExecutor(max_workers=size) as executor:
-            futures = [
-                executor.submit(process_single, p) 
-                for p in prompts[:20]  # Test with 20 prompts
-            ]
-            list(as_completed(futures))
-        
-        elapsed = time.time() - start
-        results[size] = elapsed
-        print(f"Batch size {size}: {elapsed:.2f}s")
-    
-    optimal = min(results, key=results.get)
-    print(f"\\nOptimal batch size: {optimal}")
-    return optimal
-""", language="python")
+from lib.helper_batch.concurrency import AIMDController
+from lib.helper_batch.processor import BatchProcessor, prompt_fn
 
-st.write("**2. Chunking Large Batches**")
+# Start low; the limit grows while throughput improves and halves on
+# timeouts, falling throughput or latency above the target
+controller = AIMDController(initial=2, maximum=16, latency_target=30.0)
+processor = BatchProcessor(prompt_fn('phi4-mini'), window=32, concurrency=controller)
+
+for result in processor.run(prompts):
+    ...
+
+print(controller.stats())            # limit, tokens/sec, latency, increases, decreases, timeouts
+for decision in controller.decisions:
+    print(decision['limit'], decision['reason'], decision['tokens_per_second'])
+""", language="python")
+st.caption(
+    "A fixed worker count found by timing a sweep of sizes is only right for the model, prompt lengths and server load "
+    "of that sweep. The controller re-measures tokens/sec and latency every few items: it adds one request while "
+    "throughput keeps up, holds when latency rises without a throughput gain, and halves the limit on a timeout or a "
+    "drop. Past the server's `OLLAMA_NUM_PARALLEL` slots, extra requests only queue (client-side per model, "
+    "through `lib.helper_ollama`), so the limit settles around the point where throughput stops growing. "
+    "Queue depth and wait time are listed on the Admin → Ollama Status page."
+)
+
+st.write("**2. Resumable Large Batches**")
 st.code("""
-def process_in_chunks(prompts, chunk_size=50, model='phi4-mini'):
-    '''Process large batch in chunks'''
+from lib.helper_batch.journal import Journal
+from lib.helper_batch.processor import BatchProcessor, prompt_fn
+
+def process_resumable(prompts, journal_path='batch.jsonl', model='phi4-mini'):
+    '''Process a large batch; rerun after a crash to pick up where it stopped'''
     
-    all_results = []
+    processor = BatchProcessor(prompt_fn(model), window=8)
     
-    for i in range(0, len(prompts), chunk_size):
-        chunk = prompts[i:i + chunk_size]
-        print(f"Processing chunk {i//chunk_size + 1}...")
-        
-        # Process chunk
-        chunk_results = []
-        for prompt in chunk:
-            response = ollama.generate(model=model, prompt=prompt)
-            chunk_results.append(response['response'])
+    # Every finished item is appended to the journal as one JSON line
+    with Journal(journal_path, sync_every=100) as journal:
+        print(f"Resuming: {len(journal.done)} items already done")
         
-        all_results.extend(chunk_results)
+        for result in processor.run(prompts, journal=journal):
+            if not result.ok:
+                print(f"Item {result.id} failed: {result.error}")
         
-        # Optional: Save checkpoint
-        save_checkpoint(all_results, f'checkpoint_{i}.pkl')
-    
-    return all_results
+        return journal.results()  # {item id: {'value': ..., 'error': ...}}
 """, language="python")
+st.caption(
+    "Saving every result so far after each chunk (e.g. pickling a growing list) rewrites more data each time, "
+    "and a crash still means starting over. The journal appends one line per finished item and fsyncs every "
+    "`sync_every` lines, so a crash loses at most that many items; on restart, ids already in the journal are "
+    "skipped. Ids are input positions by default, or `key(item)` when the input order can change."
+)
 
 st.write("**3. Result Caching**")
 st.code("""
@@ -392,15 +472,18 @@ if st.button("Simulate Batch Processing"):
     
     results_container = st.container()
     
-    for i in range(num_items):
-        status.text(f"Processing item {i+1}/{num_items}...")
-        progress_bar.progress((i + 1) / num_items)
-        
-        # Simulate processing
-        time.sleep(0.2)
+    def simulate(item):
+        time.sleep(random.uniform(0.1, 0.4))  # Simulate processing
+        return f"Item {item + 1}: Processed successfully"
+    
+    # Four items in flight at a time; results are shown as they complete
+    processor = BatchProcessor(simulate, window=4, priority=None)
+    for done, result in enumerate(processor.run(range(num_items)), start=1):
+        status.text(f"Processed {done}/{num_items} items...")
+        progress_bar.progress(done / num_items)
         
         with results_container:
-            st.write(f"✅ Item {i+1}: Processed successfully")
+            st.write(f"✅ {result.value}")
     
     status.text("✨ All items processed!")
 
@@ -416,7 +499,7 @@ st.info("""
 
 **Reliability:**
 - Implement retry logic
-- Save checkpoints for long batches
+- Journal results of long batches so they can resume
 - Log failures for debugging
 - Validate results after processing
 
@@ -500,6 +583,32 @@ print(df)
 
 st.code(complete_example, language="python")
 
+st.markdown("**Bounded memory for large inputs:**")
+
+bounded_example = """
+from lib.helper_batch.processor import BatchProcessor, prompt_fn
+
+def read_prompts(path):
+    with open(path) as f:
+        for line in f:           # read lazily, one line at a time
+            yield line.strip()
+
+processor = BatchProcessor(prompt_fn('phi4-mini', {'num_predict': 200}), window=8)
+
+for result in processor.run(read_prompts('prompts.txt')):
+    if result.ok:
+        print(result.id, result.value)
+    else:
+        print(result.id, 'failed:', result.error)
+"""
+
+st.code(bounded_example, language="python")
+st.caption(
+    "`process_batch` above creates a future for every item before the first one finishes, so memory grows with the input. "
+    "`BatchProcessor.run` reads the input lazily and holds at most `window` items; results stream out as they complete "
+    "(or in input order with `ordered=True`), and a failing item is reported in its result instead of stopping the batch."
+)
+
 # Tips
 st.subheader("⚡ Quick Tips")
 
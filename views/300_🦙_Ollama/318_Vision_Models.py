@@ -1,5 +1,7 @@
 import streamlit as st
 
+from lib.helper_cache import vision
+
 st.header("👁️ Vision Models — Ollama Basics")
 st.markdown("Working with multimodal models that understand images and text.")
 
@@ -331,11 +333,26 @@ if uploaded_image:
     st.image(image, caption="Uploaded Image", use_column_width=True)
     
     question = st.text_input("Ask about the image:", "Describe what you see.")
+    vision_model = st.selectbox("Vision model:", list(vision_models), key="vision_demo_model")
     
     if st.button("Analyze Image"):
-        st.info("In a real application with Ollama vision model installed, this would analyze the image.")
-        st.write("**Simulated Response:**")
-        st.success("I can see an uploaded image. The vision model would analyze it and provide detailed information based on your question.")
+        with st.spinner(f"Analyzing with {vision_model}..."):
+            try:
+                # Same (or re-encoded) image + question + model: answered from the cache
+                result = vision.analyze_cached(uploaded_image.getvalue(), question, vision_model)
+                st.success(result['answer'])
+                if result['perceptual_match']:
+                    st.warning(
+                        "⚠️ This image was matched to a similar-looking earlier upload (perceptual hash), not identical bytes. "
+                        "Different images that look alike can be confused; unset `OLLAMA_VISION_PERCEPTUAL` to match exact images only."
+                    )
+                if result['cached']:
+                    st.caption("♻️ Answer reused from the vision cache (no image encoding, no inference).")
+                elif result['image_reused']:
+                    st.caption("♻️ Reused the preprocessed image from the vision cache.")
+            except Exception as e:
+                st.error(f"Error: {str(e)}")
+                st.info(f"💡 Pull a vision model first: `ollama pull {vision_model}`")
 
 # Performance tips
 st.subheader("⚡ Performance Tips")
@@ -345,7 +362,7 @@ st.info("""
 - Resize large images (max 1024x1024 recommended)
 - Use JPEG for photos, PNG for diagrams
 - Smaller models (moondream) are faster
-- Cache results for identical images
+- Cache results for identical images (`lib.helper_cache.vision` keys on the image hash, question and model)
 
 **Quality:**
 - Higher resolution = better detail recognition
@@ -1,6 +1,9 @@
 import streamlit as st
 import time
 
+from lib import helper_ollama
+from lib.helper_ollama.streaming import render_stream
+
 st.set_page_config(page_title="10 Steps: Ollama Basics & Features", page_icon="🦙", layout="wide")
 
 st.title("🦙 10 Steps to Master Ollama Basics and Features")
@@ -48,8 +51,7 @@ with tabs[0]:
         st.markdown("**6. Test Connection:**")
         if st.button("Test Ollama Connection", key="test_connection"):
             try:
-                import ollama
-                models = ollama.list()
+                models = helper_ollama.list_models()
                 st.success(f"✅ Ollama is running! Found {len(models.get('models', []))} model(s)")
                 for model in models.get('models', []):
                     st.write(f"- {model.get('name', 'unknown')}")
@@ -105,8 +107,7 @@ with tabs[1]:
         if st.button("Generate", key="basic_generate"):
             with st.spinner("Generating..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
+                    response = helper_ollama.generate(
                         model='llama2',
                         prompt=prompt_basic
                     )
@@ -159,22 +160,16 @@ with tabs[2]:
         if st.button("Generate with Streaming", key="stream_generate"):
             st.markdown("**Streaming Response:**")
             response_placeholder = st.empty()
-            full_response = ""
             
             try:
-                import ollama
-                stream = ollama.generate(
+                stream = helper_ollama.generate(
                     model='llama2',
                     prompt=prompt_stream,
                     stream=True
                 )
                 
-                for chunk in stream:
-                    if 'response' in chunk:
-                        full_response += chunk['response']
-                        response_placeholder.markdown(full_response + "▌")
-                
-                response_placeholder.markdown(full_response)
+                # Redraws a few times a second instead of on every token
+                render_stream(stream, response_placeholder)
                 st.success("✅ Streaming complete!")
             except ImportError:
                 st.error("❌ Ollama not installed")
@@ -185,6 +180,7 @@ with tabs[2]:
         st.markdown("### Code:")
         code = """
 import ollama
+from lib.helper_ollama.streaming import chunk_text
 
 # Stream the response
 stream = ollama.generate(
@@ -193,15 +189,19 @@ stream = ollama.generate(
     stream=True
 )
 
-# Process each chunk
-full_response = ""
+# Process each chunk; collect the parts and join them once at the end
+parts = []
 for chunk in stream:
-    if 'response' in chunk:
-        full_response += chunk['response']
-        print(chunk['response'], end='', flush=True)
+    text = chunk_text(chunk)
+    parts.append(text)
+    print(text, end='', flush=True)
 
 print()  # New line at the end
+full_response = "".join(parts)
 print(f"\\nComplete response length: {len(full_response)}")
+
+# In a Streamlit app, render_stream(stream, st.empty()) does this
+# with throttled redraws and returns the full text
 """
         st.code(code, language="python")
     
@@ -303,8 +303,7 @@ with tabs[4]:
         if st.button("Generate with Parameters", key="param_generate"):
             with st.spinner("Generating..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
+                    response = helper_ollama.generate(
                         model='llama2',
                         prompt=param_prompt,
                         options={
@@ -386,8 +385,7 @@ with tabs[5]:
         if st.button("Chat with System Message", key="system_generate"):
             with st.spinner("Generating..."):
                 try:
-                    import ollama
-                    response = ollama.chat(
+                    response = helper_ollama.chat(
                         model='llama2',
                         messages=[
                             {
@@ -470,8 +468,7 @@ with tabs[6]:
         with col_a:
             if st.button("Send (with context)", key="with_context"):
                 try:
-                    import ollama
-                    response = ollama.generate(
+                    response = helper_ollama.generate(
                         model='llama2',
                         prompt=context_prompt,
                         context=st.session_state.context
@@ -551,8 +548,7 @@ with tabs[7]:
                 })
                 
                 try:
-                    import ollama
-                    response = ollama.chat(
+                    response = helper_ollama.chat(
                         model='llama2',
                         messages=st.session_state.chat_history
                     )
@@ -633,20 +629,21 @@ with tabs[8]:
         st.markdown("### Test Error Handling:")
         if st.button("Test Error Handling", key="test_error"):
             try:
-                import ollama
                 # Try to use non-existent model
                 try:
-                    response = ollama.generate(
+                    response = helper_ollama.generate(
                         model='nonexistent_model',
                         prompt='test'
                     )
                 except Exception as e:
                     st.warning(f"⚠️ Caught error: {str(e)}")
-                    st.info("Using fallback model...")
+                    # Missing models are remembered for a short while: repeat clicks fail
+                    # instantly, and the error suggests an installed model to fall back to
+                    fallback = getattr(e, 'suggestion', None) or 'llama2'
+                    st.info(f"Using fallback model {fallback}...")
                     
-                    # Fallback to default model
-                    response = ollama.generate(
-                        model='llama2',
+                    response = helper_ollama.generate(
+                        model=fallback,
                         prompt='Say hello'
                     )
                     st.success(f"✅ Fallback successful: {response['response']}")
@@ -750,7 +747,6 @@ with tabs[9]:
                 st.warning("Please enter a prompt")
             else:
                 try:
-                    import ollama
                     
                     # Adjust system message based on task
                     task_systems = {
@@ -775,24 +771,18 @@ with tabs[9]:
                     
                     if use_streaming:
                         response_placeholder = st.empty()
-                        full_response = ""
                         
-                        stream = ollama.chat(
+                        stream = helper_ollama.chat(
                             model=selected_model,
                             messages=messages,
                             stream=True,
                             options={'temperature': temp_setting}
                         )
                         
-                        for chunk in stream:
-                            if 'message' in chunk and 'content' in chunk['message']:
-                                full_response += chunk['message']['content']
-                                response_placeholder.markdown(full_response + "▌")
-                        
-                        response_placeholder.markdown(full_response)
+                        render_stream(stream, response_placeholder)
                     else:
                         with st.spinner(f"Generating with {selected_model}..."):
-                            response = ollama.chat(
+                            response = helper_ollama.chat(
                                 model=selected_model,
                                 messages=messages,
                                 options={'temperature': temp_setting}
@@ -833,6 +823,7 @@ with tabs[9]:
     code = """
 import streamlit as st
 import ollama
+from lib.helper_ollama.streaming import render_stream
 
 st.title("AI Writing Assistant")
 
@@ -852,23 +843,14 @@ if st.button("Generate"):
         {'role': 'user', 'content': prompt}
     ]
     
-    # Stream response
-    full_response = ""
-    placeholder = st.empty()
-    
+    # Stream response, redrawing at most 10 times a second
     stream = ollama.chat(
         model=model,
         messages=messages,
         stream=True,
         options={'temperature': temperature}
     )
-    
-    for chunk in stream:
-        if 'message' in chunk:
-            full_response += chunk['message']['content']
-            placeholder.markdown(full_response + "▌")
-    
-    placeholder.markdown(full_response)
+    full_response = render_stream(stream, st.empty())
     st.success("Complete!")
 """
     st.code(code, language="python")
@@ -1,5 +1,9 @@
 import streamlit as st
 
+from lib import helper_ollama
+from lib.helper_ollama.streaming import render_stream
+from lib.helper_text import prompts
+
 st.set_page_config(page_title="10 Steps: Ollama Mini Apps", page_icon="🚀", layout="wide")
 
 st.title("🚀 10 Steps to Build Ollama Mini Apps")
@@ -52,8 +56,7 @@ with tabs[0]:
             
             # Generate response
             try:
-                import ollama
-                response = ollama.chat(
+                response = helper_ollama.chat(
                     model='llama2',
                     messages=st.session_state.step1_messages
                 )
@@ -151,8 +154,7 @@ with tabs[1]:
                 st.session_state.step2_messages = st.session_state.step2_messages[-max_history:]
             
             try:
-                import ollama
-                response = ollama.chat(
+                response = helper_ollama.chat(
                     model='llama2',
                     messages=st.session_state.step2_messages
                 )
@@ -248,22 +250,15 @@ with tabs[2]:
             # Stream assistant response
             with st.chat_message("assistant"):
                 message_placeholder = st.empty()
-                full_response = ""
                 
                 try:
-                    import ollama
-                    stream = ollama.chat(
+                    stream = helper_ollama.chat(
                         model='llama2',
                         messages=st.session_state.step3_messages,
                         stream=True
                     )
                     
-                    for chunk in stream:
-                        if 'message' in chunk and 'content' in chunk['message']:
-                            full_response += chunk['message']['content']
-                            message_placeholder.markdown(full_response + "▌")
-                    
-                    message_placeholder.markdown(full_response)
+                    full_response = render_stream(stream, message_placeholder)
                     
                     # Save response
                     st.session_state.step3_messages.append({
@@ -276,6 +271,8 @@ with tabs[2]:
     with col2:
         st.markdown("### Code:")
         code = """
+import time
+
 import streamlit as st
 import ollama
 
@@ -301,7 +298,8 @@ if prompt := st.chat_input("Message..."):
     # Stream response
     with st.chat_message("assistant"):
         placeholder = st.empty()
-        full_response = ""
+        parts = []
+        last_draw = 0.0
         
         stream = ollama.chat(
             model='llama2',
@@ -310,10 +308,13 @@ if prompt := st.chat_input("Message..."):
         )
         
         for chunk in stream:
-            if 'message' in chunk:
-                full_response += chunk['message']['content']
-                placeholder.markdown(full_response + "▌")
+            parts.append(chunk['message']['content'])
+            # Redraw at most 10x per second, not once per token
+            if time.monotonic() - last_draw > 0.1:
+                placeholder.markdown("".join(parts) + "▌")
+                last_draw = time.monotonic()
         
+        full_response = "".join(parts)
         placeholder.markdown(full_response)
         
         st.session_state.messages.append({
@@ -365,8 +366,7 @@ with tabs[3]:
             if final_prompt:
                 with st.spinner(f"Generating with {gen_model}..."):
                     try:
-                        import ollama
-                        response = ollama.generate(
+                        response = helper_ollama.generate(
                             model=gen_model,
                             prompt=final_prompt,
                             options={
@@ -473,23 +473,16 @@ with tabs[4]:
             
             st.markdown("### Generated Content:")
             placeholder = st.empty()
-            full_text = ""
             
             try:
-                import ollama
-                stream = ollama.generate(
+                stream = helper_ollama.generate(
                     model='llama2',
                     prompt=prompt,
                     options={'temperature': 0.9},  # High creativity
                     stream=True
                 )
                 
-                for chunk in stream:
-                    if 'response' in chunk:
-                        full_text += chunk['response']
-                        placeholder.markdown(full_text + "▌")
-                
-                placeholder.markdown(full_text)
+                render_stream(stream, placeholder)
                 st.success("✅ Creation complete!")
             except Exception as e:
                 st.error(f"Error: {str(e)}")
@@ -499,6 +492,7 @@ with tabs[4]:
         code = """
 import streamlit as st
 import ollama
+from lib.helper_ollama.streaming import render_stream
 
 # Creative settings
 writing_type = st.radio("Type:", 
@@ -520,9 +514,6 @@ if st.button("Create"):
     about: {topic}\"\"\"
     
     # Stream with high creativity
-    full_text = ""
-    placeholder = st.empty()
-    
     stream = ollama.generate(
         model='llama2',
         prompt=prompt,
@@ -530,11 +521,8 @@ if st.button("Create"):
         stream=True
     )
     
-    for chunk in stream:
-        full_text += chunk['response']
-        placeholder.markdown(full_text + "▌")
-    
-    placeholder.markdown(full_text)
+    # Throttled redraws (lib.helper_ollama.streaming)
+    full_text = render_stream(stream, st.empty())
 """
         st.code(code, language="python")
     
@@ -580,24 +568,30 @@ with tabs[5]:
                 col_b.metric("Characters", char_count)
                 col_c.metric("Sentences", sentence_count)
             else:
-                # AI-powered analysis
-                prompts = {
-                    "Summarize": f"Summarize this text in 2-3 sentences:\n\n{text_to_analyze}",
-                    "Extract Keywords": f"Extract the main keywords from this text:\n\n{text_to_analyze}",
-                    "Identify Tone": f"Identify the tone of this text (e.g., formal, casual, positive, negative):\n\n{text_to_analyze}"
+                # AI-powered analysis: the text comes before the task, so
+                # switching analysis type reuses the evaluated text
+                tasks = {
+                    "Summarize": "Summarize the text in 2-3 sentences.",
+                    "Extract Keywords": "Extract the main keywords from the text.",
+                    "Identify Tone": "Identify the tone of the text (e.g., formal, casual, positive, negative)."
                 }
+                prompt = prompts.assemble(
+                    "Read the text below, then carry out the task that follows it.",
+                    {"Text": text_to_analyze},
+                    task=f"Task: {tasks[analysis_type]}"
+                )
                 
                 with st.spinner("Analyzing..."):
                     try:
-                        import ollama
-                        response = ollama.generate(
+                        response = helper_ollama.generate(
                             model='llama2',
-                            prompt=prompts[analysis_type],
+                            prompt=prompt,
                             options={'temperature': 0.3}  # Low for factual
                         )
                         
                         st.markdown("### Analysis Results:")
                         st.write(response['response'])
+                        st.caption(prompts.describe_reuse(prompts.shared_prefix('llama2', prompt), prompt, response))
                     except Exception as e:
                         st.error(f"Error: {str(e)}")
     
@@ -695,12 +689,16 @@ with tabs[6]:
                 "Key Takeaways": "as key takeaways"
             }
             
-            prompt = f"Summarize the following text {length_map[summary_length]} {style_map[summary_style]}:\n\n{text_to_summarize}"
+            # Options go last: changing length or style keeps the text's prefix
+            prompt = prompts.assemble(
+                "Summarize the text below.",
+                {"Text": text_to_summarize},
+                task=f"Write the summary {length_map[summary_length]} {style_map[summary_style]}."
+            )
             
             with st.spinner("Summarizing..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
+                    response = helper_ollama.generate(
                         model='llama2',
                         prompt=prompt,
                         options={'temperature': 0.3}
@@ -708,6 +706,7 @@ with tabs[6]:
                     
                     st.markdown("### Summary:")
                     st.write(response['response'])
+                    st.caption(prompts.describe_reuse(prompts.shared_prefix('llama2', prompt), prompt, response))
                     
                     # Show original vs summary
                     with st.expander("📊 Compression Stats"):
@@ -789,19 +788,19 @@ with tabs[7]:
         )
         
         if st.button("😊 Analyze Sentiment", key="sentiment_button"):
-            prompt = f"""Analyze the sentiment of this text. 
-            Provide:
-            1. Overall sentiment (Positive/Negative/Neutral)
-            2. Confidence level (High/Medium/Low)
-            3. Key emotions detected
-            4. Brief explanation
-            
-            Text: {sentiment_text}"""
+            prompt = prompts.assemble(
+                """Analyze the sentiment of the text below.
+                Provide:
+                1. Overall sentiment (Positive/Negative/Neutral)
+                2. Confidence level (High/Medium/Low)
+                3. Key emotions detected
+                4. Brief explanation""",
+                {"Text": sentiment_text}
+            )
             
             with st.spinner("Analyzing sentiment..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
+                    response = helper_ollama.generate(
                         model='llama2',
                         prompt=prompt,
                         options={'temperature': 0.2}
@@ -809,6 +808,7 @@ with tabs[7]:
                     
                     st.markdown("### Sentiment Analysis:")
                     st.write(response['response'])
+                    st.caption(prompts.describe_reuse(prompts.shared_prefix('llama2', prompt), prompt, response))
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
     
@@ -879,16 +879,18 @@ with tabs[8]:
         num_points = st.slider("Number of key points:", 3, 10, 5, key="num_points")
         
         if st.button("🔑 Extract Key Points", key="keypoints_button"):
-            prompt = f"""Extract exactly {num_points} key points from this text.
-            Format each point as a bullet point.
-            Be concise and focus on the most important information.
-            
-            Text: {keypoints_text}"""
+            # The point count goes after the text so changing it keeps the prefix
+            prompt = prompts.assemble(
+                """Extract key points from the text below.
+                Format each point as a bullet point.
+                Be concise and focus on the most important information.""",
+                {"Text": keypoints_text},
+                task=f"Give exactly {num_points} key points."
+            )
             
             with st.spinner("Extracting key points..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
+                    response = helper_ollama.generate(
                         model='llama2',
                         prompt=prompt,
                         options={'temperature': 0.2}
@@ -896,6 +898,7 @@ with tabs[8]:
                     
                     st.markdown("### Key Points:")
                     st.write(response['response'])
+                    st.caption(prompts.describe_reuse(prompts.shared_prefix('llama2', prompt), prompt, response))
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
     
@@ -991,22 +994,15 @@ with tabs[9]:
             # Stream response
             with st.chat_message("assistant"):
                 placeholder = st.empty()
-                full_response = ""
                 
                 try:
-                    import ollama
-                    stream = ollama.chat(
+                    stream = helper_ollama.chat(
                         model=chat_model,
                         messages=messages,
                         stream=True
                     )
                     
-                    for chunk in stream:
-                        if 'message' in chunk and 'content' in chunk['message']:
-                            full_response += chunk['message']['content']
-                            placeholder.markdown(full_response + "▌")
-                    
-                    placeholder.markdown(full_response)
+                    full_response = render_stream(stream, placeholder)
                     
                     st.session_state.final_chat_messages.append({
                         "role": "assistant",
@@ -1046,8 +1042,7 @@ with tabs[9]:
                 if gen_prompt_final:
                     with st.spinner("Generating..."):
                         try:
-                            import ollama
-                            response = ollama.generate(
+                            response = helper_ollama.generate(
                                 model='llama2',
                                 prompt=gen_prompt_final,
                                 options={'temperature': gen_temp_final}
@@ -1089,8 +1084,7 @@ with tabs[9]:
                 if analyze_text_final:
                     with st.spinner("Summarizing..."):
                         try:
-                            import ollama
-                            response = ollama.generate(
+                            response = helper_ollama.generate(
                                 model='llama2',
                                 prompt=f"Summarize this text concisely:\n\n{analyze_text_final}",
                                 options={'temperature': 0.3}
@@ -1105,8 +1099,7 @@ with tabs[9]:
                 if analyze_text_final:
                     with st.spinner("Analyzing..."):
                         try:
-                            import ollama
-                            response = ollama.generate(
+                            response = helper_ollama.generate(
                                 model='llama2',
                                 prompt=f"Identify the sentiment (Positive/Negative/Neutral) of this text:\n\n{analyze_text_final}",
                                 options={'temperature': 0.2}
@@ -1121,8 +1114,7 @@ with tabs[9]:
                 if analyze_text_final:
                     with st.spinner("Extracting..."):
                         try:
-                            import ollama
-                            response = ollama.generate(
+                            response = helper_ollama.generate(
                                 model='llama2',
                                 prompt=f"Extract 5 key points from this text:\n\n{analyze_text_final}",
                                 options={'temperature': 0.2}
@@ -1,6 +1,11 @@
 import streamlit as st
 import json
 
+from lib import helper_ollama
+from lib.helper_cache import semantic
+from lib.helper_ollama.streaming import render_stream
+from lib.helper_text import prompts
+
 st.set_page_config(page_title="10 Steps: Ollama Amazing Apps", page_icon="⭐", layout="wide")
 
 st.title("⭐ 10 Steps: Ollama Amazing Small Apps")
@@ -58,8 +63,7 @@ with tabs[0]:
             
             with st.spinner(f"Generating {code_lang} code..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
+                    response = helper_ollama.generate(
                         model='codellama',  # Best for code
                         prompt=prompt,
                         options={'temperature': 0.2}  # Low for accuracy
@@ -171,8 +175,7 @@ with tabs[1]:
             
             with st.spinner("Analyzing code..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
+                    response = helper_ollama.generate(
                         model='codellama',
                         prompt=prompt,
                         options={'temperature': 0.3}
@@ -272,12 +275,16 @@ with tabs[2]:
         )
         
         if st.button("🌍 Translate", key="translate_btn"):
-            prompt = f"Translate the following text from {from_lang} to {to_lang}. Use a {style.lower()} style:\n\n{text_translate}"
+            # Languages and style go after the text so changing them keeps its prefix
+            prompt = prompts.assemble(
+                "Translate the text below.",
+                {"Text": text_translate},
+                task=f"Translate it from {from_lang} to {to_lang}. Use a {style.lower()} style. Reply with the translation only."
+            )
             
             with st.spinner("Translating..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
+                    response = helper_ollama.generate(
                         model='llama2',
                         prompt=prompt,
                         options={'temperature': 0.3}
@@ -285,11 +292,12 @@ with tabs[2]:
                     
                     st.markdown("### Translation:")
                     st.write(response['response'])
+                    st.caption(prompts.describe_reuse(prompts.shared_prefix('llama2', prompt), prompt, response))
                     
                     # Back-translation for verification
                     if st.checkbox("Show back-translation (verify accuracy)", key="back_trans"):
                         back_prompt = f"Translate this {to_lang} text back to {from_lang}:\n\n{response['response']}"
-                        back_response = ollama.generate(
+                        back_response = helper_ollama.generate(
                             model='llama2',
                             prompt=back_prompt,
                             options={'temperature': 0.3}
@@ -400,23 +408,16 @@ with tabs[3]:
             
             st.markdown("### Your Story:")
             placeholder = st.empty()
-            full_story = ""
             
             try:
-                import ollama
-                stream = ollama.generate(
+                stream = helper_ollama.generate(
                     model='llama2',
                     prompt=prompt,
                     options={'temperature': 0.9},  # High creativity
                     stream=True
                 )
                 
-                for chunk in stream:
-                    if 'response' in chunk:
-                        full_story += chunk['response']
-                        placeholder.markdown(full_story + "▌")
-                
-                placeholder.markdown(full_story)
+                full_story = render_stream(stream, placeholder)
                 
                 # Download option
                 st.download_button(
@@ -529,8 +530,7 @@ The email should be clear, concise, and professional."""
             
             with st.spinner("Composing email..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
+                    response = helper_ollama.generate(
                         model='llama2',
                         prompt=prompt,
                         options={'temperature': 0.4}
@@ -641,20 +641,15 @@ Skills:
         if st.button("📊 Analyze Resume", key="resume_btn"):
             analyses = ", ".join(analysis_types)
             
-            prompt = f"""Analyze this resume for a {job_role} position.
-
-Provide:
-{', '.join(analysis_types)}
-
-Resume:
-{resume_text}
-
-Be specific and constructive in your feedback."""
+            prompt = prompts.assemble(
+                "Analyze the resume below. Be specific and constructive in your feedback.",
+                {"Resume": resume_text},
+                task=[f"Target position: {job_role}", f"Provide: {analyses}"]
+            )
             
             with st.spinner("Analyzing resume..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
+                    response = helper_ollama.generate(
                         model='llama2',
                         prompt=prompt,
                         options={'temperature': 0.3}
@@ -662,6 +657,7 @@ Be specific and constructive in your feedback."""
                     
                     st.markdown("### Analysis:")
                     st.write(response['response'])
+                    st.caption(prompts.describe_reuse(prompts.shared_prefix('llama2', prompt), prompt, response))
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
     
@@ -755,21 +751,24 @@ Action Items:
         include_attendees = st.checkbox("List attendees", value=False, key="meeting_attendees")
         
         if st.button("📝 Summarize Meeting", key="meeting_btn"):
-            prompt = f"Summarize the following meeting notes:\n\n{meeting_notes}\n\n"
-            
+            instructions = []
             if include_action_items:
-                prompt += "Clearly list all action items with assigned owners and deadlines.\n"
+                instructions.append("Clearly list all action items with assigned owners and deadlines.")
             if include_decisions:
-                prompt += "Highlight key decisions made.\n"
+                instructions.append("Highlight key decisions made.")
             if include_attendees:
-                prompt += "List meeting attendees.\n"
+                instructions.append("List meeting attendees.")
+            instructions.append("Keep the summary concise and well-organized.")
             
-            prompt += "Keep the summary concise and well-organized."
+            prompt = prompts.assemble(
+                "Summarize the meeting notes below.",
+                {"Meeting notes": meeting_notes},
+                task=instructions
+            )
             
             with st.spinner("Summarizing meeting..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
+                    response = helper_ollama.generate(
                         model='llama2',
                         prompt=prompt,
                         options={'temperature': 0.2}
@@ -777,6 +776,7 @@ Action Items:
                     
                     st.markdown("### Meeting Summary:")
                     st.write(response['response'])
+                    st.caption(prompts.describe_reuse(prompts.shared_prefix('llama2', prompt), prompt, response))
                     
                     # Download option
                     st.download_button(
@@ -894,27 +894,41 @@ Free trial available for all plans.""",
                 "Bullet Points": "Answer using bullet points."
             }
             
-            prompt = f"""Based on the following context, answer the question.
-{style_instructions[answer_style]}
-
-Context:
-{context}
-
-Question: {question}
-
-Answer:"""
+            # The knowledge base is the long, stable part: it goes first and
+            # the question and style last, so each new question reuses it
+            prompt = prompts.assemble(
+                "Answer the question using only the context below.",
+                {"Context": context, "Question": question},
+                task=[style_instructions[answer_style], "Answer:"]
+            )
+            
+            # Paraphrased questions about the same knowledge base reuse a stored answer
+            qa_scope = semantic.scope(context, style_instructions[answer_style], 'llama2')
             
             with st.spinner("Finding answer..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
-                        model='llama2',
-                        prompt=prompt,
-                        options={'temperature': 0.2}
-                    )
+                    reuse = {}
+                    
+                    def answer():
+                        response = helper_ollama.generate(
+                            model='llama2',
+                            prompt=prompt,
+                            options={'temperature': 0.2}
+                        )['response']
+                        reuse['shared'] = prompts.shared_prefix('llama2', prompt)
+                        return response
+                    
+                    result = semantic.get_cache().get_or_generate(qa_scope, question, answer)
                     
                     st.markdown("### Answer:")
-                    st.write(response['response'])
+                    st.write(result['answer'])
+                    if result['cached']:
+                        st.caption(
+                            f"♻️ Reused the answer to \"{result['matched_question']}\" "
+                            f"(similarity {result['similarity']:.2f})"
+                        )
+                    else:
+                        st.caption(prompts.describe_reuse(reuse['shared'], prompt))
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
     
@@ -1026,8 +1040,7 @@ Description: {description}
             
             with st.spinner("Generating creative names..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
+                    response = helper_ollama.generate(
                         model='llama2',
                         prompt=prompt,
                         options={'temperature': 0.8}  # Creative
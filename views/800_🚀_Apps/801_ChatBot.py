@@ -2,6 +2,9 @@ import streamlit as st
 
 from lib import helper_streamlit
 from lib.helper_chat import utils
+from lib.helper_chat.conversation import Conversation
+from lib.helper_ollama import residency
+from lib.helper_ollama.streaming import render_stream
 
 import lib.helper_text.generator as text_generator
 import lib.helper_text.analyzer as text_analyzer
@@ -17,6 +20,10 @@ st.markdown("Have a conversation with an AI assistant.")
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
+# Server-side context, so each turn only evaluates the new message
+if "conversation" not in st.session_state:
+    st.session_state.conversation = Conversation()
+
 if "chatbot_model" not in st.session_state:
     st.session_state.chatbot_model = "phi4-mini"
 
@@ -28,7 +35,9 @@ with st.sidebar:
         "Model:",
         ["phi4-mini", "mistral", "codellama", "phi"],
         index=0,
-        key="chatbot_model_select"
+        key="chatbot_model_select",
+        on_change=residency.prewarm_selected,
+        args=("chatbot_model_select",),
     )
     
     system_prompt = st.text_area(
@@ -46,7 +55,14 @@ with st.sidebar:
     
     if st.button("🗑️ Clear Chat", key="clear_chat"):
         st.session_state.messages = []
+        st.session_state.conversation.reset()
         st.rerun()
+    
+    if st.session_state.conversation.prompt_eval_counts:
+        st.caption(
+            "Prompt tokens evaluated per turn: "
+            + ", ".join(str(n) for n in st.session_state.conversation.prompt_eval_counts)
+        )
 
 # Display chat messages
 for message in st.session_state.messages:
@@ -55,6 +71,8 @@ for message in st.session_state.messages:
 
 # Chat input
 if prompt := st.chat_input("Type your message..."):
+    history = list(st.session_state.messages)
+    
     # Add user message
     st.session_state.messages.append({"role": "user", "content": prompt})
     with st.chat_message("user"):
@@ -63,28 +81,18 @@ if prompt := st.chat_input("Type your message..."):
     # Generate assistant response
     with st.chat_message("assistant"):
         message_placeholder = st.empty()
-        full_response = ""
         
-        # Prepare messages
-        messages = utils.prepare_chat_messages(
-            st.session_state.messages,
-            system_prompt
-        )
-        
-        # Stream response
-        stream = utils.generate_chat_response(
+        # Stream response; only the new message is sent when the context is still valid
+        stream = st.session_state.conversation.reply(
             model=st.session_state.chatbot_model,
-            messages=messages,
+            history=history,
+            content=prompt,
+            system_prompt=system_prompt,
             temperature=temperature,
             stream=True
         )
         
-        for chunk in stream:
-            if 'message' in chunk and 'content' in chunk['message']:
-                full_response += chunk['message']['content']
-                message_placeholder.markdown(full_response + "▌")
-        
-        message_placeholder.markdown(full_response)
+        full_response = render_stream(stream, message_placeholder)
     
     # Add assistant response to history
     st.session_state.messages.append({"role": "assistant", "content": full_response})
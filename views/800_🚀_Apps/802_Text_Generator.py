@@ -1,7 +1,8 @@
 import streamlit as st
 
-from lib import helper_streamlit
+from lib import helper_ollama, helper_streamlit
 from lib.helper_chat import utils
+from lib.helper_ollama import residency
 
 import lib.helper_text.generator as text_generator
 import lib.helper_text.analyzer as text_analyzer
@@ -27,7 +28,9 @@ with col1:
         model = st.selectbox(
             "Select Model:",
             ["phi4-mini", "mistral", "codellama", "phi"],
-            key="gen_model"
+            key="gen_model",
+            on_change=residency.prewarm_selected,
+            args=("gen_model",),
         )
     
     with col_b:
@@ -42,6 +45,10 @@ with col1:
         50, 500, 200,
         key="gen_tokens"
     )
+
+    circuit = helper_ollama.breaker_state(model)
+    if circuit["state"] != "closed":
+        st.warning(f"⚠️ {model} is failing right now; requests are paused for {circuit['retry_after']:.0f}s.")
     
     if st.button("✨ Generate", key="generate_btn", type="primary"):
         if not prompt:
@@ -1,7 +1,8 @@
 import streamlit as st
 
-from lib import helper_streamlit
+from lib import helper_ollama, helper_streamlit
 from lib.helper_chat import utils
+from lib.helper_ollama import residency
 
 import lib.helper_text.generator as text_generator
 import lib.helper_text.analyzer as text_analyzer
@@ -38,8 +39,14 @@ with col1:
     model = st.selectbox(
         "Model:",
         ["phi4-mini", "mistral", "phi"],
-        key="analyze_model"
+        key="analyze_model",
+        on_change=residency.prewarm_selected,
+        args=("analyze_model",),
     )
+
+    circuit = helper_ollama.breaker_state(model)
+    if circuit["state"] != "closed":
+        st.warning(f"⚠️ {model} is failing right now; requests are paused for {circuit['retry_after']:.0f}s.")
     
     if st.button("🔍 Analyze", key="analyze_btn", type="primary"):
         if not text_to_analyze:
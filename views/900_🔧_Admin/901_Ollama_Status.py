@@ -0,0 +1,82 @@
+import pandas as pd
+import streamlit as st
+
+from lib.helper_ollama import breaker, governor, hostpool, negative, residency, scheduler
+
+st.header("🔧 Ollama Status — Admin")
+st.markdown("Health of the shared Ollama call path in this Streamlit process.")
+
+st.subheader("🖥️ Hosts")
+st.markdown("""
+Requests go to a healthy host that already has the model loaded, with the fewest outstanding requests.
+Set `OLLAMA_HOSTS` to pool several servers.
+""")
+
+pool = hostpool.get_pool()
+st.dataframe(pd.DataFrame(pool.snapshot()), use_container_width=True, hide_index=True)
+st.caption(
+    f"Hedged requests: {pool.hedges} sent, {pool.hedge_wins} answered first by the second host, "
+    f"{pool.hedges_skipped} skipped (over budget or no free slot on the second host)."
+)
+
+st.subheader("🛡️ Circuit Breakers")
+st.markdown("""
+One breaker per host and model. **open** means calls fail immediately until the retry time,
+**half_open** means a single probe request is being let through.
+""")
+
+states = breaker.breaker_states()
+if states:
+    st.dataframe(pd.DataFrame(states), use_container_width=True, hide_index=True)
+else:
+    st.info("No model has been called yet in this process.")
+
+st.subheader("🚫 Known Failures")
+st.markdown("""
+Missing models and unreachable hosts fail immediately until the entry expires
+or the host's model list changes.
+""")
+
+failures = negative.get_cache()
+if failures.snapshot():
+    st.dataframe(pd.DataFrame(failures.snapshot()), use_container_width=True, hide_index=True)
+else:
+    st.info("No recent failures.")
+st.caption(f"Calls failed fast from this cache: {failures.fast_failures}")
+
+st.subheader("🚦 Request Scheduler")
+st.markdown("""
+Calls wait here for a free slot. Under contention, classes are served in proportion to their weight;
+**bulk** is capped below the slot count so interactive requests always find room.
+""")
+
+st.dataframe(pd.DataFrame(scheduler.get_scheduler().stats()), use_container_width=True, hide_index=True)
+
+st.subheader("🎛️ Per-Model Concurrency")
+st.markdown("""
+In-flight calls per host and model are held to the server's parallel slots; the rest wait here.
+""")
+
+governors = governor.governor_states()
+if governors:
+    st.dataframe(pd.DataFrame(governors), use_container_width=True, hide_index=True)
+else:
+    st.info("No model has been called yet in this process.")
+
+st.subheader("🔥 Model Residency")
+st.markdown("""
+Models are pre-warmed when picked in a model selectbox and unloaded least-recently-used first
+when the memory budget would be exceeded. Load time counts as saved once the pre-warmed model is used.
+""")
+
+residency_stats = residency.get_manager().stats()
+col1, col2 = st.columns(2)
+col1.metric("Memory budget", f"{residency_stats['budget_bytes'] / 1024**3:.1f} GB")
+col2.metric("Load time saved", f"{residency_stats['saved_load_seconds']:.1f}s")
+if residency_stats["models"]:
+    st.dataframe(pd.DataFrame(residency_stats["models"]), use_container_width=True, hide_index=True)
+else:
+    st.info("No model has been pre-warmed or used yet in this process.")
+
+if st.button("🔄 Refresh", key="status_refresh"):
+    st.rerun()
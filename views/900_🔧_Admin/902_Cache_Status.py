@@ -0,0 +1,67 @@
+import pandas as pd
+import streamlit as st
+
+from lib.helper_cache import instrument
+from lib.helper_text import warmup
+
+st.header("💾 Cache Status — Admin")
+st.markdown("What the caches of this Streamlit process hold, and whether they pay for themselves.")
+
+report = instrument.report()
+
+st.subheader("⚡ Cached Functions")
+st.markdown("""
+Functions decorated with `lib.helper_cache.instrument.cache_data` / `cache_resource`.
+**Saved** is the compute time of every hit; **evictions** are argument sets computed again after being cached
+(TTL, `max_entries` or a clear). Entries and bytes count what was cached and may include entries Streamlit already dropped.
+""")
+
+col1, col2, col3 = st.columns(3)
+col1.metric("Process", report["pid"])
+col2.metric("Approx. memory held", f"{report['totals']['bytes'] / 1024**2:.1f} MB")
+col3.metric("Compute time saved", f"{report['totals']['saved_seconds']:.1f}s")
+
+if report["functions"]:
+    st.dataframe(pd.DataFrame(report["functions"]), use_container_width=True, hide_index=True)
+else:
+    st.info("No instrumented function has been called yet in this process.")
+
+st.subheader("🗄️ Shared Stores")
+st.markdown("""
+Response cache (SQLite, shared by all processes, with a per-process memory tier), embedding cache
+(memory-mapped files), the in-process semantic answer cache and the content-addressed vision cache.
+""")
+
+for name, stats in report["stores"].items():
+    st.markdown(f"**{name.capitalize()}**")
+    if stats:
+        st.dataframe(pd.DataFrame([stats]), use_container_width=True, hide_index=True)
+    else:
+        st.info("Disabled.")
+
+st.subheader("🌡️ Warm-up")
+st.markdown("""
+Text analyzer sample results computed in the background at startup (configured in `warmup.toml`).
+""")
+
+warm = warmup.status()
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("State", warm["state"])
+col2.metric("Generated", f"{warm['generated']}/{warm['total']}")
+col3.metric("Already cached", warm["cached"])
+col4.metric("Failed", warm["failed"])
+for error in warm["errors"]:
+    st.caption(f"⚠️ {error}")
+
+col1, col2 = st.columns(2)
+with col1:
+    st.download_button(
+        "📥 Export JSON",
+        instrument.export_json(report),
+        f"cache_status_{report['pid']}.json",
+        "application/json",
+        key="cache_export",
+    )
+with col2:
+    if st.button("🔄 Refresh", key="cache_refresh"):
+        st.rerun()